@@ -22,6 +22,49 @@ class Settings(BaseSettings):
     anthropic_model: str = "claude-sonnet-4-20250514"
     anthropic_max_tokens: int = 4096
 
+    # Feed Settings
+    feed_snapshot_ttl_seconds: int = 15 * 60
+    feed_snapshot_max_items: int = 500
+    # A full snapshot holds ~60 KB of UUIDs, so ~60 MB per worker at most
+    feed_snapshot_max_snapshots: int = 1_000
+    feed_cache_ttl_seconds: int = 60
+    feed_cache_max_entries: int = 10_000
+    feed_candidate_limit: int = 200
+    feed_candidates_per_tag: int = 25
+    feed_important_days: int = 14
+    feed_followed_tag_days: int = 30
+    feed_fresh_days: int = 7
+    feed_trending_days: int = 3
+    counter_cache_ttl_seconds: int = 5
+    counter_cache_max_entries: int = 50_000
+    like_count_flush_interval_ms: int = 200
+
+    # Trending Settings
+    trending_half_life_hours: float = 6.0
+    trending_capacity: int = 1000
+    trending_sketch_width: int = 4096
+    trending_sketch_depth: int = 4
+    trending_rebuild_hours: int = 48
+
+    # View Ingestion Settings
+    view_ingest_max_pending: int = 50_000
+    view_ingest_batch_size: int = 500
+    view_ingest_flush_interval_ms: int = 250
+    view_ingest_max_attempts: int = 3
+
+    # Realtime Settings (channel None: in-process delivery only)
+    realtime_channel: str | None = "pulsync_events"
+    realtime_queue_size: int = 100
+    realtime_keepalive_seconds: float = 15.0
+
+    # Interest Settings
+    interest_prune_interval_minutes: int = 60
+
+    # User Search Settings
+    user_search_cache_ttl_seconds: int = 60
+    user_search_cache_max_entries: int = 5_000
+    user_search_cache_max_query_length: int = 3
+
     class Config:
         env_file = ".env"
 
@@ -1,5 +1,8 @@
-from sqlalchemy import create_engine
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, create_engine, event, inspect, text
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.schema import CreateColumn
 
 from app.config import settings
 
@@ -11,9 +14,47 @@ class Base(DeclarativeBase):
     pass
 
 
+# Trigram indexes on users need pg_trgm before create_all() creates them
+event.listen(
+    Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to the current models.
+
+    create_all() only creates missing tables, so columns and indexes added
+    to tables that already exist are created here. New columns on existing
+    tables need a server default (or must be nullable).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    conn.execute(
+                        text(f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {ddl}")
+                    )
+        # Interest scores decay from updated_at; rows without one would never
+        # decay or be pruned
+        conn.execute(
+            text(
+                "UPDATE user_interests SET updated_at = :now WHERE updated_at IS NULL"
+            ),
+            {"now": datetime.now(timezone.utc)},
+        )
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
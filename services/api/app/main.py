@@ -4,7 +4,8 @@ from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from app.db import Base, engine, get_db
+from app.config import settings
+from app.db import Base, engine, get_db, upgrade_schema
 from app.middleware.observability import ObservabilityMiddleware
 from app.models.item import Item as ItemModel
 from app.models.tag import Tag as TagModel
@@ -24,6 +25,11 @@ from app.routers import (
 )
 from app.schemas.item import Item as ItemSchema
 from app.seed_demo_content import seed_demo_content
+from app.services.interests import interest_pruner
+from app.services.like_counts import like_counts
+from app.services.realtime import realtime_hub
+from app.services.trending import trending_engine
+from app.services.view_ingest import view_ingest
 
 
 def seed_database(db: Session):
@@ -89,11 +95,22 @@ def seed_database(db: Session):
 async def lifespan(app: FastAPI):
     # Startup: create tables and seed data
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     db = next(get_db())
     seed_database(db)
     db.close()
+    # Warm the trending engine from recent engagement in the background
+    trending_engine.start_rebuild(hours=settings.trending_rebuild_hours)
+    view_ingest.start()
+    like_counts.start()
+    interest_pruner.start()
+    realtime_hub.start()
     yield
-    # Shutdown: cleanup if needed
+    # Shutdown: stop background jobs and write any buffered views and likes
+    realtime_hub.stop()
+    interest_pruner.stop()
+    like_counts.stop()
+    view_ingest.stop()
 
 
 app = FastAPI(
@@ -1,6 +1,7 @@
 from app.models.bookmark import Bookmark
 from app.models.comment import Comment
 from app.models.content import Content, ContentType, SharingPolicy
+from app.models.content_stats import ContentStats
 from app.models.item import Item
 from app.models.like import Like
 from app.models.tag import Tag, content_tag_association
@@ -12,6 +13,7 @@ __all__ = [
     "Bookmark",
     "Comment",
     "Content",
+    "ContentStats",
     "ContentType",
     "Item",
     "Like",
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,6 +10,16 @@ from app.db import Base
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Keyset pagination of top-level comments and of replies
+        Index(
+            "ix_comments_content_id_parent_id_created_at",
+            "content_id",
+            "parent_id",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     content_id = Column(
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime, timezone
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import relationship
 
@@ -23,6 +23,10 @@ class SharingPolicy(str, Enum):
 
 class Content(Base):
     __tablename__ = "contents"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id) for the Following/Discover feeds
+        Index("ix_contents_created_at_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     author_id = Column(
@@ -60,3 +64,16 @@ class Content(Base):
     view_events = relationship(
         "ViewEvent", back_populates="content", cascade="all, delete-orphan"
     )
+    stats = relationship("ContentStats", uselist=False, viewonly=True)
+
+    @property
+    def like_count(self) -> int:
+        return self.stats.like_count if self.stats else 0
+
+    @property
+    def comment_count(self) -> int:
+        return self.stats.comment_count if self.stats else 0
+
+    @property
+    def view_count(self) -> int:
+        return self.stats.view_count if self.stats else 0
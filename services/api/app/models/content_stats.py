@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db import Base
+
+
+class ContentStats(Base):
+    """Denormalized engagement counters, maintained alongside likes/comments/views."""
+
+    __tablename__ = "content_stats"
+
+    content_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("contents.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    like_count = Column(Integer, nullable=False, default=0)
+    comment_count = Column(Integer, nullable=False, default=0)
+    view_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -10,8 +10,14 @@ from app.db import Base
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # At most one direct conversation per pair of users
+        Index("ix_conversations_dm_key", "dm_key", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # "<user id>:<user id>", sorted, for 1:1 conversations; NULL for groups
+    dm_key = Column(String(73), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -32,6 +38,15 @@ class Conversation(Base):
 
 class ConversationParticipant(Base):
     __tablename__ = "conversation_participants"
+    __table_args__ = (
+        # A user's inbox: their conversations, then the other participants
+        Index(
+            "ix_conversation_participants_user_id_conversation_id",
+            "user_id",
+            "conversation_id",
+        ),
+        Index("ix_conversation_participants_conversation_id", "conversation_id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(
@@ -44,6 +59,9 @@ class ConversationParticipant(Base):
     )
     joined_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     last_read_at = Column(DateTime, nullable=True)
+    # Denormalized inbox state, kept by send/read paths and the reconciler
+    unread_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_message_id = Column(UUID(as_uuid=True), nullable=True)
 
     # Relationships
     conversation = relationship("Conversation", back_populates="participants")
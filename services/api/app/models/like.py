@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -9,6 +9,10 @@ from app.db import Base
 
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        # Keyset pagination of a user's likes on (created_at, content_id)
+        Index("ix_likes_user_id_created_at", "user_id", "created_at", "content_id"),
+    )
 
     user_id = Column(
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
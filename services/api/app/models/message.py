@@ -1,15 +1,26 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 
 from app.db import Base
 
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Latest message and unread counts per conversation
+        Index(
+            "ix_messages_conversation_id_created_at",
+            "conversation_id",
+            "created_at",
+            "id",
+        ),
+        # Full-text search over message bodies
+        Index("ix_messages_body_tsv", "body_tsv", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(
@@ -21,6 +32,10 @@ class Message(Base):
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     body = Column(Text, nullable=False)
+    # Kept by Postgres; deferred so ordinary message loads don't fetch it
+    body_tsv = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('english', body)", persisted=True))
+    )
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
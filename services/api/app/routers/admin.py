@@ -12,7 +12,11 @@ from app.models.like import Like
 from app.models.user import User as UserModel
 from app.models.view_event import ViewEvent
 from app.routers.auth import get_current_user
-from app.schemas.content import Content, ContentWithDetails
+from app.schemas.content import ContentWithDetails
+from app.services.counter_cache import counter_cache
+from app.services.feed_cache import feed_cache
+from app.services.hydration import hydrate_content_details
+from app.services.trending import trending_engine
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -49,32 +53,8 @@ async def list_all_content(
     query = query.order_by(ContentModel.created_at.desc())
     contents = query.offset(skip).limit(limit).all()
 
-    result = []
-    for content in contents:
-        like_count = (
-            db.query(func.count(Like.user_id))
-            .filter(Like.content_id == content.id)
-            .scalar()
-        )
-        comment_count = (
-            db.query(func.count(Comment.id))
-            .filter(Comment.content_id == content.id)
-            .scalar()
-        )
-
-        result.append(
-            ContentWithDetails(
-                **Content.model_validate(content).model_dump(),
-                author=content.author,
-                tags=content.tags,
-                like_count=like_count,
-                comment_count=comment_count,
-                is_liked=False,
-                is_bookmarked=False,
-            )
-        )
-
-    return result
+    # Moderation view: counts only, no per-viewer like/bookmark state
+    return hydrate_content_details(db, contents, None)
 
 
 @router.patch("/content/{content_id}/important")
@@ -93,6 +73,7 @@ async def toggle_company_important(
 
     content.is_company_important = is_important
     db.commit()
+    feed_cache.invalidate_all()
 
     return {"status": "ok", "is_company_important": is_important}
 
@@ -112,6 +93,9 @@ async def admin_delete_content(
 
     db.delete(content)
     db.commit()
+    feed_cache.discard_content(content_id)
+    counter_cache.invalidate(content_id)
+    trending_engine.discard(content_id)
 
 
 @router.get("/analytics")
@@ -12,6 +12,7 @@ from app.models.user import User as UserModel
 from app.schemas.auth import LoginRequest, LoginResponse
 from app.schemas.user import User as UserSchema
 from app.schemas.user import UserCreate
+from app.services.user_search import user_search_cache
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
@@ -97,6 +98,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         db.add(user)
         db.commit()
         db.refresh(user)
+        user_search_cache.invalidate_all()
 
     access_token = create_access_token(user.id)
     return LoginResponse(
@@ -117,6 +119,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     db.add(user)
     db.commit()
     db.refresh(user)
+    user_search_cache.invalidate_all()
 
     access_token = create_access_token(user.id)
     return LoginResponse(
@@ -1,7 +1,7 @@
+from datetime import datetime
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session, joinedload
 
 from app.db import get_db
@@ -9,19 +9,26 @@ from app.models.comment import Comment as CommentModel
 from app.models.content import Content as ContentModel
 from app.models.user import User as UserModel
 from app.routers.auth import get_current_user
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentWithAuthor
+from app.schemas.comment import (
+    CommentCreate,
+    CommentTreeNode,
+    CommentUpdate,
+    CommentWithAuthor,
+)
+from app.services.comments import (
+    fetch_comment_page,
+    fetch_comment_tree,
+    with_reply_counts,
+)
+from app.services.counter_cache import counter_cache
+from app.services.counters import bump_content_stats
+from app.services.cursors import decode_keyset_cursor, encode_keyset_cursor
+from app.services.trending import trending_engine
 
 router = APIRouter(tags=["comments"])
 
 
-@router.get("/content/{content_id}/comments", response_model=list[CommentWithAuthor])
-async def get_comments(
-    content_id: UUID,
-    skip: int = Query(0, ge=0),
-    limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
-):
-    """Get comments for a content item."""
+def _get_commentable_content(db: Session, content_id: UUID) -> ContentModel:
     content = db.query(ContentModel).filter(ContentModel.id == content_id).first()
     if not content:
         raise HTTPException(
@@ -33,40 +40,59 @@ async def get_comments(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Comments are disabled for this content",
         )
+    return content
 
-    # Get top-level comments (no parent)
-    comments = (
-        db.query(CommentModel)
-        .options(joinedload(CommentModel.author))
-        .filter(CommentModel.content_id == content_id, CommentModel.parent_id == None)  # noqa: E711
-        .order_by(CommentModel.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
 
-    result = []
-    for comment in comments:
-        reply_count = (
-            db.query(func.count(CommentModel.id))
-            .filter(CommentModel.parent_id == comment.id)
-            .scalar()
-        )
-        result.append(
-            CommentWithAuthor(
-                id=comment.id,
-                content_id=comment.content_id,
-                author_id=comment.author_id,
-                parent_id=comment.parent_id,
-                body=comment.body,
-                created_at=comment.created_at,
-                updated_at=comment.updated_at,
-                author=comment.author,
-                reply_count=reply_count,
-            )
+def _decode_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    if not cursor:
+        return None
+    try:
+        return decode_keyset_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
         )
 
-    return result
+
+def _set_next_cursor(response: Response, after: tuple[datetime, UUID] | None):
+    if after is not None:
+        response.headers["X-Next-Cursor"] = encode_keyset_cursor(*after)
+
+
+@router.get("/content/{content_id}/comments", response_model=list[CommentWithAuthor])
+async def get_comments(
+    content_id: UUID,
+    response: Response,
+    cursor: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(50, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Get top-level comments, newest first (next page cursor in `X-Next-Cursor`)."""
+    _get_commentable_content(db, content_id)
+
+    comments, after = fetch_comment_page(
+        db, content_id, None, _decode_cursor(cursor), limit, skip
+    )
+    _set_next_cursor(response, after)
+    return with_reply_counts(db, comments)
+
+
+@router.get("/content/{content_id}/comments/tree", response_model=list[CommentTreeNode])
+async def get_comment_tree(
+    content_id: UUID,
+    limit: int = Query(20, ge=1, le=100),
+    max_depth: int = Query(3, ge=1, le=10),
+    max_comments: int = Query(200, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """
+    Get a thread in one round trip: the newest `limit` top-level comments
+    with nested replies down to `max_depth` levels, at most `max_comments`
+    comments in total.
+    """
+    _get_commentable_content(db, content_id)
+    return fetch_comment_tree(db, content_id, limit, max_depth, max_comments)
 
 
 @router.get(
@@ -76,45 +102,18 @@ async def get_comments(
 async def get_comment_replies(
     content_id: UUID,
     comment_id: UUID,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(50, ge=1, le=100),
     db: Session = Depends(get_db),
 ):
-    """Get replies to a comment."""
-    replies = (
-        db.query(CommentModel)
-        .options(joinedload(CommentModel.author))
-        .filter(
-            CommentModel.content_id == content_id, CommentModel.parent_id == comment_id
-        )
-        .order_by(CommentModel.created_at.asc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    """Get replies to a comment, oldest first (next page cursor in `X-Next-Cursor`)."""
+    replies, after = fetch_comment_page(
+        db, content_id, comment_id, _decode_cursor(cursor), limit, skip
     )
-
-    result = []
-    for reply in replies:
-        reply_count = (
-            db.query(func.count(CommentModel.id))
-            .filter(CommentModel.parent_id == reply.id)
-            .scalar()
-        )
-        result.append(
-            CommentWithAuthor(
-                id=reply.id,
-                content_id=reply.content_id,
-                author_id=reply.author_id,
-                parent_id=reply.parent_id,
-                body=reply.body,
-                created_at=reply.created_at,
-                updated_at=reply.updated_at,
-                author=reply.author,
-                reply_count=reply_count,
-            )
-        )
-
-    return result
+    _set_next_cursor(response, after)
+    return with_reply_counts(db, replies)
 
 
 @router.post(
@@ -129,17 +128,7 @@ async def create_comment(
     db: Session = Depends(get_db),
 ):
     """Add a comment to content."""
-    content = db.query(ContentModel).filter(ContentModel.id == content_id).first()
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Content not found"
-        )
-
-    if not content.comments_enabled:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Comments are disabled for this content",
-        )
+    _get_commentable_content(db, content_id)
 
     # Validate parent comment if provided
     if comment_data.parent_id:
@@ -164,7 +153,10 @@ async def create_comment(
         body=comment_data.body,
     )
     db.add(comment)
+    bump_content_stats(db, content_id, comments=1)
     db.commit()
+    counter_cache.invalidate(content_id)
+    trending_engine.record(content_id, "comment")
     db.refresh(comment)
 
     return CommentWithAuthor(
@@ -208,23 +200,7 @@ async def update_comment(
     db.commit()
     db.refresh(comment)
 
-    reply_count = (
-        db.query(func.count(CommentModel.id))
-        .filter(CommentModel.parent_id == comment.id)
-        .scalar()
-    )
-
-    return CommentWithAuthor(
-        id=comment.id,
-        content_id=comment.content_id,
-        author_id=comment.author_id,
-        parent_id=comment.parent_id,
-        body=comment.body,
-        created_at=comment.created_at,
-        updated_at=comment.updated_at,
-        author=comment.author,
-        reply_count=reply_count,
-    )
+    return with_reply_counts(db, [comment])[0]
 
 
 @router.delete("/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -245,5 +221,8 @@ async def delete_comment(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized"
         )
 
+    content_id = comment.content_id
     db.delete(comment)
+    bump_content_stats(db, content_id, comments=-1)
     db.commit()
+    counter_cache.invalidate(content_id)
@@ -1,14 +1,10 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from app.db import get_db
-from app.models.bookmark import Bookmark
-from app.models.comment import Comment
 from app.models.content import Content as ContentModel
-from app.models.like import Like
 from app.models.tag import Tag as TagModel
 from app.models.user import User as UserModel
 from app.routers.auth import get_current_user, get_current_user_optional
@@ -18,6 +14,10 @@ from app.schemas.content import (
     ContentUpdate,
     ContentWithDetails,
 )
+from app.services.counter_cache import counter_cache
+from app.services.feed_cache import feed_cache
+from app.services.hydration import hydrate_content_details
+from app.services.trending import trending_engine
 
 router = APIRouter(prefix="/content", tags=["content"])
 
@@ -41,51 +41,7 @@ async def list_content(
     query = query.order_by(ContentModel.created_at.desc())
     contents = query.offset(skip).limit(limit).all()
 
-    result = []
-    for content in contents:
-        like_count = (
-            db.query(func.count(Like.user_id))
-            .filter(Like.content_id == content.id)
-            .scalar()
-        )
-        comment_count = (
-            db.query(func.count(Comment.id))
-            .filter(Comment.content_id == content.id)
-            .scalar()
-        )
-
-        is_liked = False
-        is_bookmarked = False
-        if current_user:
-            is_liked = (
-                db.query(Like)
-                .filter(Like.content_id == content.id, Like.user_id == current_user.id)
-                .first()
-                is not None
-            )
-            is_bookmarked = (
-                db.query(Bookmark)
-                .filter(
-                    Bookmark.content_id == content.id,
-                    Bookmark.user_id == current_user.id,
-                )
-                .first()
-                is not None
-            )
-
-        result.append(
-            ContentWithDetails(
-                **Content.model_validate(content).model_dump(),
-                author=content.author,
-                tags=content.tags,
-                like_count=like_count,
-                comment_count=comment_count,
-                is_liked=is_liked,
-                is_bookmarked=is_bookmarked,
-            )
-        )
-
-    return result
+    return hydrate_content_details(db, contents, current_user)
 
 
 @router.post("", response_model=Content, status_code=status.HTTP_201_CREATED)
@@ -105,6 +61,7 @@ async def create_content(
     db.add(content)
     db.commit()
     db.refresh(content)
+    feed_cache.invalidate_all()
     return content
 
 
@@ -126,44 +83,7 @@ async def get_content(
             status_code=status.HTTP_404_NOT_FOUND, detail="Content not found"
         )
 
-    like_count = (
-        db.query(func.count(Like.user_id))
-        .filter(Like.content_id == content.id)
-        .scalar()
-    )
-    comment_count = (
-        db.query(func.count(Comment.id))
-        .filter(Comment.content_id == content.id)
-        .scalar()
-    )
-
-    is_liked = False
-    is_bookmarked = False
-    if current_user:
-        is_liked = (
-            db.query(Like)
-            .filter(Like.content_id == content.id, Like.user_id == current_user.id)
-            .first()
-            is not None
-        )
-        is_bookmarked = (
-            db.query(Bookmark)
-            .filter(
-                Bookmark.content_id == content.id, Bookmark.user_id == current_user.id
-            )
-            .first()
-            is not None
-        )
-
-    return ContentWithDetails(
-        **Content.model_validate(content).model_dump(),
-        author=content.author,
-        tags=content.tags,
-        like_count=like_count,
-        comment_count=comment_count,
-        is_liked=is_liked,
-        is_bookmarked=is_bookmarked,
-    )
+    return hydrate_content_details(db, [content], current_user)[0]
 
 
 @router.patch("/{content_id}", response_model=Content)
@@ -195,6 +115,7 @@ async def update_content(
 
     db.commit()
     db.refresh(content)
+    feed_cache.invalidate_all()
     return content
 
 
@@ -218,3 +139,6 @@ async def delete_content(
 
     db.delete(content)
     db.commit()
+    feed_cache.discard_content(content_id)
+    counter_cache.invalidate(content_id)
+    trending_engine.discard(content_id)
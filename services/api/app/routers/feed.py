@@ -1,73 +1,49 @@
+from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session, joinedload
 
 from app.db import get_db
-from app.models.bookmark import Bookmark
-from app.models.comment import Comment
 from app.models.content import Content as ContentModel
-from app.models.like import Like
 from app.models.tag import Tag as TagModel
 from app.models.user import User as UserModel
 from app.models.user_interest import UserInterest
-from app.models.view_event import ViewEvent as ViewEventModel
 from app.routers.auth import get_current_user
-from app.schemas.content import ContentFeedItem
 from app.schemas.feed import FeedResponse, FollowTagRequest
 from app.schemas.feed import UserInterest as UserInterestSchema
 from app.schemas.view_event import ViewEventCreate
-from app.services.algorithm import calculate_feed_score
+from app.services.cursors import decode_keyset_cursor, encode_keyset_cursor
+from app.services.feed_cache import feed_cache
+from app.services.feed_pipeline import rank_for_you
+from app.services.feed_snapshots import (
+    decode_snapshot_cursor,
+    encode_snapshot_cursor,
+    feed_snapshots,
+)
+from app.services.hydration import hydrate_feed_items
+from app.services.interests import (
+    decayed_score,
+    decayed_score_sql,
+    set_tag_followed,
+)
+from app.services.trending import trending_engine
+from app.services.view_ingest import PendingView, view_ingest
 
 router = APIRouter(prefix="/feed", tags=["feed"])
 
 
-def build_feed_item(
-    content: ContentModel, current_user: UserModel, db: Session
-) -> ContentFeedItem:
-    """Build a ContentFeedItem with engagement stats."""
-    like_count = (
-        db.query(func.count(Like.user_id))
-        .filter(Like.content_id == content.id)
-        .scalar()
-    )
-    comment_count = (
-        db.query(func.count(Comment.id))
-        .filter(Comment.content_id == content.id)
-        .scalar()
-    )
-
-    is_liked = (
-        db.query(Like)
-        .filter(Like.content_id == content.id, Like.user_id == current_user.id)
-        .first()
-        is not None
-    )
-    is_bookmarked = (
-        db.query(Bookmark)
-        .filter(Bookmark.content_id == content.id, Bookmark.user_id == current_user.id)
-        .first()
-        is not None
-    )
-
-    return ContentFeedItem(
-        id=content.id,
-        author=content.author,
-        content_type=content.content_type,
-        title=content.title,
-        body=content.body,
-        media_url=content.media_url,
-        thumbnail_url=content.thumbnail_url,
-        duration_seconds=content.duration_seconds,
-        is_company_important=content.is_company_important,
-        tags=content.tags,
-        like_count=like_count,
-        comment_count=comment_count,
-        is_liked=is_liked,
-        is_bookmarked=is_bookmarked,
-        created_at=content.created_at,
+def load_contents_in_order(db: Session, content_ids: list[UUID]) -> list[ContentModel]:
+    """Load contents with author and tags, preserving the given order."""
+    contents = (
+        db.query(ContentModel)
+        .options(joinedload(ContentModel.author), joinedload(ContentModel.tags))
+        .filter(ContentModel.id.in_(content_ids))
+        .all()
     )
+    content_map = {c.id: c for c in contents}
+    return [content_map[cid] for cid in content_ids if cid in content_map]
 
 
 @router.get("", response_model=FeedResponse)
@@ -77,59 +53,40 @@ async def get_feed(
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get personalized content feed (For You)."""
-    # Get user interests
-    interests = (
-        db.query(UserInterest).filter(UserInterest.user_id == current_user.id).all()
-    )
-    interest_map = {i.tag_id: i.score for i in interests}
-
-    # Get content with author and tags
-    query = db.query(ContentModel).options(
-        joinedload(ContentModel.author), joinedload(ContentModel.tags)
-    )
-
-    # Filter by target roles if set
-    query = query.filter(
-        (ContentModel.target_roles.is_(None))
-        | (ContentModel.target_roles.contains([current_user.role]))
-    )
-
-    contents = query.all()
-
-    # Score and sort content
-    scored_contents = []
-    for content in contents:
-        like_count = (
-            db.query(func.count(Like.user_id))
-            .filter(Like.content_id == content.id)
-            .scalar()
-        )
-        comment_count = (
-            db.query(func.count(Comment.id))
-            .filter(Comment.content_id == content.id)
-            .scalar()
-        )
-        score = calculate_feed_score(
-            content, current_user, interest_map, like_count, comment_count
-        )
-        scored_contents.append((score, content))
-
-    scored_contents.sort(key=lambda x: x[0], reverse=True)
-
-    # Handle cursor pagination
-    start_idx = 0
+    """
+    Get personalized content feed (For You).
+
+    The first page ranks the catalogue and freezes the result in a snapshot;
+    `next_cursor` points into that snapshot so later pages only hydrate.
+    """
+    snapshot = None
+    offset = 0
     if cursor:
-        for idx, (_, c) in enumerate(scored_contents):
-            if str(c.id) == cursor:
-                start_idx = idx + 1
-                break
-
-    paginated = scored_contents[start_idx : start_idx + limit]
-    has_more = start_idx + limit < len(scored_contents)
-    next_cursor = str(paginated[-1][1].id) if paginated and has_more else None
+        try:
+            snapshot_id, offset = decode_snapshot_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        snapshot = feed_snapshots.get(snapshot_id, current_user.id)
+
+    if snapshot is None:
+        # First page, or the snapshot expired: re-rank and continue at offset
+        ranked = feed_cache.get(current_user.id, current_user.role)
+        if ranked is None:
+            generation = feed_cache.generation()
+            ranked = rank_for_you(db, current_user, top_k=feed_snapshots.max_items)
+            feed_cache.set(current_user.id, current_user.role, ranked, generation)
+        snapshot = feed_snapshots.create(current_user.id, ranked)
+
+    page_ids = snapshot.content_ids[offset : offset + limit]
+    has_more = offset + limit < len(snapshot.content_ids)
+    next_cursor = (
+        encode_snapshot_cursor(snapshot.id, offset + limit) if has_more else None
+    )
 
-    items = [build_feed_item(content, current_user, db) for _, content in paginated]
+    contents = load_contents_in_order(db, page_ids)
+    items = hydrate_feed_items(db, contents, current_user)
 
     return FeedResponse(items=items, next_cursor=next_cursor, has_more=has_more)
 
@@ -145,6 +102,19 @@ async def get_for_you_feed(
     return await get_feed(cursor=cursor, limit=limit, current_user=current_user, db=db)
 
 
+def keyset_before(cursor: str):
+    """Filter for rows after `cursor` in (created_at DESC, id DESC) order."""
+    try:
+        created_at, content_id = decode_keyset_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return tuple_(ContentModel.created_at, ContentModel.id) < tuple_(
+        created_at, content_id
+    )
+
+
 @router.get("/following", response_model=FeedResponse)
 async def get_following_feed(
     cursor: str | None = None,
@@ -172,26 +142,23 @@ async def get_following_feed(
     query = (
         db.query(ContentModel)
         .options(joinedload(ContentModel.author), joinedload(ContentModel.tags))
-        .join(ContentModel.tags)
-        .filter(TagModel.id.in_(followed_tag_ids))
-        .order_by(ContentModel.created_at.desc())
-        .distinct()
+        .filter(ContentModel.tags.any(TagModel.id.in_(followed_tag_ids)))
+        .order_by(ContentModel.created_at.desc(), ContentModel.id.desc())
     )
 
-    # Cursor pagination
     if cursor:
-        cursor_content = (
-            db.query(ContentModel).filter(ContentModel.id == cursor).first()
-        )
-        if cursor_content:
-            query = query.filter(ContentModel.created_at < cursor_content.created_at)
+        query = query.filter(keyset_before(cursor))
 
     contents = query.limit(limit + 1).all()
     has_more = len(contents) > limit
     contents = contents[:limit]
 
-    next_cursor = str(contents[-1].id) if contents and has_more else None
-    items = [build_feed_item(c, current_user, db) for c in contents]
+    next_cursor = (
+        encode_keyset_cursor(contents[-1].created_at, contents[-1].id)
+        if contents and has_more
+        else None
+    )
+    items = hydrate_feed_items(db, contents, current_user)
 
     return FeedResponse(items=items, next_cursor=next_cursor, has_more=has_more)
 
@@ -207,7 +174,7 @@ async def get_discover_feed(
     # Get user's high-interest tags
     high_interest = (
         db.query(UserInterest)
-        .filter(UserInterest.user_id == current_user.id, UserInterest.score > 0.5)
+        .filter(UserInterest.user_id == current_user.id, decayed_score_sql() > 0.5)
         .all()
     )
     exclude_tag_ids = [i.tag_id for i in high_interest]
@@ -220,82 +187,122 @@ async def get_discover_feed(
         # Exclude content that has the user's high-interest tags
         query = query.filter(~ContentModel.tags.any(TagModel.id.in_(exclude_tag_ids)))
 
-    query = query.order_by(ContentModel.created_at.desc())
+    query = query.order_by(ContentModel.created_at.desc(), ContentModel.id.desc())
 
     if cursor:
-        cursor_content = (
-            db.query(ContentModel).filter(ContentModel.id == cursor).first()
-        )
-        if cursor_content:
-            query = query.filter(ContentModel.created_at < cursor_content.created_at)
+        query = query.filter(keyset_before(cursor))
 
     contents = query.limit(limit + 1).all()
     has_more = len(contents) > limit
     contents = contents[:limit]
 
-    next_cursor = str(contents[-1].id) if contents and has_more else None
-    items = [build_feed_item(c, current_user, db) for c in contents]
+    next_cursor = (
+        encode_keyset_cursor(contents[-1].created_at, contents[-1].id)
+        if contents and has_more
+        else None
+    )
+    items = hydrate_feed_items(db, contents, current_user)
 
     return FeedResponse(items=items, next_cursor=next_cursor, has_more=has_more)
 
 
-@router.post("/view")
-async def record_view(
-    view_data: ViewEventCreate,
+@router.get("/trending", response_model=FeedResponse)
+async def get_trending_feed(
+    limit: int = Query(10, ge=1, le=50),
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Record a view event for content."""
-    view = ViewEventModel(
-        user_id=current_user.id,
-        content_id=view_data.content_id,
-        view_duration_seconds=view_data.view_duration_seconds,
-        completion_percent=view_data.completion_percent,
-    )
-    db.add(view)
-
-    # Update user interests based on view
-    content = (
-        db.query(ContentModel)
-        .options(joinedload(ContentModel.tags))
-        .filter(ContentModel.id == view_data.content_id)
-        .first()
-    )
-    if content and content.tags:
-        for tag in content.tags:
-            interest = (
-                db.query(UserInterest)
-                .filter(
-                    UserInterest.user_id == current_user.id,
-                    UserInterest.tag_id == tag.id,
-                )
-                .first()
+    """
+    Get content trending right now.
+
+    Ranked by the in-process trending engine's decayed engagement scores,
+    so only the returned page is read from the database.
+    """
+    # Over-fetch so role-targeted posts the user can't see don't empty the page
+    ranked = [cid for cid, _ in trending_engine.top("trending", limit * 3)]
+    contents = [
+        content
+        for content in load_contents_in_order(db, ranked)
+        if not content.target_roles or current_user.role in content.target_roles
+    ][:limit]
+    items = hydrate_feed_items(db, contents, current_user)
+
+    return FeedResponse(items=items, next_cursor=None, has_more=False)
+
+
+# Most view events accepted in one POST /feed/views request
+MAX_VIEW_BATCH = 200
+
+
+def queue_views(user: UserModel, views: list[ViewEventCreate]) -> None:
+    """Hand views to the ingestion buffer, or 503 if it is full."""
+    accepted = view_ingest.submit(
+        [
+            PendingView(
+                user_id=user.id,
+                content_id=view.content_id,
+                view_duration_seconds=view.view_duration_seconds,
+                completion_percent=view.completion_percent,
             )
-            if not interest:
-                interest = UserInterest(
-                    user_id=current_user.id, tag_id=tag.id, score=0.0
-                )
-                db.add(interest)
+            for view in views
+        ]
+    )
+    if not accepted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="View ingestion is overloaded, retry later",
+            headers={"Retry-After": "1"},
+        )
 
-            # Increase score based on completion (max +0.1 per view)
-            score_increase = min(view_data.completion_percent / 100.0, 1.0) * 0.1
-            interest.score = min(interest.score + score_increase, 1.0)
 
-            # Auto-subscribe if score crosses threshold
-            if interest.score > 0.7 and not interest.is_auto_subscribed:
-                interest.is_auto_subscribed = True
+@router.post("/view", status_code=status.HTTP_202_ACCEPTED)
+async def record_view(
+    view_data: ViewEventCreate,
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Record a view event for content.
 
-    db.commit()
+    The event is queued and written in a batch shortly after (see
+    `view_ingest`); counters and interests update when the batch lands.
+    """
+    queue_views(current_user, [view_data])
     return {"status": "ok"}
 
 
+@router.post("/views", status_code=status.HTTP_202_ACCEPTED)
+async def record_views(
+    views: list[ViewEventCreate] = Body(..., max_length=MAX_VIEW_BATCH),
+    current_user: UserModel = Depends(get_current_user),
+):
+    """
+    Record a whole scroll session's view events in one request.
+
+    The views are queued together, so interest updates for the session are
+    folded per tag when the batch is written.
+    """
+    queue_views(current_user, views)
+    return {"status": "ok", "accepted": len(views)}
+
+
 @router.get("/interests", response_model=list[UserInterestSchema])
 async def get_interests(
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get user's tag interests."""
-    return db.query(UserInterest).filter(UserInterest.user_id == current_user.id).all()
+    """Get user's tag interests, with scores decayed to now."""
+    interests = db.query(UserInterest).filter(UserInterest.user_id == current_user.id)
+    now = datetime.now(timezone.utc)
+    return [
+        UserInterestSchema(
+            user_id=interest.user_id,
+            tag_id=interest.tag_id,
+            score=decayed_score(interest, now),
+            is_auto_subscribed=interest.is_auto_subscribed,
+            is_manually_followed=interest.is_manually_followed,
+        )
+        for interest in interests
+    ]
 
 
 @router.post("/interests/{tag_id}/follow")
@@ -306,22 +313,7 @@ async def follow_tag(
     db: Session = Depends(get_db),
 ):
     """Manually follow/unfollow a tag."""
-    interest = (
-        db.query(UserInterest)
-        .filter(UserInterest.user_id == current_user.id, UserInterest.tag_id == tag_id)
-        .first()
-    )
-
-    if not interest:
-        interest = UserInterest(
-            user_id=current_user.id,
-            tag_id=tag_id,
-            score=0.5,
-            is_manually_followed=request.follow,
-        )
-        db.add(interest)
-    else:
-        interest.is_manually_followed = request.follow
-
+    set_tag_followed(db, current_user.id, tag_id, request.follow)
     db.commit()
+    feed_cache.invalidate_user(current_user.id)
     return {"status": "ok", "is_following": request.follow}
@@ -1,6 +1,8 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
 from app.db import get_db
@@ -9,11 +11,62 @@ from app.models.content import Content as ContentModel
 from app.models.like import Like
 from app.models.user import User as UserModel
 from app.routers.auth import get_current_user
-from app.schemas.content import Content, ContentWithDetails
+from app.schemas.content import ContentState, ContentStateRequest, ContentWithDetails
+from app.services.cursors import decode_keyset_cursor, encode_keyset_cursor
+from app.services.hydration import fetch_engagement, hydrate_content_details
+from app.services.interactions import LikeResult, set_bookmark, set_like
+from app.services.like_counts import like_counts
+from app.services.trending import trending_engine
 
 router = APIRouter(tags=["interactions"])
 
 
+def _content_not_found(db: Session) -> HTTPException:
+    """Roll back a write that hit the content foreign key and build the 404."""
+    db.rollback()
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Content not found"
+    )
+
+
+def _apply_like(db: Session, user: UserModel, content_id: UUID, liked: bool) -> dict:
+    try:
+        result = set_like(db, user.id, content_id, liked)
+        db.commit()
+    except IntegrityError:
+        raise _content_not_found(db)
+    return _like_response(result, content_id, liked)
+
+
+def _like_response(result: LikeResult, content_id: UUID, liked: bool) -> dict:
+    """Feed a committed like change to the accumulators and build the response."""
+    if result.changed:
+        pending = like_counts.add(content_id, 1 if liked else -1)
+    else:
+        pending = like_counts.pending([content_id]).get(content_id, 0)
+    if liked and result.changed:
+        trending_engine.record(content_id, "like")
+    return {
+        "status": "liked" if liked else "unliked",
+        "is_liked": liked,
+        "like_count": max(result.like_count + pending, 0),
+    }
+
+
+def _apply_bookmark(
+    db: Session, user: UserModel, content_id: UUID, bookmarked: bool
+) -> dict:
+    try:
+        set_bookmark(db, user.id, content_id, bookmarked)
+        db.commit()
+    except IntegrityError:
+        raise _content_not_found(db)
+    return {
+        "status": "bookmarked" if bookmarked else "unbookmarked",
+        "is_bookmarked": bookmarked,
+    }
+
+
 @router.post("/content/{content_id}/like")
 async def toggle_like(
     content_id: UUID,
@@ -21,27 +74,32 @@ async def toggle_like(
     db: Session = Depends(get_db),
 ):
     """Toggle like on content."""
-    content = db.query(ContentModel).filter(ContentModel.id == content_id).first()
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Content not found"
-        )
+    # Unlike if liked; otherwise fall through to a like
+    result = set_like(db, current_user.id, content_id, liked=False)
+    if result.changed:
+        db.commit()
+        return _like_response(result, content_id, liked=False)
+    return _apply_like(db, current_user, content_id, liked=True)
 
-    existing_like = (
-        db.query(Like)
-        .filter(Like.content_id == content_id, Like.user_id == current_user.id)
-        .first()
-    )
 
-    if existing_like:
-        db.delete(existing_like)
-        db.commit()
-        return {"status": "unliked", "is_liked": False}
-    else:
-        like = Like(content_id=content_id, user_id=current_user.id)
-        db.add(like)
-        db.commit()
-        return {"status": "liked", "is_liked": True}
+@router.put("/content/{content_id}/like")
+async def like_content(
+    content_id: UUID,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Like content (idempotent); returns the new like count."""
+    return _apply_like(db, current_user, content_id, liked=True)
+
+
+@router.delete("/content/{content_id}/like")
+async def unlike_content(
+    content_id: UUID,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Remove a like (idempotent); returns the new like count."""
+    return _apply_like(db, current_user, content_id, liked=False)
 
 
 @router.post("/content/{content_id}/bookmark")
@@ -51,159 +109,128 @@ async def toggle_bookmark(
     db: Session = Depends(get_db),
 ):
     """Toggle bookmark on content."""
-    content = db.query(ContentModel).filter(ContentModel.id == content_id).first()
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Content not found"
-        )
-
-    existing_bookmark = (
-        db.query(Bookmark)
-        .filter(Bookmark.content_id == content_id, Bookmark.user_id == current_user.id)
-        .first()
-    )
-
-    if existing_bookmark:
-        db.delete(existing_bookmark)
+    if set_bookmark(db, current_user.id, content_id, bookmarked=False):
         db.commit()
         return {"status": "unbookmarked", "is_bookmarked": False}
-    else:
-        bookmark = Bookmark(content_id=content_id, user_id=current_user.id)
-        db.add(bookmark)
-        db.commit()
-        return {"status": "bookmarked", "is_bookmarked": True}
+    return _apply_bookmark(db, current_user, content_id, bookmarked=True)
 
 
-@router.get("/bookmarks", response_model=list[ContentWithDetails])
-async def get_bookmarks(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+@router.put("/content/{content_id}/bookmark")
+async def bookmark_content(
+    content_id: UUID,
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get user's bookmarked content."""
-    from sqlalchemy import func
-
-    from app.models.comment import Comment
-
-    bookmarks = (
-        db.query(Bookmark)
-        .filter(Bookmark.user_id == current_user.id)
-        .order_by(Bookmark.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    """Bookmark content (idempotent)."""
+    return _apply_bookmark(db, current_user, content_id, bookmarked=True)
 
-    content_ids = [b.content_id for b in bookmarks]
-    contents = (
-        db.query(ContentModel)
-        .options(joinedload(ContentModel.author), joinedload(ContentModel.tags))
-        .filter(ContentModel.id.in_(content_ids))
-        .all()
-    )
 
-    # Maintain bookmark order
-    content_map = {c.id: c for c in contents}
-    ordered_contents = [content_map[cid] for cid in content_ids if cid in content_map]
+@router.delete("/content/{content_id}/bookmark")
+async def unbookmark_content(
+    content_id: UUID,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Remove a bookmark (idempotent)."""
+    return _apply_bookmark(db, current_user, content_id, bookmarked=False)
+
 
-    result = []
-    for content in ordered_contents:
-        like_count = (
-            db.query(func.count(Like.user_id))
-            .filter(Like.content_id == content.id)
-            .scalar()
+@router.post("/content/state", response_model=list[ContentState])
+async def get_content_state(
+    request: ContentStateRequest,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Get counts and the user's like/bookmark state for many content items.
+
+    Costs a constant number of queries however many IDs are sent; unknown
+    IDs come back with zero counts.
+    """
+    content_ids = list(dict.fromkeys(request.content_ids))
+    engagement = fetch_engagement(db, content_ids, current_user.id)
+    return [
+        ContentState(
+            content_id=cid,
+            like_count=engagement[cid].like_count,
+            comment_count=engagement[cid].comment_count,
+            is_liked=engagement[cid].is_liked,
+            is_bookmarked=engagement[cid].is_bookmarked,
         )
-        comment_count = (
-            db.query(func.count(Comment.id))
-            .filter(Comment.content_id == content.id)
-            .scalar()
+        for cid in content_ids
+    ]
+
+
+def saved_content_page(
+    db: Session,
+    model: type[Like] | type[Bookmark],
+    user: UserModel,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+    response: Response,
+) -> list[ContentWithDetails]:
+    """
+    One page of a user's liked or bookmarked content, newest first.
+
+    Pages are keyset-paginated on (created_at, content_id): the cursor for
+    the next page is returned in the `X-Next-Cursor` header so the body
+    stays a plain list. Content, author and tags load in a single join.
+    """
+    query = (
+        db.query(ContentModel)
+        .join(model, model.content_id == ContentModel.id)
+        .options(joinedload(ContentModel.author), joinedload(ContentModel.tags))
+        .filter(model.user_id == user.id)
+        .order_by(model.created_at.desc(), model.content_id.desc())
+        .add_columns(model.created_at)
+    )
+    if cursor:
+        try:
+            created_at, content_id = decode_keyset_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        query = query.filter(
+            tuple_(model.created_at, model.content_id) < tuple_(created_at, content_id)
         )
-        is_liked = (
-            db.query(Like)
-            .filter(Like.content_id == content.id, Like.user_id == current_user.id)
-            .first()
-            is not None
+    elif skip:
+        # Legacy offset paging for clients that haven't moved to cursors
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        last_content, last_saved_at = rows[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_keyset_cursor(
+            last_saved_at, last_content.id
         )
+    contents = [content for content, _ in rows[:limit]]
+
+    return hydrate_content_details(db, contents, user)
 
-        result.append(
-            ContentWithDetails(
-                **Content.model_validate(content).model_dump(),
-                author=content.author,
-                tags=content.tags,
-                like_count=like_count,
-                comment_count=comment_count,
-                is_liked=is_liked,
-                is_bookmarked=True,
-            )
-        )
 
-    return result
+@router.get("/bookmarks", response_model=list[ContentWithDetails])
+async def get_bookmarks(
+    response: Response,
+    cursor: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get user's bookmarked content (next page cursor in `X-Next-Cursor`)."""
+    return saved_content_page(db, Bookmark, current_user, cursor, skip, limit, response)
 
 
 @router.get("/likes", response_model=list[ContentWithDetails])
 async def get_liked_content(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(20, ge=1, le=100),
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get user's liked content."""
-    from sqlalchemy import func
-
-    from app.models.comment import Comment
-
-    likes = (
-        db.query(Like)
-        .filter(Like.user_id == current_user.id)
-        .order_by(Like.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
-
-    content_ids = [like.content_id for like in likes]
-    contents = (
-        db.query(ContentModel)
-        .options(joinedload(ContentModel.author), joinedload(ContentModel.tags))
-        .filter(ContentModel.id.in_(content_ids))
-        .all()
-    )
-
-    content_map = {c.id: c for c in contents}
-    ordered_contents = [content_map[cid] for cid in content_ids if cid in content_map]
-
-    result = []
-    for content in ordered_contents:
-        like_count = (
-            db.query(func.count(Like.user_id))
-            .filter(Like.content_id == content.id)
-            .scalar()
-        )
-        comment_count = (
-            db.query(func.count(Comment.id))
-            .filter(Comment.content_id == content.id)
-            .scalar()
-        )
-        is_bookmarked = (
-            db.query(Bookmark)
-            .filter(
-                Bookmark.content_id == content.id, Bookmark.user_id == current_user.id
-            )
-            .first()
-            is not None
-        )
-
-        result.append(
-            ContentWithDetails(
-                **Content.model_validate(content).model_dump(),
-                author=content.author,
-                tags=content.tags,
-                like_count=like_count,
-                comment_count=comment_count,
-                is_liked=True,
-                is_bookmarked=is_bookmarked,
-            )
-        )
-
-    return result
+    """Get user's liked content (next page cursor in `X-Next-Cursor`)."""
+    return saved_content_page(db, Like, current_user, cursor, skip, limit, response)
@@ -1,10 +1,13 @@
+import asyncio
 from datetime import datetime, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
+from app.config import settings
 from app.db import get_db
 from app.models.conversation import Conversation as ConversationModel
 from app.models.conversation import ConversationParticipant as ParticipantModel
@@ -14,125 +17,116 @@ from app.routers.auth import get_current_user
 from app.schemas.message import (
     Conversation,
     ConversationCreate,
-    ConversationParticipant,
     ConversationWithMessages,
     MessageCreate,
+    MessageSearchResult,
     MessageWithSender,
 )
 from app.schemas.user import UserPublic
+from app.services import message_search, user_search
+from app.services.cursors import decode_keyset_cursor, encode_keyset_cursor
+from app.services.inbox import (
+    fetch_conversation,
+    fetch_conversations,
+    fetch_message_page,
+    mark_read,
+    message_with_sender,
+    open_direct_conversation,
+    participant_list,
+    record_message,
+)
+from app.services.message_search import decode_search_cursor, encode_search_cursor
+from app.services.realtime import format_sse, realtime_hub
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
 
-def get_conversation_response(
-    conversation: ConversationModel, current_user_id: UUID, db: Session
-) -> Conversation:
-    """Build a Conversation response with last message and unread count."""
-    # Get last message
-    last_message_model = (
-        db.query(MessageModel)
-        .options(joinedload(MessageModel.sender))
-        .filter(MessageModel.conversation_id == conversation.id)
-        .order_by(MessageModel.created_at.desc())
-        .first()
-    )
-
-    last_message = None
-    if last_message_model:
-        last_message = MessageWithSender(
-            id=last_message_model.id,
-            conversation_id=last_message_model.conversation_id,
-            sender_id=last_message_model.sender_id,
-            body=last_message_model.body,
-            created_at=last_message_model.created_at,
-            updated_at=last_message_model.updated_at,
-            sender=last_message_model.sender,
+def _decode_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    if not cursor:
+        return None
+    try:
+        return decode_keyset_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
         )
 
-    # Get current user's participant record for unread count
-    current_participant = (
-        db.query(ParticipantModel)
-        .filter(
-            ParticipantModel.conversation_id == conversation.id,
-            ParticipantModel.user_id == current_user_id,
-        )
-        .first()
-    )
 
-    unread_count = 0
-    if current_participant and current_participant.last_read_at:
-        unread_count = (
-            db.query(func.count(MessageModel.id))
-            .filter(
-                MessageModel.conversation_id == conversation.id,
-                MessageModel.created_at > current_participant.last_read_at,
-                MessageModel.sender_id != current_user_id,
-            )
-            .scalar()
-        )
-    elif current_participant:
-        # Never read - count all messages from others
-        unread_count = (
-            db.query(func.count(MessageModel.id))
-            .filter(
-                MessageModel.conversation_id == conversation.id,
-                MessageModel.sender_id != current_user_id,
-            )
-            .scalar()
-        )
+def _publish_read(
+    conversation_id: UUID,
+    user_id: UUID,
+    read_at: datetime,
+    recipients: list[UUID],
+) -> None:
+    """Tell a conversation's participants that one of them has read it."""
+    realtime_hub.publish(
+        "conversation.read",
+        recipients,
+        {"conversation_id": conversation_id, "user_id": user_id, "read_at": read_at},
+    )
 
-    # Build participants with user info
-    participants = []
-    for p in conversation.participants:
-        participants.append(
-            ConversationParticipant(
-                id=p.id,
-                conversation_id=p.conversation_id,
-                user_id=p.user_id,
-                joined_at=p.joined_at,
-                last_read_at=p.last_read_at,
-                user=p.user,
-            )
-        )
 
-    return Conversation(
-        id=conversation.id,
-        created_at=conversation.created_at,
-        updated_at=conversation.updated_at,
-        participants=participants,
-        last_message=last_message,
-        unread_count=unread_count,
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-sent event stream of the current user's messaging events.
+
+    Delivers `message.created`, `conversation.read` and `conversation.updated`
+    as they are committed, with a comment line as keepalive. Replaces
+    polling conversations for new messages.
+    """
+    user_id = current_user.id
+    # Don't pin a pooled connection for the life of the stream
+    db.close()
+    subscription = realtime_hub.subscribe(user_id)
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.realtime_keepalive_seconds,
+                    )
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            realtime_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/conversations", response_model=list[Conversation])
 async def list_conversations(
-    skip: int = Query(0, ge=0),
+    response: Response,
+    cursor: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(50, ge=1, le=100),
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """List the current user's conversations."""
-    # Get conversation IDs where user is a participant
-    conversation_ids = (
-        db.query(ParticipantModel.conversation_id)
-        .filter(ParticipantModel.user_id == current_user.id)
-        .subquery()
-    )
+    """
+    List the current user's conversations, most recently active first.
 
-    conversations = (
-        db.query(ConversationModel)
-        .options(
-            joinedload(ConversationModel.participants).joinedload(ParticipantModel.user)
-        )
-        .filter(ConversationModel.id.in_(conversation_ids))
-        .order_by(ConversationModel.updated_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    The cursor for the next page is returned in the `X-Next-Cursor` header.
+    """
+    conversations, next_after = fetch_conversations(
+        db, current_user.id, after=_decode_cursor(cursor), limit=limit, skip=skip
     )
-
-    return [get_conversation_response(c, current_user.id, db) for c in conversations]
+    if next_after is not None:
+        response.headers["X-Next-Cursor"] = encode_keyset_cursor(*next_after)
+    return conversations
 
 
 @router.post(
@@ -161,32 +155,23 @@ async def create_conversation(
             detail="One or more participants not found",
         )
 
-    # Check if a 1:1 conversation already exists between these users
+    # A 1:1 conversation is opened if it already exists
     if len(participant_ids) == 2:
-        # Find conversations where both users are participants
-        existing = (
-            db.query(ConversationModel)
-            .join(ParticipantModel)
-            .filter(ParticipantModel.user_id == current_user.id)
-            .all()
-        )
-
-        for conv in existing:
-            conv_participant_ids = {p.user_id for p in conv.participants}
-            if conv_participant_ids == participant_ids:
-                # Return existing conversation
-                db.refresh(conv)
-                return get_conversation_response(conv, current_user.id, db)
-
-    # Create new conversation
-    conversation = ConversationModel()
-    db.add(conversation)
-    db.flush()
+        conversation_id, created = open_direct_conversation(db, participant_ids)
+        if not created:
+            existing = fetch_conversation(db, current_user.id, conversation_id)
+            db.commit()
+            return existing
+    else:
+        conversation = ConversationModel()
+        db.add(conversation)
+        db.flush()
+        conversation_id = conversation.id
 
     # Add participants
     for user_id in participant_ids:
         participant = ParticipantModel(
-            conversation_id=conversation.id,
+            conversation_id=conversation_id,
             user_id=user_id,
         )
         db.add(participant)
@@ -194,34 +179,40 @@ async def create_conversation(
     # Add initial message if provided
     if data.initial_message:
         message = MessageModel(
-            conversation_id=conversation.id,
+            conversation_id=conversation_id,
             sender_id=current_user.id,
             body=data.initial_message,
         )
         db.add(message)
+        db.flush()
+        record_message(db, message)
 
     db.commit()
 
-    # Reload with relationships
-    conversation = (
-        db.query(ConversationModel)
-        .options(
-            joinedload(ConversationModel.participants).joinedload(ParticipantModel.user)
-        )
-        .filter(ConversationModel.id == conversation.id)
-        .first()
+    realtime_hub.publish(
+        "conversation.updated",
+        list(participant_ids),
+        {"conversation_id": conversation_id, "reason": "created"},
     )
-
-    return get_conversation_response(conversation, current_user.id, db)
+    return fetch_conversation(db, current_user.id, conversation_id)
 
 
 @router.get("/conversations/{conversation_id}", response_model=ConversationWithMessages)
 async def get_conversation(
     conversation_id: UUID,
+    before: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get a conversation with all its messages."""
+    """
+    Get a conversation with its latest `limit` messages.
+
+    Older history is loaded by passing `next_cursor` as `before`, here or to
+    the messages endpoint. Opening the latest window marks the conversation
+    read.
+    """
+    before_key = _decode_cursor(before)
     # Verify user is a participant
     participant = (
         db.query(ParticipantModel)
@@ -247,53 +238,68 @@ async def get_conversation(
         .first()
     )
 
-    # Get messages with senders
-    messages = (
-        db.query(MessageModel)
-        .options(joinedload(MessageModel.sender))
-        .filter(MessageModel.conversation_id == conversation_id)
-        .order_by(MessageModel.created_at.asc())
-        .all()
+    messages, next_before = fetch_message_page(
+        db, conversation_id, before=before_key, limit=limit
+    )
+    result = ConversationWithMessages(
+        id=conversation.id,
+        created_at=conversation.created_at,
+        updated_at=conversation.updated_at,
+        participants=participant_list(conversation),
+        messages=[message_with_sender(m, m.sender) for m in messages],
+        next_cursor=encode_keyset_cursor(*next_before) if next_before else None,
+        latest_cursor=(
+            encode_keyset_cursor(messages[-1].created_at, messages[-1].id)
+            if messages
+            else None
+        ),
     )
 
-    # Update last_read_at
-    participant.last_read_at = datetime.now(timezone.utc)
-    db.commit()
+    if before_key is None:
+        mark_read(participant)
+        read_at = participant.last_read_at
+        recipients = [p.user_id for p in conversation.participants]
+        db.commit()
+        _publish_read(conversation_id, current_user.id, read_at, recipients)
+
+    return result
+
+
+@router.post(
+    "/conversations/{conversation_id}/read", status_code=status.HTTP_204_NO_CONTENT
+)
+async def mark_conversation_read(
+    conversation_id: UUID,
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Mark a conversation as read without loading its messages."""
+    participant = (
+        db.query(ParticipantModel)
+        .filter(
+            ParticipantModel.conversation_id == conversation_id,
+            ParticipantModel.user_id == current_user.id,
+        )
+        .first()
+    )
 
-    # Build participants
-    participants = [
-        ConversationParticipant(
-            id=p.id,
-            conversation_id=p.conversation_id,
-            user_id=p.user_id,
-            joined_at=p.joined_at,
-            last_read_at=p.last_read_at,
-            user=p.user,
+    if not participant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
         )
-        for p in conversation.participants
-    ]
 
-    # Build messages
-    message_list = [
-        MessageWithSender(
-            id=m.id,
-            conversation_id=m.conversation_id,
-            sender_id=m.sender_id,
-            body=m.body,
-            created_at=m.created_at,
-            updated_at=m.updated_at,
-            sender=m.sender,
+    mark_read(participant)
+    read_at = participant.last_read_at
+    db.commit()
+
+    recipients = [
+        user_id
+        for (user_id,) in db.query(ParticipantModel.user_id).filter(
+            ParticipantModel.conversation_id == conversation_id
         )
-        for m in messages
     ]
-
-    return ConversationWithMessages(
-        id=conversation.id,
-        created_at=conversation.created_at,
-        updated_at=conversation.updated_at,
-        participants=participants,
-        messages=message_list,
-    )
+    _publish_read(conversation_id, current_user.id, read_at, recipients)
 
 
 @router.delete(
@@ -321,6 +327,11 @@ async def leave_conversation(
         )
 
     db.delete(participant)
+    # A DM someone has left is no longer the pair's DM; opening one again
+    # starts a new conversation
+    db.query(ConversationModel).filter(ConversationModel.id == conversation_id).update(
+        {ConversationModel.dm_key: None}
+    )
 
     # If no participants left, delete the conversation
     remaining = (
@@ -340,18 +351,50 @@ async def leave_conversation(
 
     db.commit()
 
+    recipients = [
+        user_id
+        for (user_id,) in db.query(ParticipantModel.user_id).filter(
+            ParticipantModel.conversation_id == conversation_id
+        )
+    ]
+    realtime_hub.publish(
+        "conversation.updated",
+        [*recipients, current_user.id],
+        {
+            "conversation_id": conversation_id,
+            "reason": "participant_left",
+            "user_id": current_user.id,
+        },
+    )
+
 
 @router.get(
     "/conversations/{conversation_id}/messages", response_model=list[MessageWithSender]
 )
 async def get_messages(
     conversation_id: UUID,
-    skip: int = Query(0, ge=0),
+    response: Response,
+    before: str | None = None,
+    after: str | None = None,
+    skip: int = Query(0, ge=0, deprecated=True),
     limit: int = Query(50, ge=1, le=100),
     current_user: UserModel = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get paginated messages from a conversation."""
+    """
+    Get a window of messages from a conversation, oldest first.
+
+    Pass `before` to page back through history, or `after` to catch up on
+    newer messages. The cursor for the next window in the same direction is
+    returned in the `X-Next-Cursor` header; when catching up it is always
+    set, so clients can keep polling with it.
+    """
+    if before and after:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass at most one of before and after",
+        )
+    before_key, after_key = _decode_cursor(before), _decode_cursor(after)
     # Verify user is a participant
     participant = (
         db.query(ParticipantModel)
@@ -368,31 +411,12 @@ async def get_messages(
             detail="Conversation not found",
         )
 
-    messages = (
-        db.query(MessageModel)
-        .options(joinedload(MessageModel.sender))
-        .filter(MessageModel.conversation_id == conversation_id)
-        .order_by(MessageModel.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    messages, next_key = fetch_message_page(
+        db, conversation_id, before_key, after_key, limit, skip
     )
-
-    # Reverse to get chronological order
-    messages = list(reversed(messages))
-
-    return [
-        MessageWithSender(
-            id=m.id,
-            conversation_id=m.conversation_id,
-            sender_id=m.sender_id,
-            body=m.body,
-            created_at=m.created_at,
-            updated_at=m.updated_at,
-            sender=m.sender,
-        )
-        for m in messages
-    ]
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_keyset_cursor(*next_key)
+    return [message_with_sender(m, m.sender) for m in messages]
 
 
 @router.post(
@@ -429,6 +453,8 @@ async def send_message(
         body=data.body,
     )
     db.add(message)
+    db.flush()
+    recipients = record_message(db, message)
 
     # Update conversation's updated_at
     conversation = (
@@ -438,21 +464,48 @@ async def send_message(
     )
     conversation.updated_at = datetime.now(timezone.utc)
 
-    # Update sender's last_read_at
-    participant.last_read_at = datetime.now(timezone.utc)
-
     db.commit()
     db.refresh(message)
 
-    return MessageWithSender(
-        id=message.id,
-        conversation_id=message.conversation_id,
-        sender_id=message.sender_id,
-        body=message.body,
-        created_at=message.created_at,
-        updated_at=message.updated_at,
-        sender=current_user,
+    response = message_with_sender(message, current_user)
+    realtime_hub.publish(
+        "message.created",
+        recipients,
+        {"conversation_id": conversation_id, "message": response.model_dump()},
+        fallback={"conversation_id": conversation_id, "message_id": message.id},
+    )
+    return response
+
+
+@router.get("/search", response_model=list[MessageSearchResult])
+async def search_messages(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=50),
+    current_user: UserModel = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Search the current user's conversations, best matches first.
+
+    The cursor for the next page is returned in the `X-Next-Cursor` header.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
+    results, next_after = message_search.search_messages(
+        db, current_user.id, q, after=after, limit=limit
     )
+    if next_after is not None:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(*next_after)
+    return results
 
 
 @router.get("/users/search", response_model=list[UserPublic])
@@ -463,28 +516,4 @@ async def search_users(
     db: Session = Depends(get_db),
 ):
     """Search users by name or email for starting a new conversation."""
-    search_term = f"%{q}%"
-
-    users = (
-        db.query(UserModel)
-        .filter(
-            UserModel.id != current_user.id,
-            or_(
-                UserModel.display_name.ilike(search_term),
-                UserModel.email.ilike(search_term),
-            ),
-        )
-        .limit(limit)
-        .all()
-    )
-
-    return [
-        UserPublic(
-            id=u.id,
-            display_name=u.display_name,
-            avatar_url=u.avatar_url,
-            role=u.role,
-            department=u.department,
-        )
-        for u in users
-    ]
+    return user_search.search_users(db, q, current_user.id, limit=limit)
@@ -6,6 +6,14 @@ from sqlalchemy.orm import Session
 
 from app.db import get_db
 from app.middleware.observability import request_logger
+from app.services.counter_cache import counter_cache
+from app.services.feed_cache import feed_cache
+from app.services.feed_pipeline import pipeline_metrics
+from app.services.like_counts import like_counts
+from app.services.realtime import realtime_hub
+from app.services.trending import trending_engine
+from app.services.user_search import user_search_cache
+from app.services.view_ingest import view_ingest
 
 router = APIRouter(prefix="/qa", tags=["qa"])
 
@@ -86,7 +94,17 @@ async def get_logs(
 @router.get("/metrics")
 async def get_metrics():
     """Get current request metrics."""
-    return request_logger.get_metrics()
+    return {
+        **request_logger.get_metrics(),
+        "feed_pipeline": pipeline_metrics.get_metrics(),
+        "feed_cache": feed_cache.get_metrics(),
+        "counter_cache": counter_cache.get_metrics(),
+        "trending": trending_engine.get_metrics(),
+        "view_ingest": view_ingest.get_metrics(),
+        "like_counts": like_counts.get_metrics(),
+        "realtime": realtime_hub.get_metrics(),
+        "user_search_cache": user_search_cache.get_metrics(),
+    }
 
 
 @router.post("/reset-metrics")
@@ -96,4 +114,12 @@ async def reset_metrics():
     request_logger._request_count_1min = 0
     request_logger._total_response_time_1min = 0.0
     request_logger._logs.clear()
+    pipeline_metrics.reset()
+    feed_cache.reset_metrics()
+    counter_cache.reset_metrics()
+    view_ingest.reset_metrics()
+    like_counts.reset_metrics()
+    realtime_hub.reset_metrics()
+    trending_engine.reset_metrics()
+    user_search_cache.reset_metrics()
     return {"status": "ok", "message": "Metrics reset"}
@@ -1,9 +1,17 @@
 from app.schemas.auth import LoginRequest, LoginResponse, TokenPayload
-from app.schemas.comment import Comment, CommentCreate, CommentUpdate, CommentWithAuthor
+from app.schemas.comment import (
+    Comment,
+    CommentCreate,
+    CommentTreeNode,
+    CommentUpdate,
+    CommentWithAuthor,
+)
 from app.schemas.content import (
     Content,
     ContentCreate,
     ContentFeedItem,
+    ContentState,
+    ContentStateRequest,
     ContentUpdate,
     ContentWithDetails,
 )
@@ -17,11 +25,14 @@ from app.schemas.view_event import ViewEvent, ViewEventCreate
 __all__ = [
     "Comment",
     "CommentCreate",
+    "CommentTreeNode",
     "CommentUpdate",
     "CommentWithAuthor",
     "Content",
     "ContentCreate",
     "ContentFeedItem",
+    "ContentState",
+    "ContentStateRequest",
     "ContentUpdate",
     "ContentWithDetails",
     "FeedResponse",
@@ -33,3 +33,7 @@ class Comment(CommentBase):
 class CommentWithAuthor(Comment):
     author: UserPublic
     reply_count: int = 0
+
+
+class CommentTreeNode(CommentWithAuthor):
+    replies: list["CommentTreeNode"] = []
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models.content import ContentType, SharingPolicy
 from app.schemas.tag import Tag
@@ -76,3 +76,15 @@ class ContentFeedItem(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ContentStateRequest(BaseModel):
+    content_ids: list[UUID] = Field(..., max_length=500)
+
+
+class ContentState(BaseModel):
+    content_id: UUID
+    like_count: int = 0
+    comment_count: int = 0
+    is_liked: bool = False
+    is_bookmarked: bool = False
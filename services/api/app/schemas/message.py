@@ -29,6 +29,12 @@ class MessageWithSender(Message):
     sender: UserPublic
 
 
+class MessageSearchResult(MessageWithSender):
+    rank: float
+    # The matching passages, HTML-escaped, with matches wrapped in <mark></mark>
+    snippet: str
+
+
 class ConversationParticipantBase(BaseModel):
     user_id: UUID
 
@@ -67,3 +73,7 @@ class Conversation(ConversationBase):
 class ConversationWithMessages(ConversationBase):
     participants: list[ConversationParticipant]
     messages: list[MessageWithSender]
+    # Pass as `before` to load older messages; None when there are none
+    next_cursor: str | None = None
+    # Pass as `after` to catch up on messages newer than this window
+    latest_cursor: str | None = None
@@ -1,10 +1,21 @@
 import math
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from uuid import UUID
 
+import numpy as np
+
 from app.models.content import Content
 from app.models.user import User
 
+# Feed scoring weights (shared by the scalar and vectorized scorers)
+COMPANY_IMPORTANT_BOOST = 1000.0
+ROLE_MATCH_BOOST = 100.0
+UNTARGETED_BOOST = 50.0
+TAG_INTEREST_WEIGHT = 50.0
+ENGAGEMENT_WEIGHT = 10.0
+RECENCY_HALF_LIFE_HOURS = 24.0
+
 
 def calculate_feed_score(
     content: Content,
@@ -23,25 +34,28 @@ def calculate_feed_score(
         score += 50 * user_interest[tag].score
     score *= recency_decay(age_hours)
     score += 10 * sqrt(likes + comments)
+
+    This is the reference implementation; `calculate_feed_scores` must
+    produce the same values for a whole candidate set at once.
     """
     score = 0.0
 
     # Company important content gets massive boost
     if content.is_company_important:
-        score += 1000
+        score += COMPANY_IMPORTANT_BOOST
 
     # Role targeting match
     if content.target_roles:
         if user.role in content.target_roles:
-            score += 100
+            score += ROLE_MATCH_BOOST
     else:
         # No targeting = everyone, small base boost
-        score += 50
+        score += UNTARGETED_BOOST
 
     # Tag interest scoring
     for tag in content.tags:
         tag_score = user_interests.get(tag.id, 0.0)
-        score += 50 * tag_score
+        score += TAG_INTEREST_WEIGHT * tag_score
 
     # Recency decay
     age_hours = _get_age_hours(content.created_at)
@@ -50,11 +64,136 @@ def calculate_feed_score(
 
     # Engagement boost
     engagement = like_count + comment_count
-    score += 10 * math.sqrt(engagement)
+    score += ENGAGEMENT_WEIGHT * math.sqrt(engagement)
 
     return score
 
 
+@dataclass(frozen=True)
+class FeedColumns:
+    """
+    Columnar view of a feed candidate set, one row per content item.
+
+    The content x tag matrix is stored in coordinate form: `tag_rows[k]` is
+    the content row and `tag_cols[k]` the column in `tag_ids` of the k-th
+    (content, tag) pair.
+    """
+
+    content_ids: list[UUID]
+    is_company_important: np.ndarray  # bool, shape (n,)
+    is_targeted: np.ndarray  # bool, content has target_roles
+    role_match: np.ndarray  # bool, user's role is in target_roles
+    tag_ids: list[UUID]
+    tag_rows: np.ndarray  # int, shape (pairs,)
+    tag_cols: np.ndarray  # int, shape (pairs,)
+    created_at: np.ndarray  # float epoch seconds
+    engagement: np.ndarray  # likes + comments
+
+    def __len__(self) -> int:
+        return len(self.content_ids)
+
+    def interest_vector(self, user_interests: dict[UUID, float]) -> np.ndarray:
+        """Align a user's tag interests with the `tag_ids` columns."""
+        return np.fromiter(
+            (user_interests.get(tag_id, 0.0) for tag_id in self.tag_ids),
+            dtype=np.float64,
+            count=len(self.tag_ids),
+        )
+
+
+def build_feed_columns(
+    contents: list[Content],
+    user: User,
+    like_counts: dict[UUID, int],
+    comment_counts: dict[UUID, int],
+) -> FeedColumns:
+    """Convert loaded Content rows into the columnar layout used for scoring."""
+    n = len(contents)
+    is_company_important = np.zeros(n, dtype=bool)
+    is_targeted = np.zeros(n, dtype=bool)
+    role_match = np.zeros(n, dtype=bool)
+    created_at = np.empty(n, dtype=np.float64)
+    engagement = np.empty(n, dtype=np.float64)
+
+    tag_index: dict[UUID, int] = {}
+    tag_rows: list[int] = []
+    tag_cols: list[int] = []
+
+    for row, content in enumerate(contents):
+        is_company_important[row] = bool(content.is_company_important)
+        if content.target_roles:
+            is_targeted[row] = True
+            role_match[row] = user.role in content.target_roles
+        created_at[row] = _to_epoch(content.created_at)
+        engagement[row] = like_counts.get(content.id, 0) + comment_counts.get(
+            content.id, 0
+        )
+        for tag in content.tags:
+            tag_rows.append(row)
+            tag_cols.append(tag_index.setdefault(tag.id, len(tag_index)))
+
+    return FeedColumns(
+        content_ids=[c.id for c in contents],
+        is_company_important=is_company_important,
+        is_targeted=is_targeted,
+        role_match=role_match,
+        tag_ids=list(tag_index),
+        tag_rows=np.asarray(tag_rows, dtype=np.intp),
+        tag_cols=np.asarray(tag_cols, dtype=np.intp),
+        created_at=created_at,
+        engagement=engagement,
+    )
+
+
+def calculate_feed_scores(
+    columns: FeedColumns,
+    interest_vector: np.ndarray,
+    now: float | None = None,
+) -> np.ndarray:
+    """
+    Vectorized `calculate_feed_score` over a whole candidate set.
+
+    Args:
+        columns: Columnar candidate set from `build_feed_columns`
+        interest_vector: User interest score per column of `columns.tag_ids`
+        now: Epoch seconds to measure content age from (defaults to now)
+
+    Returns:
+        Array of scores aligned with `columns.content_ids`
+    """
+    n = len(columns)
+    if now is None:
+        now = datetime.now(timezone.utc).timestamp()
+
+    score = np.where(columns.is_company_important, COMPANY_IMPORTANT_BOOST, 0.0)
+    score += np.where(
+        columns.is_targeted,
+        np.where(columns.role_match, ROLE_MATCH_BOOST, 0.0),
+        UNTARGETED_BOOST,
+    )
+
+    # Sparse content x tag matrix times the interest vector
+    if columns.tag_rows.size:
+        score += TAG_INTEREST_WEIGHT * np.bincount(
+            columns.tag_rows,
+            weights=interest_vector[columns.tag_cols],
+            minlength=n,
+        )
+
+    age_hours = np.maximum(now - columns.created_at, 0.0) / 3600
+    score *= np.power(0.5, age_hours / RECENCY_HALF_LIFE_HOURS)
+
+    score += ENGAGEMENT_WEIGHT * np.sqrt(columns.engagement)
+    return score
+
+
+def _to_epoch(created_at: datetime) -> float:
+    """Convert a (possibly naive UTC) timestamp to epoch seconds."""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at.timestamp()
+
+
 def _get_age_hours(created_at: datetime) -> float:
     """Get content age in hours."""
     now = datetime.now(timezone.utc)
@@ -72,9 +211,11 @@ def _recency_decay(age_hours: float) -> float:
     - 1 week old: ~0.1
     - 1 month old: ~0.01
     """
+    return half_life_decay(age_hours, RECENCY_HALF_LIFE_HOURS)
+
+
+def half_life_decay(age_hours: float, half_life_hours: float) -> float:
+    """Exponential decay multiplier that halves every `half_life_hours`."""
     if age_hours <= 0:
         return 1.0
-
-    # Exponential decay with half-life of 24 hours
-    half_life = 24.0
-    return math.pow(0.5, age_hours / half_life)
+    return math.pow(0.5, age_hours / half_life_hours)
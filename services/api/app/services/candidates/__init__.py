@@ -0,0 +1,32 @@
+from app.config import settings
+from app.services.candidates.base import CandidateContext, CandidateGenerator
+from app.services.candidates.company_important import CompanyImportantGenerator
+from app.services.candidates.followed_tags import FollowedTagsGenerator
+from app.services.candidates.fresh import FreshGenerator
+from app.services.candidates.trending import TrendingGenerator
+
+
+def default_generators() -> list[CandidateGenerator]:
+    """The candidate generators used by the For You feed."""
+    limit = settings.feed_candidate_limit
+    return [
+        CompanyImportantGenerator(limit, window_days=settings.feed_important_days),
+        FollowedTagsGenerator(
+            limit,
+            per_tag=settings.feed_candidates_per_tag,
+            window_days=settings.feed_followed_tag_days,
+        ),
+        FreshGenerator(limit, window_days=settings.feed_fresh_days),
+        TrendingGenerator(limit, window_days=settings.feed_trending_days),
+    ]
+
+
+__all__ = [
+    "CandidateContext",
+    "CandidateGenerator",
+    "CompanyImportantGenerator",
+    "FollowedTagsGenerator",
+    "FreshGenerator",
+    "TrendingGenerator",
+    "default_generators",
+]
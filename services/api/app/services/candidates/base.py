@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.user_interest import UserInterest
+
+
+@dataclass(frozen=True)
+class CandidateContext:
+    """Everything a candidate generator may look at for one feed request."""
+
+    db: Session
+    user: User
+    interests: list[UserInterest]
+    now: datetime
+
+
+class CandidateGenerator(ABC):
+    """
+    A cheap, bounded source of For You candidates.
+
+    Subclasses set `name` (used for per-stage timings) and implement
+    `generate`, returning at most `limit` content IDs.
+    """
+
+    name: str = "base"
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+
+    @abstractmethod
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        """Content IDs to rank for this request, at most `limit` of them."""
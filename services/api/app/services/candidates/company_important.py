@@ -0,0 +1,26 @@
+from datetime import timedelta
+from uuid import UUID
+
+from app.models.content import Content
+from app.services.candidates.base import CandidateContext, CandidateGenerator
+
+
+class CompanyImportantGenerator(CandidateGenerator):
+    """Recent company-important posts, newest first."""
+
+    name = "company_important"
+
+    def __init__(self, limit: int, window_days: int) -> None:
+        super().__init__(limit)
+        self.window_days = window_days
+
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        since = ctx.now - timedelta(days=self.window_days)
+        rows = (
+            ctx.db.query(Content.id)
+            .filter(Content.is_company_important.is_(True), Content.created_at >= since)
+            .order_by(Content.created_at.desc())
+            .limit(self.limit)
+            .all()
+        )
+        return [row.id for row in rows]
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from uuid import UUID
+
+from sqlalchemy import func, select
+
+from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.models.tag import content_tag_association
+from app.services.candidates.base import CandidateContext, CandidateGenerator
+
+
+class FollowedTagsGenerator(CandidateGenerator):
+    """Top posts per followed (or auto-subscribed) tag, by engagement."""
+
+    name = "followed_tags"
+
+    def __init__(self, limit: int, per_tag: int, window_days: int) -> None:
+        super().__init__(limit)
+        self.per_tag = per_tag
+        self.window_days = window_days
+
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        tag_ids = [
+            i.tag_id
+            for i in ctx.interests
+            if i.is_manually_followed or i.is_auto_subscribed
+        ]
+        if not tag_ids:
+            return []
+
+        since = ctx.now - timedelta(days=self.window_days)
+        engagement = func.coalesce(ContentStats.like_count, 0) + func.coalesce(
+            ContentStats.comment_count, 0
+        )
+        ranked = (
+            select(
+                content_tag_association.c.content_id,
+                func.row_number()
+                .over(
+                    partition_by=content_tag_association.c.tag_id,
+                    order_by=(engagement.desc(), Content.created_at.desc()),
+                )
+                .label("rank"),
+            )
+            .join(Content, Content.id == content_tag_association.c.content_id)
+            .outerjoin(ContentStats, ContentStats.content_id == Content.id)
+            .where(
+                content_tag_association.c.tag_id.in_(tag_ids),
+                Content.created_at >= since,
+            )
+            .subquery()
+        )
+        rows = ctx.db.execute(
+            select(ranked.c.content_id)
+            .where(ranked.c.rank <= self.per_tag)
+            .order_by(ranked.c.rank)
+            .limit(self.limit)
+        ).all()
+        return [row.content_id for row in rows]
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from uuid import UUID
+
+from app.models.content import Content
+from app.services.candidates.base import CandidateContext, CandidateGenerator
+
+
+class FreshGenerator(CandidateGenerator):
+    """
+    Posts from the last few days, newest first.
+
+    Falls back to the newest posts overall when nothing was published in the
+    window, so a quiet week never produces an empty feed.
+    """
+
+    name = "fresh"
+
+    def __init__(self, limit: int, window_days: int) -> None:
+        super().__init__(limit)
+        self.window_days = window_days
+
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        since = ctx.now - timedelta(days=self.window_days)
+        query = ctx.db.query(Content.id).order_by(Content.created_at.desc())
+
+        rows = query.filter(Content.created_at >= since).limit(self.limit).all()
+        if not rows:
+            rows = query.limit(self.limit).all()
+        return [row.id for row in rows]
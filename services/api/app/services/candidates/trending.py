@@ -0,0 +1,28 @@
+from datetime import timedelta
+from uuid import UUID
+
+from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.services.candidates.base import CandidateContext, CandidateGenerator
+
+
+class TrendingGenerator(CandidateGenerator):
+    """Most engaged-with recent posts."""
+
+    name = "trending"
+
+    def __init__(self, limit: int, window_days: int) -> None:
+        super().__init__(limit)
+        self.window_days = window_days
+
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        since = ctx.now - timedelta(days=self.window_days)
+        rows = (
+            ctx.db.query(Content.id)
+            .join(ContentStats, ContentStats.content_id == Content.id)
+            .filter(Content.created_at >= since)
+            .order_by((ContentStats.like_count + ContentStats.comment_count).desc())
+            .limit(self.limit)
+            .all()
+        )
+        return [row.id for row in rows]
@@ -0,0 +1,164 @@
+"""Set-based loading of comment threads."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import case, func, literal, select, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload
+
+from app.models.comment import Comment
+from app.schemas.comment import CommentTreeNode, CommentWithAuthor
+
+
+def fetch_reply_counts(db: Session, comment_ids: list[UUID]) -> dict[UUID, int]:
+    """Direct reply counts for many comments in one grouped query."""
+    if not comment_ids:
+        return {}
+    rows = db.execute(
+        select(Comment.parent_id, func.count())
+        .where(Comment.parent_id.in_(comment_ids))
+        .group_by(Comment.parent_id)
+    )
+    counts = dict.fromkeys(comment_ids, 0)
+    counts.update(rows.tuples().all())
+    return counts
+
+
+def comment_with_author(
+    comment: Comment,
+    reply_count: int,
+    schema: type[CommentWithAuthor] = CommentWithAuthor,
+) -> CommentWithAuthor:
+    """Build a response comment from a comment loaded with its author."""
+    return schema(
+        id=comment.id,
+        content_id=comment.content_id,
+        author_id=comment.author_id,
+        parent_id=comment.parent_id,
+        body=comment.body,
+        created_at=comment.created_at,
+        updated_at=comment.updated_at,
+        author=comment.author,
+        reply_count=reply_count,
+    )
+
+
+def with_reply_counts(db: Session, comments: list[Comment]) -> list[CommentWithAuthor]:
+    """Build CommentWithAuthors for comments loaded with their author."""
+    counts = fetch_reply_counts(db, [comment.id for comment in comments])
+    return [comment_with_author(comment, counts[comment.id]) for comment in comments]
+
+
+def fetch_comment_page(
+    db: Session,
+    content_id: UUID,
+    parent_id: UUID | None,
+    after: tuple[datetime, UUID] | None,
+    limit: int,
+    skip: int = 0,
+) -> tuple[list[Comment], tuple[datetime, UUID] | None]:
+    """
+    One page of top-level comments (newest first) or of a comment's replies
+    (oldest first), loaded with their authors.
+
+    Pages are keyset-paginated on (created_at, id), which the
+    (content_id, parent_id, created_at, id) index serves directly, so deep
+    pages cost the same as the first. `skip` is a legacy offset used only
+    without `after`. Returns the page and the sort key to continue after,
+    or None on the last page.
+    """
+    newest_first = parent_id is None
+    key = tuple_(Comment.created_at, Comment.id)
+    query = (
+        db.query(Comment)
+        .options(joinedload(Comment.author))
+        .filter(Comment.content_id == content_id, Comment.parent_id == parent_id)
+    )
+    # parent_id leads the sort so the planner walks the index in order:
+    # it does not treat `parent_id IS NULL` as fixing the column's value
+    if newest_first:
+        query = query.order_by(
+            Comment.parent_id.desc(), Comment.created_at.desc(), Comment.id.desc()
+        )
+    else:
+        query = query.order_by(Comment.parent_id, Comment.created_at, Comment.id)
+    if after is not None:
+        query = query.filter(
+            key < tuple_(*after) if newest_first else key > tuple_(*after)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    comments = query.limit(limit + 1).all()
+    if len(comments) <= limit:
+        return comments, None
+    last = comments[limit - 1]
+    return comments[:limit], (last.created_at, last.id)
+
+
+def fetch_comment_tree(
+    db: Session,
+    content_id: UUID,
+    limit: int,
+    max_depth: int,
+    max_comments: int,
+) -> list[CommentTreeNode]:
+    """
+    Load a content's newest `limit` top-level comments with their replies.
+
+    One recursive CTE walks the thread down to `max_depth` levels, and the
+    result is cut to `max_comments` nodes breadth-first, so a reply is only
+    ever included together with its parent. Top-level comments are newest
+    first and replies oldest first, as in the paged endpoints. Every node
+    carries its full `reply_count`, so clients can tell which branches were
+    truncated and page them through the replies endpoint.
+    """
+    roots = (
+        select(Comment.id)
+        .where(Comment.content_id == content_id, Comment.parent_id.is_(None))
+        .order_by(
+            Comment.parent_id.desc(), Comment.created_at.desc(), Comment.id.desc()
+        )
+        .limit(limit)
+        .subquery()
+    )
+    tree = select(roots.c.id, literal(1).label("depth")).cte("tree", recursive=True)
+    tree = tree.union_all(
+        select(Comment.id, tree.c.depth + 1)
+        .join(tree, Comment.parent_id == tree.c.id)
+        .where(tree.c.depth < max_depth)
+    )
+    # Correlated per returned node, so only the kept nodes' replies are
+    # counted (an index-only probe each), not every reply on the content
+    reply = aliased(Comment)
+    reply_count = (
+        select(func.count())
+        .where(reply.content_id == content_id, reply.parent_id == Comment.id)
+        .correlate(Comment)
+        .scalar_subquery()
+    )
+
+    rows = (
+        db.query(Comment, reply_count)
+        .join(tree, tree.c.id == Comment.id)
+        .options(joinedload(Comment.author))
+        .order_by(
+            tree.c.depth,
+            case((tree.c.depth == 1, Comment.created_at)).desc(),
+            Comment.created_at,
+            Comment.id,
+        )
+        .limit(max_comments)
+        .all()
+    )
+
+    nodes: dict[UUID, CommentTreeNode] = {}
+    top_level: list[CommentTreeNode] = []
+    for comment, reply_count in rows:
+        node = comment_with_author(comment, reply_count, CommentTreeNode)
+        nodes[comment.id] = node
+        if comment.parent_id is None:
+            top_level.append(node)
+        else:
+            nodes[comment.parent_id].replies.append(node)
+    return top_level
@@ -0,0 +1,69 @@
+"""Short-lived per-content cache of like and comment counters."""
+
+import threading
+from uuid import UUID
+
+from app.config import settings
+from app.services.ttl_cache import InvalidationClock, TTLCache
+
+Counts = tuple[int, int]
+
+
+class CounterCache:
+    """
+    In-process LRU cache of each content's (like_count, comment_count).
+
+    Write paths call `invalidate` after committing, and readers take a
+    `token` before reading the counters they cache. `put_many` drops counts
+    for content invalidated after the token, so a read that raced a write
+    can't put the old count back. This worker never serves a count older
+    than its own writes; the TTL bounds staleness for writes made on other
+    workers.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._cache: TTLCache[UUID, Counts] = TTLCache(ttl_seconds, max_entries)
+        self._lock = threading.Lock()
+        self._clock: InvalidationClock[UUID] = InvalidationClock(max_entries)
+
+    def reset_metrics(self) -> None:
+        self._cache.reset_metrics()
+
+    def get_many(self, content_ids: list[UUID]) -> dict[UUID, Counts]:
+        """Cached counts for whichever of `content_ids` are fresh."""
+        return self._cache.get_many(content_ids)
+
+    def token(self) -> int:
+        """Take before reading counters; pass to `put_many` with what was read."""
+        return self._clock.token()
+
+    def put_many(self, counts: dict[UUID, Counts], token: int) -> None:
+        """Cache counts read after `token`, except any invalidated since."""
+        with self._lock:
+            self._cache.put_many(
+                {
+                    content_id: value
+                    for content_id, value in counts.items()
+                    if self._clock.is_current(content_id, token)
+                }
+            )
+
+    def invalidate(self, content_id: UUID) -> None:
+        with self._lock:
+            self._clock.invalidate(content_id)
+            self._cache.discard(content_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clock.invalidate_all()
+            self._cache.clear()
+
+    def get_metrics(self) -> dict:
+        return self._cache.get_metrics()
+
+
+# Global counter cache instance
+counter_cache = CounterCache(
+    ttl_seconds=settings.counter_cache_ttl_seconds,
+    max_entries=settings.counter_cache_max_entries,
+)
@@ -0,0 +1,182 @@
+"""Maintenance of the denormalized engagement counters in `content_stats`."""
+
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.models.like import Like
+from app.models.view_event import ViewEvent
+
+
+def bump_content_stats(
+    db: Session,
+    content_id: UUID,
+    likes: int = 0,
+    comments: int = 0,
+    views: int = 0,
+) -> None:
+    """
+    Apply counter deltas for a content item inside the caller's transaction.
+
+    Uses a single upsert so the first interaction creates the row and
+    concurrent increments never lose updates. Counters never go below zero.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert(ContentStats).values(
+        content_id=content_id,
+        like_count=max(likes, 0),
+        comment_count=max(comments, 0),
+        view_count=max(views, 0),
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentStats.content_id],
+        set_={
+            "like_count": func.greatest(ContentStats.like_count + likes, 0),
+            "comment_count": func.greatest(ContentStats.comment_count + comments, 0),
+            "view_count": func.greatest(ContentStats.view_count + views, 0),
+            "updated_at": now,
+        },
+    )
+    db.execute(stmt)
+
+
+def bump_view_counts(db: Session, view_counts: dict[UUID, int]) -> None:
+    """Add view counts for many content items with one multi-row upsert."""
+    if not view_counts:
+        return
+    now = datetime.now(timezone.utc)
+    stmt = insert(ContentStats).values(
+        [
+            {
+                "content_id": content_id,
+                "like_count": 0,
+                "comment_count": 0,
+                "view_count": views,
+                "updated_at": now,
+            }
+            for content_id, views in view_counts.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentStats.content_id],
+        set_={
+            "view_count": ContentStats.view_count + stmt.excluded.view_count,
+            "updated_at": now,
+        },
+    )
+    db.execute(stmt)
+
+
+def bump_like_counts(db: Session, like_deltas: dict[UUID, int]) -> list[UUID]:
+    """
+    Apply net like deltas for many content items with one multi-row upsert.
+
+    Deltas for content that no longer exists are skipped. Rows are written in
+    content ID order so concurrent flushes lock them in the same order.
+    Returns the IDs whose counters were written.
+    """
+    deltas = {cid: delta for cid, delta in like_deltas.items() if delta}
+    if not deltas:
+        return []
+    existing = set(db.scalars(select(Content.id).where(Content.id.in_(deltas))))
+    if not existing:
+        return []
+
+    now = datetime.now(timezone.utc)
+    stmt = insert(ContentStats).values(
+        [
+            {
+                "content_id": content_id,
+                "like_count": max(deltas[content_id], 0),
+                "comment_count": 0,
+                "view_count": 0,
+                "updated_at": now,
+            }
+            for content_id in sorted(existing)
+        ]
+    )
+    # Existing rows take the signed delta; new rows start at max(delta, 0)
+    delta = case(
+        {content_id: deltas[content_id] for content_id in existing},
+        value=ContentStats.content_id,
+        else_=0,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentStats.content_id],
+        set_={
+            "like_count": func.greatest(ContentStats.like_count + delta, 0),
+            "updated_at": now,
+        },
+    )
+    db.execute(stmt)
+    return sorted(existing)
+
+
+def reconcile_content_stats(db: Session, likes: bool = False) -> int:
+    """
+    Recompute every content's counters from likes, comments and view events.
+
+    Like rows are committed before their `like_count` delta, which waits in
+    each worker's `LikeCountAccumulator` until the next flush, so a recount
+    taken while any worker holds deltas would have them applied twice. Like
+    counts are therefore only recomputed with `likes=True`, which is safe
+    only while no API worker is running (they flush on shutdown). Otherwise
+    missing rows start at a like count of 0 for pending deltas to fill in.
+
+    Only rows whose stored values drifted (or are missing) are written.
+    Returns the number of repaired rows; the caller commits.
+    """
+    like_counts = (
+        select(Like.content_id, func.count().label("n"))
+        .group_by(Like.content_id)
+        .subquery()
+    )
+    comment_counts = (
+        select(Comment.content_id, func.count().label("n"))
+        .group_by(Comment.content_id)
+        .subquery()
+    )
+    view_counts = (
+        select(ViewEvent.content_id, func.count().label("n"))
+        .group_by(ViewEvent.content_id)
+        .subquery()
+    )
+
+    actual = select(
+        Content.id,
+        func.coalesce(like_counts.c.n, 0) if likes else literal(0),
+        func.coalesce(comment_counts.c.n, 0),
+        func.coalesce(view_counts.c.n, 0),
+        func.now(),
+    )
+    if likes:
+        actual = actual.outerjoin(like_counts, like_counts.c.content_id == Content.id)
+    actual = actual.outerjoin(
+        comment_counts, comment_counts.c.content_id == Content.id
+    ).outerjoin(view_counts, view_counts.c.content_id == Content.id)
+
+    stmt = insert(ContentStats).from_select(
+        ["content_id", "like_count", "comment_count", "view_count", "updated_at"],
+        actual,
+    )
+    repaired = {
+        "comment_count": stmt.excluded.comment_count,
+        "view_count": stmt.excluded.view_count,
+    }
+    if likes:
+        repaired["like_count"] = stmt.excluded.like_count
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ContentStats.content_id],
+        set_={**repaired, "updated_at": stmt.excluded.updated_at},
+        where=or_(
+            *(getattr(ContentStats, name) != value for name, value in repaired.items())
+        ),
+    )
+    return len(db.execute(stmt.returning(ContentStats.content_id)).all())
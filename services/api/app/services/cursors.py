@@ -0,0 +1,37 @@
+"""Opaque, URL-safe pagination cursors."""
+
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+SEPARATOR = "|"
+
+
+def encode_cursor(*parts: str) -> str:
+    """Pack string parts into an opaque URL-safe token."""
+    raw = SEPARATOR.join(parts).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, n_parts: int) -> list[str]:
+    """Unpack a token from `encode_cursor`; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        parts = base64.urlsafe_b64decode(padded).decode().split(SEPARATOR)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if len(parts) != n_parts:
+        raise ValueError("Invalid cursor")
+    return parts
+
+
+def encode_keyset_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Cursor for keyset pagination on a (created_at, id) sort key."""
+    return encode_cursor(created_at.isoformat(), str(row_id))
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor from `encode_keyset_cursor`; raises ValueError."""
+    created_at, row_id = decode_cursor(cursor, 2)
+    return datetime.fromisoformat(created_at), UUID(row_id)
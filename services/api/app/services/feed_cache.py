@@ -0,0 +1,90 @@
+"""Short-lived per-user cache of ranked For You results."""
+
+import threading
+from uuid import UUID
+
+from app.config import settings
+from app.services.ttl_cache import InvalidationClock, TTLCache
+
+CacheKey = tuple[UUID, str]
+
+
+class FeedCache:
+    """
+    In-process LRU cache of each user's ranked content IDs.
+
+    Entries are keyed by (user_id, role) and expire after `ttl_seconds`.
+    Write paths call the `invalidate_*` / `discard_content` hooks so that
+    pull-to-refresh only re-ranks when something relevant changed. Only the
+    ranking is cached; cards are always hydrated fresh.
+
+    Invalidation is local to the worker process; the TTL bounds staleness
+    on other workers.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._cache: TTLCache[CacheKey, list[UUID]] = TTLCache(ttl_seconds, max_entries)
+        self._lock = threading.Lock()
+        self._clock: InvalidationClock[UUID] = InvalidationClock(max_entries)
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self._cache.reset_metrics()
+        self._invalidations = 0
+
+    def generation(self) -> int:
+        """Token to pass to `set`; an invalidation covering the key voids the write."""
+        return self._clock.token()
+
+    def get(self, user_id: UUID, role: str) -> list[UUID] | None:
+        return self._cache.get((user_id, role))
+
+    def set(
+        self, user_id: UUID, role: str, ranked: list[UUID], generation: int
+    ) -> None:
+        with self._lock:
+            if not self._clock.is_current(user_id, generation):
+                # Invalidated while this ranking was computed
+                return
+            self._cache.put((user_id, role), ranked)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Drop a user's cached rankings (e.g. after their interests changed).
+
+        Only in-flight writes for this user are voided. A user's rankings
+        are keyed by (user_id, role), but callers don't know the role, so
+        the stamp covers all of the user's keys.
+        """
+        with self._lock:
+            self._clock.invalidate(user_id)
+            self._invalidations += 1
+            for key, _ in self._cache.items():
+                if key[0] == user_id:
+                    self._cache.discard(key)
+
+    def invalidate_all(self) -> None:
+        """Drop every cached ranking (e.g. new or re-prioritised content)."""
+        with self._lock:
+            self._clock.invalidate_all()
+            self._invalidations += 1
+            self._cache.clear()
+
+    def discard_content(self, content_id: UUID) -> None:
+        """Patch deleted content out of every cached ranking."""
+        with self._lock:
+            self._clock.invalidate_all()
+            self._invalidations += 1
+            for key, ranked in self._cache.items():
+                if content_id in ranked:
+                    self._cache.patch(key, [cid for cid in ranked if cid != content_id])
+
+    def get_metrics(self) -> dict:
+        return {**self._cache.get_metrics(), "invalidations": self._invalidations}
+
+
+# Global feed cache instance
+feed_cache = FeedCache(
+    ttl_seconds=settings.feed_cache_ttl_seconds,
+    max_entries=settings.feed_cache_max_entries,
+)
@@ -0,0 +1,127 @@
+"""Two-stage For You pipeline: bounded candidate generation, then ranking."""
+
+import heapq
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.content import Content
+from app.models.user import User
+from app.models.user_interest import UserInterest
+from app.services.algorithm import build_feed_columns, calculate_feed_scores
+from app.services.candidates import (
+    CandidateContext,
+    CandidateGenerator,
+    default_generators,
+)
+from app.services.interests import decayed_score
+
+
+class PipelineMetrics:
+    """Thread-safe running totals of per-stage pipeline timings."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._runs = 0
+            self._candidates = 0
+            self._stage_ms: dict[str, float] = defaultdict(float)
+            self._last: dict[str, float] = {}
+
+    def record(self, timings: dict[str, float], candidates: int) -> None:
+        with self._lock:
+            self._runs += 1
+            self._candidates += candidates
+            for stage, ms in timings.items():
+                self._stage_ms[stage] += ms
+            self._last = dict(timings)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            runs = self._runs
+            return {
+                "runs": runs,
+                "avg_candidates": round(self._candidates / runs, 1) if runs else 0.0,
+                "avg_stage_ms": {
+                    stage: round(total / runs, 2)
+                    for stage, total in self._stage_ms.items()
+                },
+                "last_stage_ms": {
+                    stage: round(ms, 2) for stage, ms in self._last.items()
+                },
+            }
+
+
+# Global pipeline metrics instance
+pipeline_metrics = PipelineMetrics()
+
+
+def rank_for_you(
+    db: Session,
+    user: User,
+    top_k: int,
+    generators: list[CandidateGenerator] | None = None,
+) -> list[UUID]:
+    """
+    Rank the For You feed for `user` and return the best `top_k` content IDs.
+
+    Stage 1 runs each candidate generator and merges their bounded outputs;
+    stage 2 scores only that candidate set and keeps the top K with a heap.
+    """
+    timings: dict[str, float] = {}
+
+    def timed(stage: str, start: float) -> float:
+        now = time.perf_counter()
+        timings[stage] = (now - start) * 1000
+        return now
+
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    interests = db.query(UserInterest).filter(UserInterest.user_id == user.id).all()
+    interest_map = {i.tag_id: decayed_score(i, now) for i in interests}
+    start = timed("interests", start)
+
+    # Stage 1: candidate generation (merged, order-preserving dedupe)
+    ctx = CandidateContext(db=db, user=user, interests=interests, now=now)
+    candidate_ids: dict[UUID, None] = {}
+    for generator in generators if generators is not None else default_generators():
+        for content_id in generator.generate(ctx):
+            candidate_ids.setdefault(content_id)
+        start = timed(f"generate.{generator.name}", start)
+
+    if not candidate_ids:
+        pipeline_metrics.record(timings, 0)
+        return []
+
+    # Stage 2: load scoring columns for eligible candidates only
+    contents = (
+        db.query(Content)
+        .options(joinedload(Content.tags), joinedload(Content.stats))
+        .filter(
+            Content.id.in_(list(candidate_ids)),
+            (Content.target_roles.is_(None))
+            | (Content.target_roles.contains([user.role])),
+        )
+        .all()
+    )
+    start = timed("load", start)
+
+    like_counts = {c.id: c.like_count for c in contents}
+    comment_counts = {c.id: c.comment_count for c in contents}
+    columns = build_feed_columns(contents, user, like_counts, comment_counts)
+    scores = calculate_feed_scores(columns, columns.interest_vector(interest_map))
+    start = timed("score", start)
+
+    top = heapq.nlargest(top_k, range(len(columns)), key=scores.__getitem__)
+    ranked = [columns.content_ids[i] for i in top]
+    timed("top_k", start)
+
+    pipeline_metrics.record(timings, len(candidate_ids))
+    return ranked
@@ -0,0 +1,94 @@
+"""Ranked For You feed snapshots and the opaque cursors that page through them."""
+
+import hashlib
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from app.config import settings
+from app.services.cursors import decode_cursor, encode_cursor
+from app.services.ttl_cache import TTLCache
+
+
+@dataclass
+class FeedSnapshot:
+    """A user's ranked content IDs, frozen when their first page was served."""
+
+    id: str
+    user_id: UUID
+    content_ids: list[UUID]
+    created_at: float
+
+
+class FeedSnapshotStore:
+    """
+    In-process LRU store of ranked feed snapshots with a TTL.
+
+    Snapshots live in the worker that created them; a cursor that lands on
+    another worker (or arrives after expiry) simply misses and the caller
+    re-ranks. A snapshot is identified by its user and ranking, so
+    refreshing the first page while the ranking is unchanged (e.g. served
+    from the feed cache) reuses the existing snapshot instead of storing
+    another copy.
+    """
+
+    def __init__(self, ttl_seconds: float, max_items: int, max_snapshots: int) -> None:
+        self.max_items = max_items
+        self._snapshots: TTLCache[str, FeedSnapshot] = TTLCache(
+            ttl_seconds, max_snapshots
+        )
+
+    def create(self, user_id: UUID, content_ids: list[UUID]) -> FeedSnapshot:
+        """
+        Store the top `max_items` of a ranking and return the snapshot.
+
+        Returns the user's live snapshot of the same ranking if there is
+        one, with its expiry pushed back.
+        """
+        content_ids = content_ids[: self.max_items]
+        digest = hashlib.blake2b(user_id.bytes, digest_size=16)
+        for content_id in content_ids:
+            digest.update(content_id.bytes)
+        snapshot_id = digest.hexdigest()
+
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            snapshot = FeedSnapshot(
+                id=snapshot_id,
+                user_id=user_id,
+                content_ids=content_ids,
+                created_at=time.monotonic(),
+            )
+        self._snapshots.put(snapshot_id, snapshot)
+        return snapshot
+
+    def get(self, snapshot_id: str, user_id: UUID) -> FeedSnapshot | None:
+        """Return a live snapshot owned by `user_id`, or None."""
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None or snapshot.user_id != user_id:
+            return None
+        return snapshot
+
+    def clear(self) -> None:
+        self._snapshots.clear()
+
+
+def encode_snapshot_cursor(snapshot_id: str, offset: int) -> str:
+    """Encode a snapshot ID and offset as an opaque cursor."""
+    return encode_cursor(snapshot_id, str(offset))
+
+
+def decode_snapshot_cursor(cursor: str) -> tuple[str, int]:
+    """Decode a cursor from `encode_snapshot_cursor`; raises ValueError."""
+    snapshot_id, offset = decode_cursor(cursor, 2)
+    if not offset.isdigit():
+        raise ValueError("Invalid cursor")
+    return snapshot_id, int(offset)
+
+
+# Global snapshot store instance
+feed_snapshots = FeedSnapshotStore(
+    ttl_seconds=settings.feed_snapshot_ttl_seconds,
+    max_items=settings.feed_snapshot_max_items,
+    max_snapshots=settings.feed_snapshot_max_snapshots,
+)
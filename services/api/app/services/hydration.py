@@ -0,0 +1,134 @@
+"""Bulk hydration of content cards with engagement counts and per-user state."""
+
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.models.bookmark import Bookmark
+from app.models.content import Content as ContentModel
+from app.models.content_stats import ContentStats
+from app.models.like import Like
+from app.models.user import User as UserModel
+from app.schemas.content import Content, ContentFeedItem, ContentWithDetails
+from app.services.counter_cache import counter_cache
+from app.services.like_counts import like_counts
+
+
+@dataclass(frozen=True)
+class Engagement:
+    like_count: int = 0
+    comment_count: int = 0
+    is_liked: bool = False
+    is_bookmarked: bool = False
+
+
+def fetch_engagement(
+    db: Session, content_ids: list[UUID], user_id: UUID | None
+) -> dict[UUID, Engagement]:
+    """
+    Resolve counts and the user's like/bookmark state for many content items.
+
+    Costs at most three set-based queries regardless of how many IDs are
+    passed (counters, the user's likes, the user's bookmarks). Counters come
+    from `counter_cache` where possible and are only read for the misses;
+    like deltas not yet flushed by `like_counts` are added on top.
+    """
+    if not content_ids:
+        return {}
+
+    counts = counter_cache.get_many(content_ids)
+    missing = [cid for cid in content_ids if cid not in counts]
+    if missing:
+        # Before the read, so a flush committing in between can't be undone
+        token = counter_cache.token()
+        loaded = {cid: (0, 0) for cid in missing}
+        loaded.update(
+            (row.content_id, (row.like_count, row.comment_count))
+            for row in db.query(
+                ContentStats.content_id,
+                ContentStats.like_count,
+                ContentStats.comment_count,
+            ).filter(ContentStats.content_id.in_(missing))
+        )
+        counter_cache.put_many(loaded, token)
+        counts.update(loaded)
+
+    for cid, delta in like_counts.pending(content_ids).items():
+        like_count, comment_count = counts.get(cid, (0, 0))
+        counts[cid] = (max(like_count + delta, 0), comment_count)
+
+    liked: set[UUID] = set()
+    bookmarked: set[UUID] = set()
+    if user_id is not None:
+        liked = {
+            row.content_id
+            for row in db.query(Like.content_id).filter(
+                Like.user_id == user_id, Like.content_id.in_(content_ids)
+            )
+        }
+        bookmarked = {
+            row.content_id
+            for row in db.query(Bookmark.content_id).filter(
+                Bookmark.user_id == user_id, Bookmark.content_id.in_(content_ids)
+            )
+        }
+
+    return {
+        cid: Engagement(
+            *counts.get(cid, (0, 0)),
+            is_liked=cid in liked,
+            is_bookmarked=cid in bookmarked,
+        )
+        for cid in content_ids
+    }
+
+
+def hydrate_feed_items(
+    db: Session, contents: list[ContentModel], current_user: UserModel
+) -> list[ContentFeedItem]:
+    """Build ContentFeedItems for contents loaded with author and tags."""
+    engagement = fetch_engagement(db, [c.id for c in contents], current_user.id)
+
+    return [
+        ContentFeedItem(
+            id=content.id,
+            author=content.author,
+            content_type=content.content_type,
+            title=content.title,
+            body=content.body,
+            media_url=content.media_url,
+            thumbnail_url=content.thumbnail_url,
+            duration_seconds=content.duration_seconds,
+            is_company_important=content.is_company_important,
+            tags=content.tags,
+            like_count=engagement[content.id].like_count,
+            comment_count=engagement[content.id].comment_count,
+            is_liked=engagement[content.id].is_liked,
+            is_bookmarked=engagement[content.id].is_bookmarked,
+            created_at=content.created_at,
+        )
+        for content in contents
+    ]
+
+
+def hydrate_content_details(
+    db: Session, contents: list[ContentModel], current_user: UserModel | None
+) -> list[ContentWithDetails]:
+    """Build ContentWithDetails for contents loaded with author and tags."""
+    engagement = fetch_engagement(
+        db, [c.id for c in contents], current_user.id if current_user else None
+    )
+
+    return [
+        ContentWithDetails(
+            **Content.model_validate(content).model_dump(),
+            author=content.author,
+            tags=content.tags,
+            like_count=engagement[content.id].like_count,
+            comment_count=engagement[content.id].comment_count,
+            is_liked=engagement[content.id].is_liked,
+            is_bookmarked=engagement[content.id].is_bookmarked,
+        )
+        for content in contents
+    ]
@@ -0,0 +1,334 @@
+"""A user's conversation inbox and its denormalized unread counters."""
+
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import (
+    String,
+    case,
+    cast,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+
+from app.models.conversation import Conversation as ConversationModel
+from app.models.conversation import ConversationParticipant as ParticipantModel
+from app.models.message import Message as MessageModel
+from app.models.user import User as UserModel
+from app.schemas.message import (
+    Conversation,
+    ConversationParticipant,
+    MessageWithSender,
+)
+
+
+def message_with_sender(message: MessageModel, sender: UserModel) -> MessageWithSender:
+    return MessageWithSender(
+        id=message.id,
+        conversation_id=message.conversation_id,
+        sender_id=message.sender_id,
+        body=message.body,
+        created_at=message.created_at,
+        updated_at=message.updated_at,
+        sender=sender,
+    )
+
+
+def participant_list(
+    conversation: ConversationModel,
+) -> list[ConversationParticipant]:
+    """Participants of a conversation loaded with their users."""
+    return [
+        ConversationParticipant(
+            id=p.id,
+            conversation_id=p.conversation_id,
+            user_id=p.user_id,
+            joined_at=p.joined_at,
+            last_read_at=p.last_read_at,
+            user=p.user,
+        )
+        for p in conversation.participants
+    ]
+
+
+def fetch_conversations(
+    db: Session,
+    user_id: UUID,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = 50,
+    skip: int = 0,
+    conversation_id: UUID | None = None,
+) -> tuple[list[Conversation], tuple[datetime, UUID] | None]:
+    """
+    A page of the user's conversations, most recently active first.
+
+    Costs two indexed statements however many conversations are on the
+    page and however long their histories: one picks the page keyset-
+    paginated on (updated_at, id) and reads the caller's denormalized
+    unread count and last message, the other loads the participants.
+    `skip` is a legacy offset used only without `after`; `conversation_id`
+    narrows the page to a single conversation. Returns the page and the
+    sort key to continue after, or None on the last page.
+    """
+    last_message = aliased(MessageModel)
+    sender = aliased(UserModel)
+    query = (
+        db.query(ConversationModel, last_message, sender, ParticipantModel.unread_count)
+        .join(
+            ParticipantModel, ParticipantModel.conversation_id == ConversationModel.id
+        )
+        .outerjoin(last_message, last_message.id == ParticipantModel.last_message_id)
+        .outerjoin(sender, sender.id == last_message.sender_id)
+        .filter(ParticipantModel.user_id == user_id)
+        .options(
+            selectinload(ConversationModel.participants).joinedload(
+                ParticipantModel.user
+            )
+        )
+        .order_by(ConversationModel.updated_at.desc(), ConversationModel.id.desc())
+    )
+    if conversation_id is not None:
+        query = query.filter(ConversationModel.id == conversation_id)
+    if after is not None:
+        query = query.filter(
+            tuple_(ConversationModel.updated_at, ConversationModel.id) < tuple_(*after)
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    next_after = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_after = (last.updated_at, last.id)
+
+    return [
+        Conversation(
+            id=conversation.id,
+            created_at=conversation.created_at,
+            updated_at=conversation.updated_at,
+            participants=participant_list(conversation),
+            last_message=(
+                message_with_sender(message, message_sender) if message else None
+            ),
+            unread_count=unread_count,
+        )
+        for conversation, message, message_sender, unread_count in rows
+    ], next_after
+
+
+def fetch_conversation(
+    db: Session, user_id: UUID, conversation_id: UUID
+) -> Conversation:
+    """A single conversation as it appears in the user's inbox."""
+    conversations, _ = fetch_conversations(
+        db, user_id, limit=1, conversation_id=conversation_id
+    )
+    return conversations[0]
+
+
+def fetch_message_page(
+    db: Session,
+    conversation_id: UUID,
+    before: tuple[datetime, UUID] | None = None,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = 50,
+    skip: int = 0,
+) -> tuple[list[MessageModel], tuple[datetime, UUID] | None]:
+    """
+    A window of a conversation's messages, loaded with their senders.
+
+    Without `after`, returns the latest `limit` messages older than `before`
+    (the newest ones if not given) and the sort key to load older messages
+    before, or None when there are none. With `after`, returns the next
+    `limit` messages newer than it, for catching up, and the key of the
+    newest message seen (`after` itself if nothing is new), so catch-up can
+    always resume from it. Either way the page is in chronological order.
+
+    Pages are keyset-paginated on (created_at, id), which the
+    (conversation_id, created_at, id) index serves directly, so old history
+    costs the same to page as recent. `skip` is a legacy offset from the
+    newest message, used only without a cursor.
+    """
+    key = tuple_(MessageModel.created_at, MessageModel.id)
+    query = (
+        db.query(MessageModel)
+        .options(joinedload(MessageModel.sender))
+        .filter(MessageModel.conversation_id == conversation_id)
+    )
+    if after is not None:
+        query = query.filter(key > tuple_(*after)).order_by(
+            MessageModel.created_at, MessageModel.id
+        )
+    else:
+        query = query.order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
+        if before is not None:
+            query = query.filter(key < tuple_(*before))
+        elif skip:
+            query = query.offset(skip)
+
+    messages = query.limit(limit + 1).all()
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    last_key = (messages[-1].created_at, messages[-1].id) if messages else None
+    if after is not None:
+        return messages, last_key or after
+    messages.reverse()
+    return messages, last_key if has_more else None
+
+
+def dm_key(user_ids: set[UUID]) -> str:
+    """Canonical key of the direct conversation between two users."""
+    return ":".join(str(user_id) for user_id in sorted(user_ids))
+
+
+def open_direct_conversation(db: Session, user_ids: set[UUID]) -> tuple[UUID, bool]:
+    """
+    Find or create the direct conversation between two users.
+
+    One upsert on the unique `dm_key` index either inserts the conversation
+    or returns the existing one, so concurrent requests for the same pair
+    cannot create two. Returns the conversation ID and whether it was
+    created; the caller adds the participants of a new conversation and
+    commits.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = insert(ConversationModel).values(
+        id=uuid.uuid4(), dm_key=dm_key(user_ids), created_at=now, updated_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConversationModel.dm_key],
+        # A no-op update so the existing row is locked and returned
+        set_={"dm_key": stmt.excluded.dm_key},
+    ).returning(ConversationModel.id, literal_column("xmax = 0"))
+    conversation_id, created = db.execute(stmt).one()
+    return conversation_id, created
+
+
+def backfill_dm_keys(db: Session) -> int:
+    """
+    Set `dm_key` on two-person conversations created before it existed.
+
+    Where a pair already has several conversations, only the oldest gets
+    the key; the others stay reachable from the inbox. Returns the number
+    of conversations keyed. The caller commits.
+    """
+    pairs = (
+        select(
+            ParticipantModel.conversation_id,
+            func.string_agg(
+                cast(ParticipantModel.user_id, String),
+                aggregate_order_by(literal(":"), ParticipantModel.user_id),
+            ).label("dm_key"),
+        )
+        .group_by(ParticipantModel.conversation_id)
+        .having(func.count() == 2)
+        .subquery()
+    )
+    keyed = aliased(ConversationModel)
+    firsts = (
+        select(pairs.c.conversation_id, pairs.c.dm_key)
+        .join(ConversationModel, ConversationModel.id == pairs.c.conversation_id)
+        .where(
+            ConversationModel.dm_key.is_(None),
+            ~select(keyed.id).where(keyed.dm_key == pairs.c.dm_key).exists(),
+        )
+        .distinct(pairs.c.dm_key)
+        .order_by(pairs.c.dm_key, ConversationModel.created_at, ConversationModel.id)
+        .subquery()
+    )
+    stmt = (
+        update(ConversationModel)
+        .where(ConversationModel.id == firsts.c.conversation_id)
+        .values(dm_key=firsts.c.dm_key)
+        .returning(ConversationModel.id)
+    )
+    return len(db.execute(stmt).all())
+
+
+def record_message(db: Session, message: MessageModel) -> list[UUID]:
+    """
+    Update every participant's inbox state for a new (flushed) message.
+
+    One UPDATE bumps the other participants' unread counts, marks the
+    conversation read for the sender and points everyone at the message.
+    Returns the participants' user IDs; the caller commits.
+    """
+    is_sender = ParticipantModel.user_id == message.sender_id
+    result = db.execute(
+        update(ParticipantModel)
+        .where(ParticipantModel.conversation_id == message.conversation_id)
+        .values(
+            unread_count=case((is_sender, 0), else_=ParticipantModel.unread_count + 1),
+            last_read_at=case(
+                (is_sender, message.created_at), else_=ParticipantModel.last_read_at
+            ),
+            last_message_id=message.id,
+        )
+        .returning(ParticipantModel.user_id)
+    )
+    return list(result.scalars())
+
+
+def mark_read(participant: ParticipantModel) -> None:
+    """Mark a conversation read for one participant (caller commits)."""
+    participant.last_read_at = datetime.now(timezone.utc)
+    participant.unread_count = 0
+
+
+def reconcile_inbox_counters(db: Session) -> int:
+    """
+    Recompute every participant's unread count and last message.
+
+    Unread messages are those from others newer than the participant's
+    `last_read_at` (all of them if never read). Only rows that drifted are
+    written; returns their number. The caller commits.
+    """
+    p = aliased(ParticipantModel)
+    unread = (
+        select(func.count())
+        .where(
+            MessageModel.conversation_id == p.conversation_id,
+            MessageModel.sender_id != p.user_id,
+            or_(p.last_read_at.is_(None), MessageModel.created_at > p.last_read_at),
+        )
+        .scalar_subquery()
+    )
+    latest = (
+        select(MessageModel.id)
+        .where(MessageModel.conversation_id == p.conversation_id)
+        .order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    actual = select(
+        p.id, unread.label("unread_count"), latest.label("last_message_id")
+    ).subquery()
+
+    stmt = (
+        update(ParticipantModel)
+        .where(
+            ParticipantModel.id == actual.c.id,
+            or_(
+                ParticipantModel.unread_count != actual.c.unread_count,
+                ParticipantModel.last_message_id.is_distinct_from(
+                    actual.c.last_message_id
+                ),
+            ),
+        )
+        .values(
+            unread_count=actual.c.unread_count,
+            last_message_id=actual.c.last_message_id,
+        )
+        .returning(ParticipantModel.id)
+    )
+    return len(db.execute(stmt).all())
@@ -0,0 +1,85 @@
+"""Single-statement like/bookmark mutations."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.bookmark import Bookmark
+from app.models.content_stats import ContentStats
+from app.models.like import Like
+
+
+@dataclass(frozen=True)
+class LikeResult:
+    changed: bool
+    # Stored counter as of the change, without deltas still to be flushed
+    like_count: int
+
+
+def set_like(db: Session, user_id: UUID, content_id: UUID, liked: bool) -> LikeResult:
+    """
+    Like or unlike content in one statement (caller commits).
+
+    Only the like row is written; the caller feeds changes to `like_counts`
+    after committing, so concurrent likes never queue on the shared counter
+    row. Repeating the call is a no-op. Liking missing content raises
+    IntegrityError from the foreign key.
+    """
+    if liked:
+        change = (
+            insert(Like)
+            .values(
+                user_id=user_id,
+                content_id=content_id,
+                created_at=datetime.now(timezone.utc),
+            )
+            .on_conflict_do_nothing()
+            .returning(Like.content_id)
+        )
+    else:
+        change = (
+            delete(Like)
+            .where(Like.user_id == user_id, Like.content_id == content_id)
+            .returning(Like.content_id)
+        )
+    change = change.cte("change")
+
+    stored = (
+        select(ContentStats.like_count)
+        .where(ContentStats.content_id == content_id)
+        .scalar_subquery()
+    )
+    changed, like_count = db.execute(
+        select(exists(select(change.c.content_id)), func.coalesce(stored, 0))
+    ).one()
+    return LikeResult(changed=changed, like_count=like_count)
+
+
+def set_bookmark(
+    db: Session, user_id: UUID, content_id: UUID, bookmarked: bool
+) -> bool:
+    """
+    Bookmark or un-bookmark content in one statement (caller commits).
+
+    Returns whether anything changed. Bookmarking missing content raises
+    IntegrityError from the foreign key.
+    """
+    if bookmarked:
+        stmt = (
+            insert(Bookmark)
+            .values(
+                user_id=user_id,
+                content_id=content_id,
+                created_at=datetime.now(timezone.utc),
+            )
+            .on_conflict_do_nothing()
+        )
+    else:
+        stmt = delete(Bookmark).where(
+            Bookmark.user_id == user_id, Bookmark.content_id == content_id
+        )
+    return db.execute(stmt.returning(Bookmark.content_id)).first() is not None
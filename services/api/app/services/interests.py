@@ -0,0 +1,170 @@
+"""
+Users' per-tag interest scores.
+
+Scores decay with a half-life, like content recency in the feed algorithm.
+Only the score at `updated_at` is stored: reads decay it to "now", and
+writes decay the stored value before adding to it.
+"""
+
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import DateTime, Float, cast, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.user_interest import UserInterest
+from app.services.algorithm import half_life_decay
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Largest score gain from a single fully watched view
+VIEW_INTEREST_STEP = 0.1
+
+# Interest score above which a tag is auto-subscribed
+AUTO_SUBSCRIBE_THRESHOLD = 0.7
+
+# Score given to a tag the user follows before showing any interest in it
+FOLLOW_INITIAL_SCORE = 0.5
+
+# Interest halves after two weeks without new signals
+INTEREST_HALF_LIFE_HOURS = 14 * 24.0
+
+# Unfollowed interests decayed below this are deleted by the prune pass
+INTEREST_PRUNE_BELOW = 0.01
+
+
+def decayed_score(interest: UserInterest, now: datetime | None = None) -> float:
+    """An interest's score decayed from its `updated_at` to `now`."""
+    now = now or datetime.now(timezone.utc)
+    updated_at = interest.updated_at or now
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    age_hours = (now - updated_at).total_seconds() / 3600
+    return (interest.score or 0.0) * half_life_decay(
+        age_hours, INTEREST_HALF_LIFE_HOURS
+    )
+
+
+def decayed_score_sql(now: datetime | None = None):
+    """SQL expression for the stored score decayed to `now`."""
+    at = literal(now or datetime.now(timezone.utc), DateTime)
+    age_hours = (
+        cast(
+            func.extract("epoch", at - func.coalesce(UserInterest.updated_at, at)),
+            Float,
+        )
+        / 3600
+    )
+    return func.coalesce(UserInterest.score, 0.0) * func.power(
+        0.5, func.greatest(age_hours, 0.0) / INTEREST_HALF_LIFE_HOURS
+    )
+
+
+def view_interest_increment(completion_percent: float) -> float:
+    """Score gain for a view, proportional to how much was watched."""
+    return min(completion_percent / 100.0, 1.0) * VIEW_INTEREST_STEP
+
+
+def add_interest_scores(
+    db: Session, increments: dict[tuple[UUID, UUID], float]
+) -> None:
+    """
+    Add summed score increments per (user_id, tag_id) in the caller's transaction.
+
+    One multi-row INSERT ... ON CONFLICT DO UPDATE creates missing rows and
+    bumps existing ones atomically, so concurrent writers never lose updates
+    or race on creating the same row. The stored score is decayed before the
+    increment is added, capped at 1.0, and tags crossing the auto-subscribe
+    threshold are subscribed.
+    """
+    if not increments:
+        return
+
+    now = datetime.now(timezone.utc)
+    # Sorted so concurrent batches lock rows in the same order
+    stmt = insert(UserInterest).values(
+        [
+            {
+                "user_id": user_id,
+                "tag_id": tag_id,
+                "score": min(increment, 1.0),
+                "is_auto_subscribed": min(increment, 1.0) > AUTO_SUBSCRIBE_THRESHOLD,
+                "is_manually_followed": False,
+                "updated_at": now,
+            }
+            for (user_id, tag_id), increment in sorted(increments.items())
+        ]
+    )
+    score = func.least(decayed_score_sql(now) + stmt.excluded.score, 1.0)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserInterest.user_id, UserInterest.tag_id],
+        set_={
+            "score": score,
+            "is_auto_subscribed": func.coalesce(UserInterest.is_auto_subscribed, False)
+            | (score > AUTO_SUBSCRIBE_THRESHOLD),
+            "updated_at": now,
+        },
+    )
+    db.execute(stmt)
+
+
+def set_tag_followed(db: Session, user_id: UUID, tag_id: UUID, follow: bool) -> None:
+    """Follow or unfollow a tag with a single upsert (caller commits)."""
+    now = datetime.now(timezone.utc)
+    stmt = insert(UserInterest).values(
+        user_id=user_id,
+        tag_id=tag_id,
+        score=FOLLOW_INITIAL_SCORE,
+        is_auto_subscribed=False,
+        is_manually_followed=follow,
+        updated_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserInterest.user_id, UserInterest.tag_id],
+        set_={
+            "is_manually_followed": follow,
+            # Settle the decay so far before moving updated_at
+            "score": decayed_score_sql(now),
+            "updated_at": now,
+        },
+    )
+    db.execute(stmt)
+
+
+def prune_interests(db: Session, below: float = INTEREST_PRUNE_BELOW) -> int:
+    """
+    Delete interests that have decayed to (almost) nothing.
+
+    Manually followed tags are kept regardless of score. Returns the number
+    of deleted rows; the caller commits.
+    """
+    deleted = db.execute(
+        UserInterest.__table__.delete()
+        .where(
+            func.coalesce(UserInterest.is_manually_followed, False).is_(False),
+            decayed_score_sql() < below,
+        )
+        .returning(UserInterest.user_id)
+    )
+    return len(deleted.all())
+
+
+def _prune_job() -> None:
+    with SessionLocal() as db:
+        pruned = prune_interests(db)
+        db.commit()
+    if pruned:
+        logger.info("Pruned %d decayed user interests", pruned)
+
+
+# Global background prune pass
+interest_pruner = PeriodicTask(
+    "interest-pruner",
+    interval_seconds=settings.interest_prune_interval_minutes * 60,
+    job=_prune_job,
+)
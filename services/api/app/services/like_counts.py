@@ -0,0 +1,148 @@
+"""Coalesced like counter updates for hot content."""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import AbstractContextManager
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.services.counter_cache import counter_cache
+from app.services.counters import bump_like_counts
+from app.services.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCountAccumulator:
+    """
+    Net like deltas per content, written to `content_stats` in one batch.
+
+    Like rows are still written synchronously by each request; only the
+    shared `like_count` counter is deferred, so thousands of likes on one
+    viral post become one row update per flush instead of one locked update
+    per request. Reads add `pending` deltas on top of the stored counter.
+
+    A background task flushes every `flush_interval_seconds`; without one
+    (tests, scripts) each `add` is written inline. Deltas lost when the
+    process dies are repaired by `scripts/reconcile_counters.py --likes`,
+    run with the API stopped so that no worker still holds deltas.
+    """
+
+    def __init__(
+        self,
+        flush_interval_seconds: float | None,
+        session_scope: Callable[[], AbstractContextManager[Session]] = SessionLocal,
+    ) -> None:
+        self.flush_interval_seconds = flush_interval_seconds
+        self.session_scope = session_scope
+        self._deltas: dict[UUID, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: PeriodicTask | None = None
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self._added = 0
+        self._written_rows = 0
+        self._failed = 0
+        self._flushes = 0
+        self._flush_ms_total = 0.0
+
+    def add(self, content_id: UUID, delta: int) -> int:
+        """
+        Record a committed like (+1) or unlike (-1).
+
+        Returns the content's pending delta including this one, for adding to
+        the counter value the caller read before the change.
+        """
+        with self._lock:
+            self._deltas[content_id] += delta
+            self._added += 1
+            pending = self._deltas[content_id]
+        if self._task is None:
+            self.flush()
+        return pending
+
+    def pending(self, content_ids: list[UUID]) -> dict[UUID, int]:
+        """Unflushed deltas for whichever of `content_ids` have any."""
+        with self._lock:
+            return {
+                cid: self._deltas[cid] for cid in content_ids if self._deltas.get(cid)
+            }
+
+    def flush(self) -> int:
+        """Write all pending deltas; returns the number of counter rows updated."""
+        with self._flush_lock:
+            with self._lock:
+                deltas = {cid: d for cid, d in self._deltas.items() if d}
+                self._deltas.clear()
+            if not deltas:
+                return 0
+
+            start = time.perf_counter()
+            with self.session_scope() as db:
+                try:
+                    written = bump_like_counts(db, deltas)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    # Keep the deltas for the next flush
+                    with self._lock:
+                        for cid, delta in deltas.items():
+                            self._deltas[cid] += delta
+                        self._failed += 1
+                    logger.exception("Like counter flush failed, will retry")
+                    return 0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._lock:
+                self._written_rows += len(written)
+                self._flushes += 1
+                self._flush_ms_total += elapsed_ms
+
+        for content_id in written:
+            counter_cache.invalidate(content_id)
+        return len(written)
+
+    def start(self) -> None:
+        """Start the background flusher (no-op without a flush interval)."""
+        if self.flush_interval_seconds is None or self._task is not None:
+            return
+        self._task = PeriodicTask(
+            "like-count-flusher", self.flush_interval_seconds, self.flush
+        )
+        self._task.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write whatever is still pending."""
+        if self._task is not None:
+            self._task.stop()
+            self._task = None
+        self.flush()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "pending_contents": sum(1 for d in self._deltas.values() if d),
+                "likes_added": self._added,
+                "rows_written": self._written_rows,
+                "failed_flushes": self._failed,
+                "flushes": self._flushes,
+                "avg_flush_ms": (
+                    round(self._flush_ms_total / self._flushes, 2)
+                    if self._flushes
+                    else 0.0
+                ),
+            }
+
+
+# Global like counter accumulator
+like_counts = LikeCountAccumulator(
+    flush_interval_seconds=settings.like_count_flush_interval_ms / 1000,
+)
@@ -0,0 +1,117 @@
+"""Full-text search over the messages of a user's conversations."""
+
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Float, cast, func, literal, select, tuple_
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.conversation import ConversationParticipant as ParticipantModel
+from app.models.message import Message as MessageModel
+from app.schemas.message import MessageSearchResult
+from app.services.cursors import decode_cursor, encode_cursor
+from app.services.inbox import message_with_sender
+
+SEARCH_CONFIG = "english"
+HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8, MaxFragments=2"
+)
+
+SearchKey = tuple[float, datetime, UUID]
+
+
+def html_escape(text):
+    """SQL equivalent of `html.escape` for a text expression."""
+    for char, entity in (
+        ("&", "&amp;"),
+        ("<", "&lt;"),
+        (">", "&gt;"),
+        ('"', "&quot;"),
+        ("'", "&#x27;"),
+    ):
+        text = func.replace(text, char, entity)
+    return text
+
+
+def encode_search_cursor(rank: float, created_at: datetime, message_id: UUID) -> str:
+    """Cursor for a (rank, created_at, id) search sort key."""
+    return encode_cursor(repr(rank), created_at.isoformat(), str(message_id))
+
+
+def decode_search_cursor(cursor: str) -> SearchKey:
+    """Decode a cursor from `encode_search_cursor`; raises ValueError."""
+    rank, created_at, message_id = decode_cursor(cursor, 3)
+    return float(rank), datetime.fromisoformat(created_at), UUID(message_id)
+
+
+def search_messages(
+    db: Session,
+    user_id: UUID,
+    q: str,
+    after: SearchKey | None = None,
+    limit: int = 20,
+) -> tuple[list[MessageSearchResult], SearchKey | None]:
+    """
+    A page of the user's messages matching `q`, best matches first.
+
+    `q` is parsed as web search syntax ("quoted phrases", -exclusions, OR).
+    Matching goes through the GIN index on the generated `body_tsv`
+    column and is limited to conversations the user takes part in. Results
+    are ranked by `ts_rank`, newest first among equal ranks, and keyset-
+    paginated on (rank, created_at, id). Snippets with the matches wrapped
+    in <mark> are only built for the returned page; the body is HTML-
+    escaped first, so <mark> is the only markup in them. Returns the page
+    and the sort key to continue after, or None on the last page.
+    """
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    # As double precision, so cursors round-trip the exact value
+    rank = cast(func.ts_rank(MessageModel.body_tsv, query), Float).label("rank")
+    key = tuple_(rank, MessageModel.created_at, MessageModel.id)
+
+    page = (
+        select(MessageModel.id, rank)
+        .join(
+            ParticipantModel,
+            ParticipantModel.conversation_id == MessageModel.conversation_id,
+        )
+        .where(
+            ParticipantModel.user_id == user_id,
+            MessageModel.body_tsv.bool_op("@@")(query),
+        )
+        .order_by(rank.desc(), MessageModel.created_at.desc(), MessageModel.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        after_rank, after_created_at, after_id = after
+        page = page.where(
+            key < tuple_(literal(after_rank, Float), after_created_at, after_id)
+        )
+    page = page.subquery()
+
+    snippet = func.ts_headline(
+        SEARCH_CONFIG, html_escape(MessageModel.body), query, HEADLINE_OPTIONS
+    )
+    rows = (
+        db.query(MessageModel, page.c.rank, snippet)
+        .join(page, page.c.id == MessageModel.id)
+        .options(joinedload(MessageModel.sender))
+        .order_by(
+            page.c.rank.desc(), MessageModel.created_at.desc(), MessageModel.id.desc()
+        )
+        .all()
+    )
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        message, last_rank, _ = rows[-1]
+        next_key = (last_rank, message.created_at, message.id)
+
+    return [
+        MessageSearchResult(
+            **message_with_sender(message, message.sender).model_dump(),
+            rank=message_rank,
+            snippet=message_snippet,
+        )
+        for message, message_rank, message_snippet in rows
+    ], next_key
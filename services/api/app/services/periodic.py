@@ -0,0 +1,44 @@
+"""Background maintenance jobs that run on a fixed interval."""
+
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs `job` every `interval_seconds` on a daemon thread.
+
+    The first run happens one interval after `start`; startup work belongs
+    in the app lifespan. Exceptions are reported and the schedule continues.
+    """
+
+    def __init__(self, name: str, interval_seconds: float, job: Callable[[], None]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.job = job
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval_seconds):
+            try:
+                self.job()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
@@ -0,0 +1,285 @@
+"""Per-user push events, fanned out across API workers via LISTEN/NOTIFY."""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy import select as sql_select
+
+from app.config import settings
+from app.db import engine
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY payloads must stay under Postgres' 8000 byte limit
+MAX_NOTIFY_PAYLOAD = 7500
+
+
+@dataclass
+class Subscription:
+    """One connected client's queue of pending events."""
+
+    user_id: UUID
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+class RealtimeHub:
+    """
+    Delivers events to the connected clients of their recipients.
+
+    `publish` is called after the caller has committed the change. With a
+    `channel`, the event goes out through `pg_notify`, and every worker,
+    including this one, fans it out from its `LISTEN` thread to its own
+    subscribers. Without one (tests, single-process scripts), events are
+    fanned out in-process only.
+
+    Each subscriber has a bounded queue. Events for a client that stops
+    reading are dropped (and counted) rather than buffered without limit;
+    clients resync from the inbox when they reconnect.
+    """
+
+    def __init__(self, channel: str | None, queue_size: int) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[UUID, dict[str, Subscription]] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._listening = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self._published = 0
+        self._publish_failed = 0
+        self._received = 0
+        self._delivered = 0
+        self._dropped = 0
+        self._lag_ms_total = 0.0
+        self._lag_ms_max = 0.0
+        self._peak_connections = self.connection_count()
+
+    def connection_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        """Register a client; call from the event loop that will read it."""
+        subscription = Subscription(
+            user_id=user_id,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            loop=asyncio.get_running_loop(),
+        )
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[subscription.id] = subscription
+            connections = sum(len(subs) for subs in self._subscribers.values())
+            self._peak_connections = max(self._peak_connections, connections)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subs = self._subscribers.get(subscription.user_id, {})
+            subs.pop(subscription.id, None)
+            if not subs:
+                self._subscribers.pop(subscription.user_id, None)
+
+    def publish(
+        self,
+        event_type: str,
+        recipients: list[UUID],
+        data: dict,
+        fallback: dict | None = None,
+    ) -> None:
+        """
+        Send an event to every connected client of `recipients`.
+
+        `data` must be JSON-serialisable (UUIDs and datetimes are converted).
+        If it is too large for a NOTIFY payload, `fallback` (a smaller body
+        telling clients what to refetch) is sent instead; recipients are
+        split across as many NOTIFYs as it takes.
+
+        NOTIFY goes out on its own pooled connection, never the caller's
+        session. The caller's change is already committed, so a failure is
+        logged and counted rather than raised.
+        """
+        event = {
+            "type": event_type,
+            "recipients": [str(user_id) for user_id in recipients],
+            "sent_at": time.time(),
+            "data": data,
+        }
+        with self._lock:
+            self._published += 1
+
+        if self.channel is None:
+            self._deliver(json.loads(json.dumps(event, default=_json_default)))
+            return
+
+        try:
+            with engine.begin() as conn:
+                for payload in notify_payloads(event, fallback):
+                    conn.execute(sql_select(func.pg_notify(self.channel, payload)))
+        except Exception:
+            with self._lock:
+                self._publish_failed += 1
+            logger.exception("Realtime publish of %s failed", event_type)
+
+    def _deliver(self, event: dict) -> None:
+        lag_ms = max((time.time() - event["sent_at"]) * 1000, 0.0)
+        recipients = {UUID(user_id) for user_id in event.pop("recipients")}
+        event.pop("sent_at")
+        with self._lock:
+            targets = [
+                sub
+                for user_id in recipients
+                for sub in self._subscribers.get(user_id, {}).values()
+            ]
+            self._received += 1
+            self._lag_ms_total += lag_ms
+            self._lag_ms_max = max(self._lag_ms_max, lag_ms)
+        for sub in targets:
+            sub.loop.call_soon_threadsafe(self._enqueue, sub, event)
+
+    def _enqueue(self, subscription: Subscription, event: dict) -> None:
+        try:
+            subscription.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            with self._lock:
+                self._dropped += 1
+            return
+        with self._lock:
+            self._delivered += 1
+
+    def start(self) -> None:
+        """Start the LISTEN thread (no-op without a channel)."""
+        if self.channel is None or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="realtime-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Realtime listener failed, reconnecting")
+                self._stopping.wait(1.0)
+
+    def _listen(self) -> None:
+        # A dedicated connection outside the pool, held for the listener's life
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            conn.cursor().execute(f'LISTEN "{self.channel}"')
+            self._listening.set()
+            while not self._stopping.is_set():
+                for payload in _wait_for_notifies(conn, timeout=1.0):
+                    self._deliver(json.loads(payload))
+        finally:
+            self._listening.clear()
+            conn.close()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "connections": sum(len(s) for s in self._subscribers.values()),
+                "connected_users": len(self._subscribers),
+                "peak_connections": self._peak_connections,
+                "listening": self._listening.is_set(),
+                "published": self._published,
+                "publish_failed": self._publish_failed,
+                "received": self._received,
+                "delivered": self._delivered,
+                "dropped": self._dropped,
+                # Commit-to-fan-out time, including the NOTIFY round trip
+                "avg_delivery_lag_ms": (
+                    round(self._lag_ms_total / self._received, 2)
+                    if self._received
+                    else 0.0
+                ),
+                "max_delivery_lag_ms": round(self._lag_ms_max, 2),
+            }
+
+
+def _wait_for_notifies(conn, timeout: float):
+    """Yield NOTIFY payloads as they arrive, for up to `timeout` seconds."""
+    if callable(getattr(conn, "notifies", None)):
+        # psycopg 3
+        for notify in conn.notifies(timeout=timeout):
+            yield notify.payload
+        return
+    # psycopg2
+    if select.select([conn], [], [], timeout)[0]:
+        conn.poll()
+        while conn.notifies:
+            yield conn.notifies.pop(0).payload
+
+
+def notify_payloads(event: dict, fallback: dict | None) -> list[str]:
+    """
+    Encode an event as NOTIFY payloads that each fit MAX_NOTIFY_PAYLOAD.
+
+    Falls back to the `fallback` body if `data` doesn't fit even for one
+    recipient, then halves the recipient list until every part fits.
+    """
+
+    def encode(part: dict) -> str:
+        return json.dumps(part, default=_json_default)
+
+    def fits(part: dict) -> bool:
+        return len(encode(part).encode()) <= MAX_NOTIFY_PAYLOAD
+
+    if not fits({**event, "recipients": event["recipients"][:1]}):
+        event = {**event, "data": fallback or {}, "truncated": True}
+
+    def split(part: dict) -> list[str]:
+        recipients = part["recipients"]
+        if len(recipients) <= 1 or fits(part):
+            return [encode(part)]
+        half = len(recipients) // 2
+        return [
+            *split({**part, "recipients": recipients[:half]}),
+            *split({**part, "recipients": recipients[half:]}),
+        ]
+
+    return split(event)
+
+
+def format_sse(event: dict) -> str:
+    """Encode a delivered event as a server-sent event frame."""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _json_default(value):
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serialisable")
+
+
+# Global realtime hub instance
+realtime_hub = RealtimeHub(
+    channel=settings.realtime_channel,
+    queue_size=settings.realtime_queue_size,
+)
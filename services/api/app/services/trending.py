@@ -0,0 +1,288 @@
+"""In-process trending engine over exponentially decayed engagement events."""
+
+import heapq
+import logging
+import math
+import random
+import threading
+import time
+from contextlib import AbstractContextManager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Hashable
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.comment import Comment
+from app.models.like import Like
+from app.models.view_event import ViewEvent
+
+logger = logging.getLogger(__name__)
+
+# Weight of each signal in the combined "trending" score
+SIGNAL_WEIGHTS = {"view": 1.0, "like": 3.0, "comment": 5.0}
+
+# Rescale forward-decayed weights before they approach float overflow
+MAX_DECAY_EXPONENT = 64.0
+
+
+class CountMinSketch:
+    """Fixed-size frequency sketch; estimates never undercount."""
+
+    # Mersenne prime modulus for the per-row (a * h + b) mod p hash family
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, width: int, depth: int, seed: int = 0) -> None:
+        self.width = width
+        self.depth = depth
+        self._table = np.zeros((depth, width), dtype=np.float64)
+        self._rows = np.arange(depth)
+        rng = random.Random(seed)
+        self._hash_params = [
+            (rng.randrange(1, self.PRIME), rng.randrange(self.PRIME))
+            for _ in range(depth)
+        ]
+
+    def _cells(self, key: Hashable) -> list[int]:
+        h = hash(key) % self.PRIME
+        return [((a * h + b) % self.PRIME) % self.width for a, b in self._hash_params]
+
+    def add(self, key: Hashable, weight: float) -> float:
+        """Add `weight` to `key` and return its new estimate."""
+        cells = self._cells(key)
+        self._table[self._rows, cells] += weight
+        return float(self._table[self._rows, cells].min())
+
+    def estimate(self, key: Hashable) -> float:
+        return float(self._table[self._rows, self._cells(key)].min())
+
+    def scale(self, factor: float) -> None:
+        self._table *= factor
+
+    def clear(self) -> None:
+        self._table.fill(0.0)
+
+
+class DecayedTopK:
+    """
+    Heavy hitters of an event stream whose weights halve every half-life.
+
+    Uses forward decay: an event at time t adds 2^((t - landmark) / half_life),
+    so older totals never need touching and relative order is time-invariant.
+    Scores live in a Count-Min sketch; only the `capacity` heaviest keys are
+    kept as top-K candidates, so memory is bounded regardless of catalogue
+    size. Not thread-safe; `TrendingEngine` serialises access.
+    """
+
+    def __init__(
+        self,
+        half_life_seconds: float,
+        capacity: int,
+        sketch_width: int,
+        sketch_depth: int,
+    ) -> None:
+        self.half_life_seconds = half_life_seconds
+        self.capacity = capacity
+        self._sketch = CountMinSketch(sketch_width, sketch_depth)
+        self._candidates: dict[Hashable, float] = {}
+        self._landmark = time.time()
+
+    def _exponent(self, at: float) -> float:
+        return (at - self._landmark) / self.half_life_seconds
+
+    def add(self, key: Hashable, weight: float = 1.0, at: float | None = None) -> None:
+        at = time.time() if at is None else at
+        if self._exponent(at) > MAX_DECAY_EXPONENT:
+            self._rescale(at)
+
+        score = self._sketch.add(key, weight * math.pow(2.0, self._exponent(at)))
+        self._candidates[key] = score
+
+        # Amortised pruning back to the heaviest `capacity` keys
+        if len(self._candidates) > 2 * self.capacity:
+            keep = heapq.nlargest(
+                self.capacity, self._candidates.items(), key=lambda kv: kv[1]
+            )
+            self._candidates = dict(keep)
+
+    def _rescale(self, at: float) -> None:
+        factor = math.pow(2.0, -self._exponent(at))
+        self._sketch.scale(factor)
+        self._candidates = {k: s * factor for k, s in self._candidates.items()}
+        self._landmark = at
+
+    def top(self, k: int, now: float | None = None) -> list[tuple[Hashable, float]]:
+        """The `k` heaviest keys with their scores decayed to `now`."""
+        now = time.time() if now is None else now
+        decay = math.pow(2.0, -self._exponent(now))
+        best = heapq.nlargest(k, self._candidates.items(), key=lambda kv: kv[1])
+        return [(key, score * decay) for key, score in best]
+
+    def discard(self, key: Hashable) -> None:
+        self._candidates.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def clear(self) -> None:
+        self._sketch.clear()
+        self._candidates.clear()
+        self._landmark = time.time()
+
+
+class TrendingEngine:
+    """
+    Decayed per-content scores for each engagement signal.
+
+    Keeps one `DecayedTopK` per signal ("view", "like", "comment") plus a
+    combined "trending" tracker weighted by `SIGNAL_WEIGHTS`.
+    """
+
+    def __init__(
+        self,
+        half_life_hours: float,
+        capacity: int,
+        sketch_width: int,
+        sketch_depth: int,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._trackers = {
+            name: DecayedTopK(
+                half_life_seconds=half_life_hours * 3600,
+                capacity=capacity,
+                sketch_width=sketch_width,
+                sketch_depth=sketch_depth,
+            )
+            for name in (*SIGNAL_WEIGHTS, "trending")
+        }
+        self._events = 0
+        self.background_rebuild = True
+
+    def record(
+        self,
+        content_id: UUID,
+        signal: str,
+        at: datetime | None = None,
+        count: int = 1,
+    ) -> None:
+        """Ingest `count` engagement events (defaults to now; naive times are UTC)."""
+        weight = SIGNAL_WEIGHTS[signal]
+        if at is None:
+            ts = time.time()
+        elif at.tzinfo is None:
+            ts = at.replace(tzinfo=timezone.utc).timestamp()
+        else:
+            ts = at.timestamp()
+        with self._lock:
+            self._trackers[signal].add(content_id, count, at=ts)
+            self._trackers["trending"].add(content_id, weight * count, at=ts)
+            self._events += count
+
+    def top(self, signal: str, k: int) -> list[tuple[UUID, float]]:
+        """Top `k` content IDs for a signal (or "trending") with decayed scores."""
+        with self._lock:
+            return self._trackers[signal].top(k)
+
+    def discard(self, content_id: UUID) -> None:
+        """Forget deleted content."""
+        with self._lock:
+            for tracker in self._trackers.values():
+                tracker.discard(content_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            for tracker in self._trackers.values():
+                tracker.clear()
+            self._events = 0
+
+    def rebuild(self, db: Session, hours: int) -> int:
+        """
+        Replay the last `hours` of views, likes and comments; returns events.
+
+        Events are counted per content, signal and minute in SQL, so the
+        replay is one `record` per bucket rather than per stored row. At
+        the default half-life a minute of skew changes a score by 0.2%.
+        """
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        events = union_all(
+            *(
+                _bucketed(model, signal, since)
+                for model, signal in (
+                    (ViewEvent, "view"),
+                    (Like, "like"),
+                    (Comment, "comment"),
+                )
+            )
+        )
+
+        self.clear()
+        replayed = 0
+        for content_id, at, signal, count in db.execute(events).yield_per(1000):
+            self.record(content_id, signal, at=at, count=count)
+            replayed += count
+        return replayed
+
+    def start_rebuild(
+        self,
+        hours: int,
+        session_scope: Callable[[], AbstractContextManager[Session]] = SessionLocal,
+    ) -> None:
+        """
+        Rebuild from the last `hours` of events without blocking startup.
+
+        The replay runs on a daemon thread and `top` serves partial scores
+        until it finishes. With `background_rebuild` off (tests) it runs
+        inline.
+        """
+
+        def run() -> None:
+            try:
+                with session_scope() as db:
+                    replayed = self.rebuild(db, hours)
+                logger.info("Trending engine rebuilt from %d recent events", replayed)
+            except Exception:
+                logger.exception("Trending engine rebuild failed")
+
+        if not self.background_rebuild:
+            run()
+            return
+        threading.Thread(target=run, name="trending-rebuild", daemon=True).start()
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._events = 0
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "events": self._events,
+                "tracked": {name: len(t) for name, t in self._trackers.items()},
+            }
+
+
+def _bucketed(model, signal: str, since: datetime):
+    """Per-minute event counts of one signal since `since`."""
+    minute = func.date_trunc("minute", model.created_at)
+    return (
+        select(
+            model.content_id,
+            minute.label("at"),
+            literal(signal).label("signal"),
+            func.count().label("count"),
+        )
+        .where(model.created_at >= since)
+        .group_by(model.content_id, minute)
+    )
+
+
+# Global trending engine instance
+trending_engine = TrendingEngine(
+    half_life_hours=settings.trending_half_life_hours,
+    capacity=settings.trending_capacity,
+    sketch_width=settings.trending_sketch_width,
+    sketch_depth=settings.trending_sketch_depth,
+)
@@ -0,0 +1,142 @@
+"""Thread-safe in-process LRU cache with a TTL, shared by the service caches."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU cache of up to `max_entries` values that expire after `ttl_seconds`.
+
+    Reads refresh an entry's recency but not its age. Expired entries are
+    dropped when read; the LRU bound keeps the ones never read again from
+    piling up. Hits and misses are counted for `/qa/metrics`.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, key: K, now: float) -> V | None:
+        entry = self._entries.get(key)
+        if entry is not None and now - entry[0] > self.ttl_seconds:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            return self._lookup(key, time.monotonic())
+
+    def get_many(self, keys: Iterable[K]) -> dict[K, V]:
+        """Fresh values for whichever of `keys` are cached."""
+        now = time.monotonic()
+        found: dict[K, V] = {}
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key, now)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def put(self, key: K, value: V) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, values: dict[K, V]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (now, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def patch(self, key: K, value: V) -> None:
+        """Replace a cached value without changing its age or recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], value)
+
+    def items(self) -> list[tuple[K, V]]:
+        """A copy of every cached (key, value), including expired ones."""
+        with self._lock:
+            return [(key, entry[1]) for key, entry in self._entries.items()]
+
+    def discard(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+class InvalidationClock(Generic[K]):
+    """
+    Detects cache writes that raced with an invalidation of their key.
+
+    A writer takes a `token` before reading the source of truth and passes
+    it to `is_current` before storing what it read. Invalidations are
+    stamped from the same clock, so a write is stale exactly when its key
+    (or everything, via `invalidate_all`) was stamped after its token.
+
+    Per-key stamps are bounded by `max_keys`; the oldest are folded into
+    the global epoch, which can void a few extra writes but never keeps a
+    stale one. Not thread-safe on its own; callers hold their own lock.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        self._clock = 0
+        self._epoch = 0
+        self._stamps: OrderedDict[K, int] = OrderedDict()
+
+    def token(self) -> int:
+        return self._clock
+
+    def invalidate(self, key: K) -> None:
+        self._clock += 1
+        self._stamps[key] = self._clock
+        self._stamps.move_to_end(key)
+        while len(self._stamps) > self.max_keys:
+            _, stamp = self._stamps.popitem(last=False)
+            self._epoch = max(self._epoch, stamp)
+
+    def invalidate_all(self) -> None:
+        self._clock += 1
+        self._epoch = self._clock
+
+    def is_current(self, key: K, token: int) -> bool:
+        return token >= self._epoch and self._stamps.get(key, 0) <= token
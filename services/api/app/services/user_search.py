@@ -0,0 +1,145 @@
+"""Trigram-indexed user directory search for the new message picker."""
+
+from uuid import UUID
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User as UserModel
+from app.schemas.user import UserPublic
+from app.services.ttl_cache import TTLCache
+
+# Shortest query pg_trgm can match anywhere in a string; shorter queries
+# only match the start of a word
+MIN_SUBSTRING_LENGTH = 3
+
+CacheKey = tuple[str, int]
+
+
+class UserSearchCache:
+    """
+    In-process LRU cache of directory search results for short queries.
+
+    The picker sends a request per keystroke, so the first one or two
+    letters of names are by far the most common queries, and also the ones
+    matching the most users. Only queries up to `max_query_length`
+    characters are cached; results are shared by all callers and expire
+    after `ttl_seconds`. Registration and login call `invalidate_all` when
+    they create a user.
+    """
+
+    def __init__(
+        self, ttl_seconds: float, max_entries: int, max_query_length: int
+    ) -> None:
+        self.max_query_length = max_query_length
+        self._cache: TTLCache[CacheKey, list[UserPublic]] = TTLCache(
+            ttl_seconds, max_entries
+        )
+
+    def reset_metrics(self) -> None:
+        self._cache.reset_metrics()
+
+    def cacheable(self, q: str) -> bool:
+        return len(q) <= self.max_query_length
+
+    def get(self, q: str, limit: int) -> list[UserPublic] | None:
+        return self._cache.get((q, limit))
+
+    def set(self, q: str, limit: int, users: list[UserPublic]) -> None:
+        self._cache.put((q, limit), users)
+
+    def invalidate_all(self) -> None:
+        self._cache.clear()
+
+    def get_metrics(self) -> dict:
+        return self._cache.get_metrics()
+
+
+def escape_like(q: str) -> str:
+    """Escape LIKE wildcards so `q` matches literally."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def query_users(db: Session, q: str, limit: int) -> list[UserPublic]:
+    """
+    Up to `limit` users whose name or email matches `q`, best first.
+
+    Queries of at least MIN_SUBSTRING_LENGTH characters match anywhere in
+    the display name or email; shorter ones match the start of the email
+    or of any word in the display name. Every pattern can be served by the
+    pg_trgm GIN indexes on both columns.
+
+    Names or emails starting with `q` come first, then names with a word
+    starting with `q`, then other matches; within each group users are
+    ordered by trigram similarity to `q`.
+    """
+    term = escape_like(q)
+    starts = or_(
+        UserModel.display_name.ilike(f"{term}%"),
+        UserModel.email.ilike(f"{term}%"),
+    )
+    word_starts = UserModel.display_name.ilike(f"% {term}%")
+    if len(q) >= MIN_SUBSTRING_LENGTH:
+        match = or_(
+            UserModel.display_name.ilike(f"%{term}%"),
+            UserModel.email.ilike(f"%{term}%"),
+        )
+    else:
+        match = or_(starts, word_starts)
+
+    similarity = func.greatest(
+        func.similarity(UserModel.display_name, q),
+        func.similarity(UserModel.email, q),
+    )
+    users = (
+        db.query(UserModel)
+        .filter(match)
+        .order_by(
+            case((starts, 0), (word_starts, 1), else_=2),
+            similarity.desc(),
+            UserModel.display_name,
+            UserModel.id,
+        )
+        .limit(limit)
+        .all()
+    )
+    return [
+        UserPublic(
+            id=u.id,
+            display_name=u.display_name,
+            avatar_url=u.avatar_url,
+            role=u.role,
+            department=u.department,
+        )
+        for u in users
+    ]
+
+
+def search_users(
+    db: Session, q: str, exclude_user_id: UUID, limit: int = 20
+) -> list[UserPublic]:
+    """
+    Directory search for the new message picker, without the caller.
+
+    Short queries are answered from `user_search_cache` when possible.
+    Results are fetched and cached for all callers, with one extra row so
+    that dropping the caller still leaves `limit` users.
+    """
+    key = q.lower()
+    users = None
+    if user_search_cache.cacheable(key):
+        users = user_search_cache.get(key, limit)
+    if users is None:
+        users = query_users(db, key, limit + 1)
+        if user_search_cache.cacheable(key):
+            user_search_cache.set(key, limit, users)
+    return [u for u in users if u.id != exclude_user_id][:limit]
+
+
+# Global user search cache instance
+user_search_cache = UserSearchCache(
+    ttl_seconds=settings.user_search_cache_ttl_seconds,
+    max_entries=settings.user_search_cache_max_entries,
+    max_query_length=settings.user_search_cache_max_query_length,
+)
@@ -0,0 +1,314 @@
+"""Write-behind ingestion of view events."""
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Callable
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.models.content import Content
+from app.models.tag import content_tag_association
+from app.models.view_event import ViewEvent
+from app.services.counters import bump_view_counts
+from app.services.feed_cache import feed_cache
+from app.services.interests import add_interest_scores, view_interest_increment
+from app.services.trending import trending_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PendingView:
+    """A view event accepted by the API but not yet written."""
+
+    user_id: UUID
+    content_id: UUID
+    view_duration_seconds: int
+    completion_percent: float
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Failed writes so far; dropped after `ViewIngestBuffer.max_attempts`
+    attempts: int = 0
+
+
+def write_view_batch(db: Session, views: list[PendingView]) -> list[PendingView]:
+    """
+    Persist a batch of views in the caller's transaction.
+
+    Inserts all events in one multi-row INSERT, bumps view counters with one
+    upsert and folds interest updates per (user, tag). Views of content that
+    no longer exists are dropped. Returns the views that were written.
+    """
+    content_ids = {view.content_id for view in views}
+    tags_by_content: dict[UUID, list[UUID]] = {}
+    rows = db.execute(
+        select(Content.id, content_tag_association.c.tag_id)
+        .outerjoin(
+            content_tag_association,
+            content_tag_association.c.content_id == Content.id,
+        )
+        .where(Content.id.in_(content_ids))
+    )
+    for content_id, tag_id in rows:
+        tags = tags_by_content.setdefault(content_id, [])
+        if tag_id is not None:
+            tags.append(tag_id)
+
+    written = [view for view in views if view.content_id in tags_by_content]
+    if not written:
+        return []
+
+    db.execute(
+        insert(ViewEvent).values(
+            [
+                {
+                    "user_id": view.user_id,
+                    "content_id": view.content_id,
+                    "view_duration_seconds": view.view_duration_seconds,
+                    "completion_percent": view.completion_percent,
+                    "created_at": view.created_at,
+                }
+                for view in written
+            ]
+        )
+    )
+    bump_view_counts(db, Counter(view.content_id for view in written))
+
+    increments: dict[tuple[UUID, UUID], float] = defaultdict(float)
+    for view in written:
+        for tag_id in tags_by_content[view.content_id]:
+            increments[(view.user_id, tag_id)] += view_interest_increment(
+                view.completion_percent
+            )
+    add_interest_scores(db, increments)
+
+    return written
+
+
+class ViewIngestBuffer:
+    """
+    Bounded in-memory queue of view events, flushed to the database in batches.
+
+    `submit` only enqueues. A background flusher writes a batch as soon as
+    `batch_size` events are waiting, or every `flush_interval_seconds`
+    otherwise. Without a running flusher (tests, scripts) full batches are
+    written inline by `submit`. Views submitted together are never split
+    across batches. When `max_pending` events are queued, `submit` refuses
+    new ones so callers can push back on clients.
+
+    A batch that fails on a constraint (e.g. a viewer deleted while their
+    views were queued) is retried row by row, dropping only the offending
+    views. Other failures (deadlocks, a dropped connection) requeue the
+    views for the next flush, up to `max_attempts` writes each.
+
+    Events still queued when the process dies are lost; `stop` drains the
+    queue on a clean shutdown.
+    """
+
+    def __init__(
+        self,
+        max_pending: int,
+        batch_size: int,
+        flush_interval_seconds: float | None,
+        max_attempts: int = 3,
+        session_scope: Callable[[], AbstractContextManager[Session]] = SessionLocal,
+    ) -> None:
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_attempts = max_attempts
+        self.session_scope = session_scope
+        self._pending: deque[list[PendingView]] = deque()
+        # Views to write again on the next flush, not this one
+        self._retry: list[PendingView] = []
+        self._depth = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.reset_metrics()
+
+    def reset_metrics(self) -> None:
+        self._accepted = 0
+        self._rejected = 0
+        self._written = 0
+        self._retried = 0
+        self._failed = 0
+        self._flushes = 0
+        self._flush_ms_total = 0.0
+        self._last_flush_ms = 0.0
+
+    def submit(self, views: list[PendingView]) -> bool:
+        """Queue views for writing; False (nothing queued) if the buffer is full."""
+        with self._lock:
+            if self._depth + len(views) > self.max_pending:
+                self._rejected += len(views)
+                return False
+            if not views:
+                return True
+            self._pending.append(views)
+            self._depth += len(views)
+            self._accepted += len(views)
+            full = self._depth >= self.batch_size
+
+        if full:
+            if self._thread is not None:
+                self._wakeup.set()
+            else:
+                self.flush()
+        return True
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of views written."""
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                if self._retry:
+                    self._pending.appendleft(self._retry)
+                    self._depth += len(self._retry)
+                    self._retry = []
+            while True:
+                batch: list[PendingView] = []
+                with self._lock:
+                    while self._pending and (
+                        not batch
+                        or len(batch) + len(self._pending[0]) <= self.batch_size
+                    ):
+                        batch.extend(self._pending.popleft())
+                    self._depth -= len(batch)
+                if not batch:
+                    return written
+                written += self._write(batch)
+
+    def _write(self, batch: list[PendingView]) -> int:
+        start = time.perf_counter()
+        try:
+            written = self._commit(batch)
+        except IntegrityError as e:
+            logger.warning(
+                "View batch of %d hit a constraint, writing row by row: %s",
+                len(batch),
+                e.orig,
+            )
+            written = []
+            for view in batch:
+                try:
+                    written.extend(self._commit([view]))
+                except IntegrityError as e:
+                    self._drop([view], e)
+                except Exception as e:
+                    self._requeue([view], e)
+        except Exception as e:
+            self._requeue(batch, e)
+            return 0
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._written += len(written)
+            self._flushes += 1
+            self._flush_ms_total += elapsed_ms
+            self._last_flush_ms = elapsed_ms
+
+        for user_id in {view.user_id for view in written}:
+            feed_cache.invalidate_user(user_id)
+        for view in written:
+            trending_engine.record(view.content_id, "view", at=view.created_at)
+        return len(written)
+
+    def _commit(self, views: list[PendingView]) -> list[PendingView]:
+        with self.session_scope() as db:
+            try:
+                written = write_view_batch(db, views)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+        return written
+
+    def _requeue(self, views: list[PendingView], error: Exception) -> None:
+        """Retry views on the next flush, dropping those out of attempts."""
+        retry = [
+            replace(view, attempts=view.attempts + 1)
+            for view in views
+            if view.attempts + 1 < self.max_attempts
+        ]
+        if retry:
+            with self._lock:
+                self._retry.extend(retry)
+                self._retried += len(retry)
+            logger.warning(
+                "View write failed, retrying %d events: %s", len(retry), error
+            )
+        exhausted = [v for v in views if v.attempts + 1 >= self.max_attempts]
+        if exhausted:
+            self._drop(exhausted, error)
+
+    def _drop(self, views: list[PendingView], error: Exception) -> None:
+        with self._lock:
+            self._failed += len(views)
+        logger.error(
+            "Dropped %d view events that could not be written: %s", len(views), error
+        )
+
+    def start(self) -> None:
+        """Start the background flusher (no-op without a flush interval)."""
+        if self.flush_interval_seconds is None or self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="view-ingest-flusher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write whatever is still queued."""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval_seconds)
+            self._wakeup.clear()
+            self.flush()
+
+    def get_metrics(self) -> dict:
+        with self._lock:
+            return {
+                "queue_depth": self._depth,
+                "max_pending": self.max_pending,
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "written": self._written,
+                "retried": self._retried,
+                "failed": self._failed,
+                "flushes": self._flushes,
+                "avg_flush_ms": (
+                    round(self._flush_ms_total / self._flushes, 2)
+                    if self._flushes
+                    else 0.0
+                ),
+                "last_flush_ms": round(self._last_flush_ms, 2),
+            }
+
+
+# Global view ingestion buffer
+view_ingest = ViewIngestBuffer(
+    max_pending=settings.view_ingest_max_pending,
+    batch_size=settings.view_ingest_batch_size,
+    flush_interval_seconds=settings.view_ingest_flush_interval_ms / 1000,
+    max_attempts=settings.view_ingest_max_attempts,
+)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Benchmark deep comment pagination on a post with 100k comments.
+
+Loads a throwaway post with --comments top-level comments, then times
+page 1 and deep pages of
+`fetch_comment_page` with keyset cursors against the legacy OFFSET paging.
+With the (content_id, parent_id, created_at, id) index a keyset page costs
+the same however deep it is; OFFSET grows with the page number.
+
+Everything created is deleted afterwards.
+
+Run with: uv run python scripts/bench_comment_pages.py [--comments 100000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.db import Base, SessionLocal, engine, upgrade_schema
+from app.models.content import Content
+from app.models.user import User
+from app.services.comments import fetch_comment_page
+
+PAGE_SIZE = 50
+REPEATS = 20
+
+
+def create_fixture(comments: int) -> tuple[uuid.UUID, uuid.UUID]:
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        user = User(email=f"bench-{run}@pulsync.io", display_name="Bench")
+        db.add(user)
+        db.flush()
+        content = Content(
+            author_id=user.id, content_type="video", title=f"Busy post {run}"
+        )
+        db.add(content)
+        db.flush()
+        # Timestamps repeat every 1000 rows so pages cross created_at ties
+        db.execute(
+            text(
+                "INSERT INTO comments"
+                " (id, content_id, author_id, parent_id, body, created_at, updated_at)"
+                " SELECT gen_random_uuid(), :content_id, :user_id, NULL,"
+                " 'comment ' || n, now() - (n % 1000) * interval '1 minute', now()"
+                " FROM generate_series(1, :n) AS n"
+            ),
+            {"content_id": content.id, "user_id": user.id, "n": comments},
+        )
+        db.execute(text("ANALYZE comments"))
+        db.commit()
+        return user.id, content.id
+
+
+def time_page(db, content_id, after=None, skip=0) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fetch_comment_page(db, content_id, None, after, PAGE_SIZE, skip)
+        timings.append((time.perf_counter() - start) * 1000)
+        db.expunge_all()
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--comments", type=int, default=100_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+    print(f"Creating a post with {args.comments} comments...")
+    user_id, content_id = create_fixture(args.comments)
+    try:
+        with SessionLocal() as db:
+            print(f"\n{'page':>6} {'keyset ms':>10} {'offset ms':>10}")
+            last_page = args.comments // PAGE_SIZE
+            for page in (1, 10, 100, last_page // 2, last_page):
+                skip = (page - 1) * PAGE_SIZE
+                after = None
+                if skip:
+                    # Cursor of the row just before the page (setup, untimed)
+                    _, after = fetch_comment_page(
+                        db, content_id, None, None, 1, skip - 1
+                    )
+                keyset = time_page(db, content_id, after=after)
+                offset = time_page(db, content_id, skip=skip)
+                print(f"{page:>6} {keyset:>10.2f} {offset:>10.2f}")
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.id == user_id).delete()
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Benchmark many concurrent clients liking the same piece of content.
+
+Compares two write paths for the shared `content_stats.like_count` row:
+
+  direct     like row and counter bumped in the same transaction, so every
+             request waits on the counter row lock held by the one before it
+  coalesced  like row committed alone; the counter delta goes through the
+             `like_counts` accumulator and is flushed in the background
+
+Creates throwaway users and one post, prints throughput and latency for
+each mode, checks the final counter, then deletes everything it created.
+
+Run with: uv run python scripts/bench_hot_likes.py [--clients 32] [--likes 2000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import Base, SessionLocal, engine, upgrade_schema
+from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.models.user import User
+from app.services.counters import bump_content_stats
+from app.services.interactions import set_like
+from app.services.like_counts import like_counts
+
+
+def create_fixtures(likes: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        users = [
+            User(email=f"bench-{run}-{i}@pulsync.io", display_name=f"Bench {i}")
+            for i in range(likes)
+        ]
+        db.add_all(users)
+        db.flush()
+        content = Content(
+            author_id=users[0].id,
+            content_type="video",
+            title=f"Hot post {run}",
+            is_company_important=True,
+        )
+        db.add(content)
+        db.commit()
+        return content.id, [user.id for user in users]
+
+
+def like_direct(content_id: uuid.UUID, user_id: uuid.UUID) -> float:
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        if set_like(db, user_id, content_id, liked=True).changed:
+            bump_content_stats(db, content_id, likes=1)
+        db.commit()
+    return time.perf_counter() - start
+
+
+def like_coalesced(content_id: uuid.UUID, user_id: uuid.UUID) -> float:
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        changed = set_like(db, user_id, content_id, liked=True).changed
+        db.commit()
+    if changed:
+        like_counts.add(content_id, 1)
+    return time.perf_counter() - start
+
+
+def run_mode(name: str, like, clients: int, likes: int) -> None:
+    content_id, user_ids = create_fixtures(likes)
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            latencies = list(pool.map(lambda uid: like(content_id, uid), user_ids))
+        elapsed = time.perf_counter() - start
+        like_counts.flush()
+
+        with SessionLocal() as db:
+            stats = db.get(ContentStats, content_id)
+            stored = stats.like_count if stats else 0
+
+        latencies_ms = sorted(latency * 1000 for latency in latencies)
+        p99 = latencies_ms[int(len(latencies_ms) * 0.99) - 1]
+        print(
+            f"{name:<10} {likes / elapsed:>9.0f} likes/s"
+            f"  p50 {statistics.median(latencies_ms):>7.2f} ms"
+            f"  p99 {p99:>7.2f} ms"
+            f"  counter {stored}/{likes}"
+        )
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.id.in_(user_ids)).delete(
+                synchronize_session=False
+            )
+            db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--likes", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+    print(f"{args.likes} likes on one post from {args.clients} concurrent clients\n")
+    run_mode("direct", like_direct, args.clients, args.likes)
+    like_counts.start()
+    try:
+        run_mode("coalesced", like_coalesced, args.clients, args.likes)
+    finally:
+        like_counts.stop()
+    print(f"\nlike_counts: {like_counts.get_metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+"""
+Benchmark message search over a few million synthetic messages.
+
+Loads --messages messages spread over --conversations DMs between
+--users users, with bodies drawn from a skewed vocabulary so some terms
+are common and others rare. Then times `search_messages` for one user in
+1000 conversations: the first page and a deep page (by cursor) for common,
+rare and phrase queries, against a plain ILIKE scan of the same user's
+conversations.
+
+Everything created is deleted afterwards.
+
+Run with: uv run python scripts/bench_message_search.py [--messages 2000000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.db import Base, SessionLocal, engine, upgrade_schema
+from app.models.conversation import Conversation, ConversationParticipant
+from app.models.message import Message
+from app.models.user import User
+from app.services.message_search import search_messages
+
+REPEATS = 10
+PAGE_SIZE = 20
+USER_CONVERSATIONS = 1_000
+
+# Earlier words are drawn far more often (index ~ random()^3)
+VOCABULARY = (
+    "the a to and is for on we it that this with can you will be are have "
+    "team meeting today tomorrow update thanks please review deploy release "
+    "build test ship customer launch plan sync notes draft doc design bug fix "
+    "roadmap budget hiring offsite quarterly metrics dashboard incident "
+    "postmortem migration latency outage rollback kubernetes invoice contract "
+    "legal onboarding benefits payroll audit compliance retrospective "
+    "whiteboard prototype accessibility localization pagination telemetry"
+).split()
+
+QUERIES = {
+    "common": "review",
+    "rare": "telemetry",
+    "phrase": '"deploy release"',
+    "two terms": "incident rollback",
+}
+
+
+def create_fixture(users: int, conversations: int, messages: int):
+    run = uuid.uuid4().hex[:8]
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    conversation_ids = [uuid.uuid4() for _ in range(conversations)]
+    with SessionLocal() as db:
+        db.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "id": user_id,
+                    "email": f"bench-{run}-{i}@pulsync.io",
+                    "display_name": f"Bench {i}",
+                }
+                for i, user_id in enumerate(user_ids)
+            ],
+        )
+        db.execute(
+            Conversation.__table__.insert(),
+            [{"id": conversation_id} for conversation_id in conversation_ids],
+        )
+        # The benchmarked user is in the first USER_CONVERSATIONS DMs (5% of
+        # messages by default); the rest pair random other users
+        me = user_ids[0]
+        db.execute(
+            ConversationParticipant.__table__.insert(),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "conversation_id": conversation_id,
+                    "user_id": user_id,
+                    "unread_count": 0,
+                }
+                for i, conversation_id in enumerate(conversation_ids)
+                for user_id in (
+                    me if i < USER_CONVERSATIONS else user_ids[1 + i % (users - 1)],
+                    user_ids[1 + (i * 7 + 3) % (users - 1)],
+                )
+            ],
+        )
+        db.commit()
+
+        batch = 250_000
+        for start in range(0, messages, batch):
+            db.execute(
+                text(
+                    "INSERT INTO messages"
+                    " (id, conversation_id, sender_id, body, created_at, updated_at)"
+                    " SELECT gen_random_uuid(), c.ids[1 + n % :nc], :me,"
+                    "  array_to_string(ARRAY("
+                    "   SELECT (CAST(:words AS text[]))"
+                    "    [1 + floor(power(random(), 3) * :nw)::int]"
+                    "   FROM generate_series(1, 6 + n % 9)), ' '),"
+                    "  now() - n * interval '1 second', now()"
+                    " FROM generate_series(:lo, :hi) AS n,"
+                    "  (SELECT CAST(:conversations AS uuid[]) AS ids) AS c"
+                ),
+                {
+                    "nc": conversations,
+                    "me": me,
+                    "words": VOCABULARY,
+                    "nw": len(VOCABULARY),
+                    "lo": start + 1,
+                    "hi": min(start + batch, messages),
+                    "conversations": conversation_ids,
+                },
+            )
+            db.commit()
+            print(f"  {min(start + batch, messages)} messages")
+    # As autovacuum would have: visibility map, hint bits and statistics
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE messages, conversation_participants"))
+    return me, user_ids, conversation_ids
+
+
+def median_ms(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def ilike_scan(db, user_id, term: str):
+    return db.execute(
+        text(
+            "SELECT m.id FROM messages m"
+            " JOIN conversation_participants p"
+            "  ON p.conversation_id = m.conversation_id"
+            " WHERE p.user_id = :user_id AND m.body ILIKE :pattern"
+            " ORDER BY m.created_at DESC LIMIT :limit"
+        ),
+        {"user_id": user_id, "pattern": f"%{term}%", "limit": PAGE_SIZE},
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--conversations", type=int, default=20_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+    print(f"Creating {args.messages} messages in {args.conversations} DMs...")
+    me, user_ids, conversation_ids = create_fixture(
+        args.users, args.conversations, args.messages
+    )
+    try:
+        with SessionLocal() as db:
+            print(
+                f"\n{'query':>10} {'page 1 ms':>10} {'page 5 ms':>10} {'ILIKE ms':>9}"
+            )
+            for name, q in QUERIES.items():
+                # Cursor to the fifth page (setup, untimed)
+                after = None
+                for _ in range(4):
+                    _, after = search_messages(db, me, q, after, PAGE_SIZE)
+                    if after is None:
+                        break
+                first = median_ms(lambda: search_messages(db, me, q, None, PAGE_SIZE))
+                deep = (
+                    median_ms(lambda: search_messages(db, me, q, after, PAGE_SIZE))
+                    if after
+                    else float("nan")
+                )
+                term = q.strip('"').split()[0]
+                scan = median_ms(lambda: ilike_scan(db, me, term))
+                print(f"{name:>10} {first:>10.2f} {deep:>10.2f} {scan:>9.2f}")
+    finally:
+        with SessionLocal() as db:
+            db.query(Message).filter(Message.sender_id == me).delete()
+            db.query(Conversation).filter(
+                Conversation.id.in_(conversation_ids)
+            ).delete()
+            db.query(User).filter(User.id.in_(user_ids)).delete()
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Benchmark user directory search at 100k users.
+
+Loads --users users with names drawn from common first and last names,
+then times `query_users` (always hitting the database) and `search_users`
+(through the prefix cache) for queries the new message picker sends as
+someone types, against the previous ILIKE '%q%' query run as a
+sequential scan (index scans disabled on its connection, as before the
+trigram indexes existed).
+
+Everything created is deleted afterwards.
+
+Run with: uv run python scripts/bench_user_search.py [--users 100000]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.db import Base, SessionLocal, engine, upgrade_schema
+from app.models.user import User
+from app.services.user_search import query_users, search_users, user_search_cache
+
+REPEATS = 50
+PAGE_SIZE = 20
+
+FIRST_NAMES = (
+    "james mary robert patricia john jennifer michael linda david elizabeth "
+    "william barbara richard susan joseph jessica thomas sarah charles karen "
+    "priya wei aisha mateo yuki olga kwame ingrid omar sofia"
+).split()
+LAST_NAMES = (
+    "smith johnson williams brown jones garcia miller davis rodriguez "
+    "martinez hernandez lopez gonzalez wilson anderson thomas taylor moore "
+    "jackson martin lee perez thompson white harris sanchez clark ramirez "
+    "nakamura okafor lindqvist petrov kowalski"
+).split()
+
+# As typed into the picker, one keystroke at a time
+QUERIES = ["m", "ma", "mar", "mart", "martinez", "nak", "okafor", "son", "zzz"]
+
+
+def create_fixture(users: int) -> str:
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        db.execute(
+            text(
+                "INSERT INTO users (id, email, display_name, role, department)"
+                " SELECT gen_random_uuid(),"
+                "  f || '.' || l || '.' || n || '@bench-' || :run || '.pulsync.io',"
+                "  initcap(f) || ' ' || initcap(l), 'engineering', 'Engineering'"
+                " FROM generate_series(1, :users) AS n,"
+                "  LATERAL (SELECT (CAST(:first AS text[]))"
+                "   [1 + (n * 7919) % :nf] AS f,"
+                "   (CAST(:last AS text[]))[1 + (n * 104729) % :nl] AS l) AS names"
+            ),
+            {
+                "run": run,
+                "users": users,
+                "first": FIRST_NAMES,
+                "last": LAST_NAMES,
+                "nf": len(FIRST_NAMES),
+                "nl": len(LAST_NAMES),
+            },
+        )
+        db.commit()
+    # As autovacuum would have: visibility map, hint bits and statistics
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE users"))
+    return run
+
+
+def median_ms(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def ilike_scan(conn, q: str):
+    return conn.execute(
+        text(
+            "SELECT id FROM users"
+            " WHERE display_name ILIKE :pattern OR email ILIKE :pattern"
+            " LIMIT :limit"
+        ),
+        {"pattern": f"%{q}%", "limit": PAGE_SIZE},
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+    print(f"Creating {args.users} users...")
+    run = create_fixture(args.users)
+    caller = uuid.uuid4()
+    try:
+        with SessionLocal() as db, engine.connect() as scan_conn:
+            scan_conn.execute(text("SET enable_bitmapscan = off"))
+            scan_conn.execute(text("SET enable_indexscan = off"))
+            print(
+                f"\n{'query':>10} {'indexed ms':>11} {'cached ms':>10}"
+                f" {'ILIKE ms':>9} {'results':>8}"
+            )
+            for q in QUERIES:
+                indexed = median_ms(lambda: query_users(db, q, PAGE_SIZE + 1))
+                user_search_cache.invalidate_all()
+                cached = median_ms(lambda: search_users(db, q, caller, PAGE_SIZE))
+                scan = median_ms(lambda: ilike_scan(scan_conn, q))
+                results = len(search_users(db, q, caller, PAGE_SIZE))
+                print(
+                    f"{q:>10} {indexed:>11.2f} {cached:>10.2f}"
+                    f" {scan:>9.2f} {results:>8}"
+                )
+            print(f"\ncache: {user_search_cache.get_metrics()}")
+    finally:
+        with SessionLocal() as db:
+            db.query(User).filter(User.email.like(f"%@bench-{run}.pulsync.io")).delete(
+                synchronize_session=False
+            )
+            db.commit()
+
+
+if __name__ == "__main__":
+    main()
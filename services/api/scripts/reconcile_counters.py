@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Repair drift in the denormalized counters.
+
+Recomputes like/comment/view counts (content_stats) and per-participant
+unread counts and last messages (conversation_participants) from the
+source tables, rewriting only the rows that differ, and keys two-person
+conversations created before dm_key existed. The API does none of this
+at startup; run it whenever drift is suspected, e.g. from cron.
+
+Like counts lag their like rows by up to one flush in every running API
+worker, so they are only recomputed with --likes, which must be run while
+the API is stopped: once after upgrading an existing database, and to
+repair deltas lost when a worker died.
+
+Run with: uv run python scripts/reconcile_counters.py [--likes]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import Base, engine, get_db, upgrade_schema
+from app.services.counters import reconcile_content_stats
+from app.services.inbox import backfill_dm_keys, reconcile_inbox_counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--likes",
+        action="store_true",
+        help="also recompute like counts (only with the API stopped)",
+    )
+    args = parser.parse_args()
+
+    # Create tables if they don't exist
+    Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+    db = next(get_db())
+    repaired = reconcile_content_stats(db, likes=args.likes)
+    db.commit()
+    print(f"Reconciled engagement counters for {repaired} content items")
+
+    repaired = reconcile_inbox_counters(db)
+    db.commit()
+    print(f"Reconciled unread counters for {repaired} conversation participants")
+
+    keyed = backfill_dm_keys(db)
+    db.commit()
+    db.close()
+    print(f"Backfilled direct conversation keys for {keyed} conversations")
+
+
+if __name__ == "__main__":
+    main()
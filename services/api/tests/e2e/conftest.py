@@ -2,11 +2,12 @@
 
 import os
 import uuid
-from collections.abc import Generator
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager, nullcontext
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.db import Base, get_db
@@ -15,6 +16,11 @@ from app.models.content import Content
 from app.models.tag import Tag
 from app.models.user import User
 from app.routers.auth import create_access_token
+from app.services.like_counts import like_counts
+from app.services.realtime import realtime_hub
+from app.services.trending import trending_engine
+from app.services.user_search import user_search_cache
+from app.services.view_ingest import view_ingest
 
 # Use PostgreSQL test database
 TEST_DATABASE_URL = os.getenv(
@@ -31,6 +37,31 @@ def generate_unique_id() -> str:
     return str(uuid.uuid4())[:8]
 
 
+class QueryCounter:
+    """Counts SQL statements sent to the test database."""
+
+    def __init__(self) -> None:
+        self.count = 0
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+    @contextmanager
+    def track(self) -> Iterator["QueryCounter"]:
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+@pytest.fixture(scope="function")
+def query_counter() -> QueryCounter:
+    """Count queries issued while inside `query_counter.track()`."""
+    return QueryCounter()
+
+
 @pytest.fixture(scope="function")
 def db() -> Generator[Session, None, None]:
     """Create a database session for testing."""
@@ -56,9 +87,37 @@ def api_client(db: Session) -> Generator[TestClient, None, None]:
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    # Write view events inline through the test session
+    ingest_config = (
+        view_ingest.batch_size,
+        view_ingest.flush_interval_seconds,
+        view_ingest.session_scope,
+    )
+    view_ingest.batch_size = 1
+    view_ingest.flush_interval_seconds = None
+    view_ingest.session_scope = lambda: nullcontext(db)
+    # Write like counters inline as well
+    likes_config = (like_counts.flush_interval_seconds, like_counts.session_scope)
+    like_counts.flush_interval_seconds = None
+    like_counts.session_scope = lambda: nullcontext(db)
+    # Deliver realtime events in-process instead of through NOTIFY
+    realtime_channel = realtime_hub.channel
+    realtime_hub.channel = None
+    # Users created by earlier tests were rolled back
+    user_search_cache.invalidate_all()
+    # Rebuild trending on startup before the test runs, not alongside it
+    trending_engine.background_rebuild = False
     with TestClient(app) as client:
         yield client
+    trending_engine.background_rebuild = True
     app.dependency_overrides.clear()
+    (
+        view_ingest.batch_size,
+        view_ingest.flush_interval_seconds,
+        view_ingest.session_scope,
+    ) = ingest_config
+    like_counts.flush_interval_seconds, like_counts.session_scope = likes_config
+    realtime_hub.channel = realtime_channel
 
 
 @pytest.fixture(scope="function")
@@ -103,6 +162,21 @@ def auth_headers(auth_token: str) -> dict:
     return {"Authorization": f"Bearer {auth_token}"}
 
 
+@pytest.fixture(scope="function")
+def comms_headers(db: Session) -> dict:
+    """Auth headers for a comms team user (admin endpoints)."""
+    user = User(
+        email=f"comms-{generate_unique_id()}@pulsync.io",
+        display_name="Comms User",
+        role="comms",
+        department="Communications",
+        is_comms_team=True,
+    )
+    db.add(user)
+    db.flush()
+    return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
 @pytest.fixture(scope="function")
 def authenticated_client(
     api_client: TestClient, auth_headers: dict
@@ -0,0 +1,210 @@
+"""E2E tests for loading comment threads."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.comment import Comment
+from app.models.content import Content
+from app.models.user import User
+
+from .conftest import QueryCounter
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def add_comment(
+    db: Session,
+    content: Content,
+    author: User,
+    body: str,
+    minute: int,
+    parent: Comment | None = None,
+) -> Comment:
+    comment = Comment(
+        content_id=content.id,
+        author_id=author.id,
+        parent_id=parent.id if parent else None,
+        body=body,
+        created_at=BASE_TIME + timedelta(minutes=minute),
+    )
+    db.add(comment)
+    db.flush()
+    return comment
+
+
+@pytest.fixture
+def thread(db: Session, test_content: Content, test_user: User) -> dict:
+    """
+    Two top-level comments; the older one has a four-level reply chain.
+
+        a (0)                b (10)
+        ├── a1 (1)
+        │   └── a1x (3)
+        │       └── a1xy (4)
+        └── a2 (2)
+    """
+    a = add_comment(db, test_content, test_user, "a", 0)
+    b = add_comment(db, test_content, test_user, "b", 10)
+    a1 = add_comment(db, test_content, test_user, "a1", 1, parent=a)
+    a2 = add_comment(db, test_content, test_user, "a2", 2, parent=a)
+    a1x = add_comment(db, test_content, test_user, "a1x", 3, parent=a1)
+    a1xy = add_comment(db, test_content, test_user, "a1xy", 4, parent=a1x)
+    return {c.body: c for c in (a, b, a1, a2, a1x, a1xy)}
+
+
+def bodies(nodes: list[dict]) -> list:
+    return [[n["body"], bodies(n["replies"])] for n in nodes]
+
+
+class TestCommentTree:
+    """The tree endpoint returns a nested thread in one statement."""
+
+    def test_full_tree(
+        self,
+        api_client: TestClient,
+        test_content: Content,
+        thread: dict,
+        query_counter: QueryCounter,
+    ):
+        with query_counter.track():
+            response = api_client.get(
+                f"/content/{test_content.id}/comments/tree?max_depth=10"
+            )
+        assert response.status_code == 200
+        # Content check plus the recursive CTE
+        assert query_counter.count == 2
+
+        tree = response.json()
+        assert bodies(tree) == [
+            ["b", []],
+            ["a", [["a1", [["a1x", [["a1xy", []]]]]], ["a2", []]]],
+        ]
+        assert tree[1]["reply_count"] == 2
+
+    def test_depth_limit_keeps_reply_counts(
+        self, api_client: TestClient, test_content: Content, thread: dict
+    ):
+        response = api_client.get(
+            f"/content/{test_content.id}/comments/tree?max_depth=2"
+        )
+        a = response.json()[1]
+        assert bodies([a]) == [["a", [["a1", []], ["a2", []]]]]
+        # a1 has a reply that was cut by the depth limit
+        assert a["replies"][0]["reply_count"] == 1
+
+    def test_size_limit_is_breadth_first(
+        self, api_client: TestClient, test_content: Content, thread: dict
+    ):
+        response = api_client.get(
+            f"/content/{test_content.id}/comments/tree?limit=1&max_comments=2"
+        )
+        assert bodies(response.json()) == [["b", []]]
+
+        response = api_client.get(
+            f"/content/{test_content.id}/comments/tree?max_comments=4&max_depth=10"
+        )
+        assert bodies(response.json()) == [
+            ["b", []],
+            ["a", [["a1", []], ["a2", []]]],
+        ]
+
+    def test_comments_disabled(
+        self, db: Session, api_client: TestClient, test_content: Content
+    ):
+        test_content.comments_enabled = False
+        db.flush()
+        response = api_client.get(f"/content/{test_content.id}/comments/tree")
+        assert response.status_code == 403
+
+
+class TestReplyCounts:
+    """Paged comment listings count replies in one grouped query."""
+
+    def test_listings_cost_constant_queries(
+        self,
+        db: Session,
+        api_client: TestClient,
+        test_content: Content,
+        test_user: User,
+        thread: dict,
+        query_counter: QueryCounter,
+    ):
+        with query_counter.track():
+            response = api_client.get(f"/content/{test_content.id}/comments")
+        few = query_counter.count
+        assert {c["body"]: c["reply_count"] for c in response.json()} == {
+            "a": 2,
+            "b": 0,
+        }
+
+        for minute in range(20, 30):
+            add_comment(db, test_content, test_user, f"extra {minute}", minute)
+        with query_counter.track():
+            response = api_client.get(f"/content/{test_content.id}/comments")
+        assert len(response.json()) == 12
+        assert query_counter.count == few
+
+        a = thread["a"]
+        response = api_client.get(f"/content/{test_content.id}/comments/{a.id}/replies")
+        assert [(c["body"], c["reply_count"]) for c in response.json()] == [
+            ("a1", 1),
+            ("a2", 0),
+        ]
+
+
+def page_through(client: TestClient, path: str, limit: int) -> list[str]:
+    seen: list[str] = []
+    cursor = None
+    while True:
+        url = f"{path}?limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(c["body"] for c in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+class TestCommentPagination:
+    """Comments and replies page by (created_at, id) keyset cursors."""
+
+    def test_top_level_pages_through_timestamp_ties(
+        self,
+        db: Session,
+        api_client: TestClient,
+        test_content: Content,
+        test_user: User,
+    ):
+        for i in range(7):
+            add_comment(db, test_content, test_user, f"tie {i}", 5)
+        add_comment(db, test_content, test_user, "newest", 9)
+        add_comment(db, test_content, test_user, "oldest", 1)
+
+        seen = page_through(api_client, f"/content/{test_content.id}/comments", 3)
+        assert seen[0] == "newest" and seen[-1] == "oldest"
+        assert sorted(seen[1:-1]) == [f"tie {i}" for i in range(7)]
+
+    def test_replies_page_oldest_first(
+        self,
+        db: Session,
+        api_client: TestClient,
+        test_content: Content,
+        test_user: User,
+    ):
+        parent = add_comment(db, test_content, test_user, "parent", 0)
+        for minute in range(1, 6):
+            add_comment(db, test_content, test_user, f"r{minute}", minute, parent)
+        add_comment(db, test_content, test_user, "r3 tie", 3, parent)
+
+        seen = page_through(
+            api_client, f"/content/{test_content.id}/comments/{parent.id}/replies", 2
+        )
+        assert seen[:2] == ["r1", "r2"] and seen[-2:] == ["r4", "r5"]
+        assert sorted(seen[2:4]) == ["r3", "r3 tie"]
+
+    def test_invalid_cursor(self, api_client: TestClient, test_content: Content):
+        response = api_client.get(f"/content/{test_content.id}/comments?cursor=nope")
+        assert response.status_code == 400
@@ -0,0 +1,160 @@
+"""E2E tests for the For You candidate generation and ranking pipeline."""
+
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.content import Content
+from app.models.user import User
+from app.services.candidates import (
+    CandidateContext,
+    CandidateGenerator,
+    CompanyImportantGenerator,
+    FreshGenerator,
+)
+from app.services.feed_pipeline import rank_for_you
+
+
+class FixedGenerator(CandidateGenerator):
+    """Returns a fixed candidate list (for plugging into the pipeline)."""
+
+    name = "fixed"
+
+    def __init__(self, ids: list[UUID]) -> None:
+        super().__init__(limit=len(ids))
+        self.ids = ids
+
+    def generate(self, ctx: CandidateContext) -> list[UUID]:
+        return self.ids
+
+
+class TestFeedPipeline:
+    """Test candidate generators and top-K ranking."""
+
+    def test_only_candidates_are_ranked(
+        self, db: Session, test_user: User, multiple_content: list[Content]
+    ):
+        """Ranking is limited to the merged, deduplicated candidate set."""
+        picked = [c.id for c in multiple_content[:4]]
+        generators = [FixedGenerator(picked[:3]), FixedGenerator(picked[1:])]
+
+        ranked = rank_for_you(db, test_user, top_k=10, generators=generators)
+
+        assert sorted(ranked) == sorted(picked)
+
+    def test_top_k_keeps_best_scores(
+        self, db: Session, test_user: User, multiple_content: list[Content]
+    ):
+        """The heap keeps the K highest-scoring candidates."""
+        important = multiple_content[7]
+        important.is_company_important = True
+        db.flush()
+
+        ranked = rank_for_you(
+            db,
+            test_user,
+            top_k=1,
+            generators=[FixedGenerator([c.id for c in multiple_content])],
+        )
+
+        assert ranked == [important.id]
+
+    def test_role_targeting_applies_to_candidates(
+        self, db: Session, test_user: User, test_content: Content
+    ):
+        """Candidates targeted at other roles are dropped before ranking."""
+        test_content.target_roles = ["hr"]
+        db.flush()
+
+        ranked = rank_for_you(
+            db, test_user, top_k=10, generators=[FixedGenerator([test_content.id])]
+        )
+
+        assert ranked == []
+
+    def test_windowed_generators(
+        self, db: Session, test_user: User, multiple_content: list[Content]
+    ):
+        """Important and fresh generators respect their time windows."""
+        old, recent = multiple_content[0], multiple_content[1]
+        old.is_company_important = True
+        old.created_at = datetime.now(timezone.utc) - timedelta(days=60)
+        recent.is_company_important = True
+        db.flush()
+
+        ctx = CandidateContext(
+            db=db, user=test_user, interests=[], now=datetime.now(timezone.utc)
+        )
+        important = CompanyImportantGenerator(limit=500, window_days=14).generate(ctx)
+        fresh = FreshGenerator(limit=500, window_days=7).generate(ctx)
+
+        assert recent.id in important
+        assert old.id not in important
+        assert old.id not in fresh
+
+    def test_stage_timings_in_metrics(
+        self, api_client: TestClient, auth_headers: dict, test_content: Content
+    ):
+        """Per-stage timings show up in /qa/metrics."""
+        api_client.get("/feed", headers=auth_headers)
+
+        metrics = api_client.get("/qa/metrics").json()["feed_pipeline"]
+        assert metrics["runs"] >= 1
+        for stage in ("generate.company_important", "generate.fresh", "score"):
+            assert stage in metrics["last_stage_ms"]
+
+
+class TestFeedCache:
+    """Test that For You rankings are cached until something relevant changes."""
+
+    def test_refresh_hits_cache(
+        self, api_client: TestClient, auth_headers: dict, test_content: Content
+    ):
+        """A pull-to-refresh reuses the cached ranking instead of re-ranking."""
+        api_client.post("/qa/reset-metrics")
+        api_client.get("/feed", headers=auth_headers)
+        api_client.get("/feed", headers=auth_headers)
+
+        metrics = api_client.get("/qa/metrics").json()
+        assert metrics["feed_cache"]["hits"] >= 1
+        assert metrics["feed_pipeline"]["runs"] == 1
+
+    def test_view_invalidates_cache(
+        self, api_client: TestClient, auth_headers: dict, test_content: Content
+    ):
+        """Recording a view changes interests, so the next refresh re-ranks."""
+        api_client.get("/feed", headers=auth_headers)
+        api_client.post("/qa/reset-metrics")
+
+        api_client.post(
+            "/feed/view",
+            headers=auth_headers,
+            json={"content_id": str(test_content.id), "view_duration_seconds": 5},
+        )
+        api_client.get("/feed", headers=auth_headers)
+
+        metrics = api_client.get("/qa/metrics").json()
+        assert metrics["feed_cache"]["invalidations"] >= 1
+        assert metrics["feed_pipeline"]["runs"] == 1
+
+    def test_new_content_appears_after_refresh(
+        self, api_client: TestClient, auth_headers: dict
+    ):
+        """Publishing content invalidates every cached ranking."""
+        api_client.get("/feed", headers=auth_headers)
+        response = api_client.post(
+            "/content",
+            headers=auth_headers,
+            json={
+                "content_type": "text",
+                "title": "Fresh off the press",
+                "body": "Cache should not hide this",
+                "is_company_important": True,
+            },
+        )
+        assert response.status_code == 201
+
+        items = api_client.get("/feed", headers=auth_headers).json()["items"]
+        assert response.json()["id"] in [item["id"] for item in items]
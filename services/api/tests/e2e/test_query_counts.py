@@ -0,0 +1,201 @@
+"""E2E tests asserting content listings cost a fixed number of queries."""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.content import Content
+from app.models.tag import Tag
+from app.services.counter_cache import counter_cache
+from app.services.feed_cache import feed_cache
+
+from .conftest import QueryCounter
+
+# Upper bound on statements per listing request, independent of page size
+MAX_QUERIES = 12
+
+
+def count_queries(
+    client: TestClient, counter: QueryCounter, path: str, headers: dict
+) -> tuple[int, int]:
+    """Return (query count, item count) for one uncached GET request."""
+    feed_cache.invalidate_all()
+    counter_cache.clear()
+    with counter.track():
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    items = data["items"] if isinstance(data, dict) else data
+    return counter.count, len(items)
+
+
+class TestListingQueryCounts:
+    """Every listing hydrates its page in a constant number of queries."""
+
+    @pytest.mark.parametrize(
+        "path",
+        ["/feed", "/feed/for-you", "/feed/discover", "/content", "/admin/content"],
+    )
+    def test_paged_listings(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        comms_headers: dict,
+        query_counter: QueryCounter,
+        multiple_content: list[Content],
+        path: str,
+    ):
+        headers = comms_headers if path.startswith("/admin") else auth_headers
+        small, small_items = count_queries(
+            api_client, query_counter, f"{path}?limit=2", headers
+        )
+        large, large_items = count_queries(
+            api_client, query_counter, f"{path}?limit=12", headers
+        )
+
+        assert small_items < large_items
+        assert small == large
+        assert large <= MAX_QUERIES
+
+    def test_following_feed(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        query_counter: QueryCounter,
+        test_tag: Tag,
+        multiple_content: list[Content],
+    ):
+        api_client.post(
+            f"/feed/interests/{test_tag.id}/follow",
+            headers=auth_headers,
+            json={"follow": True},
+        )
+        small, small_items = count_queries(
+            api_client, query_counter, "/feed/following?limit=2", auth_headers
+        )
+        large, large_items = count_queries(
+            api_client, query_counter, "/feed/following?limit=12", auth_headers
+        )
+
+        assert small_items < large_items
+        assert small == large
+        assert large <= MAX_QUERIES
+
+    @pytest.mark.parametrize("kind", ["bookmark", "like"])
+    def test_saved_listings(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        query_counter: QueryCounter,
+        multiple_content: list[Content],
+        kind: str,
+    ):
+        path = "/bookmarks" if kind == "bookmark" else "/likes"
+        for content in multiple_content[:2]:
+            api_client.post(f"/content/{content.id}/{kind}", headers=auth_headers)
+        small, small_items = count_queries(
+            api_client, query_counter, path, auth_headers
+        )
+
+        for content in multiple_content[2:10]:
+            api_client.post(f"/content/{content.id}/{kind}", headers=auth_headers)
+        large, large_items = count_queries(
+            api_client, query_counter, path, auth_headers
+        )
+
+        assert (small_items, large_items) == (2, 10)
+        assert small == large
+        assert large <= MAX_QUERIES
+
+    def test_single_content(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        query_counter: QueryCounter,
+        test_content: Content,
+    ):
+        with query_counter.track():
+            response = api_client.get(
+                f"/content/{test_content.id}", headers=auth_headers
+            )
+        assert response.status_code == 200
+        assert query_counter.count <= MAX_QUERIES
+
+
+class TestContentState:
+    """POST /content/state refreshes card overlays in constant queries."""
+
+    def post_state(
+        self,
+        client: TestClient,
+        counter: QueryCounter,
+        headers: dict,
+        contents: list[Content],
+    ) -> tuple[int, dict]:
+        content_ids = [str(c.id) for c in contents]
+        with counter.track():
+            response = client.post(
+                "/content/state", headers=headers, json={"content_ids": content_ids}
+            )
+        assert response.status_code == 200
+        return counter.count, {item["content_id"]: item for item in response.json()}
+
+    def test_state_is_constant_and_cached(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        query_counter: QueryCounter,
+        multiple_content: list[Content],
+    ):
+        liked, bookmarked = multiple_content[0], multiple_content[1]
+        api_client.put(f"/content/{liked.id}/like", headers=auth_headers)
+        api_client.put(f"/content/{bookmarked.id}/bookmark", headers=auth_headers)
+
+        counter_cache.clear()
+        small, _ = self.post_state(
+            api_client, query_counter, auth_headers, multiple_content[:2]
+        )
+        counter_cache.clear()
+        large, states = self.post_state(
+            api_client, query_counter, auth_headers, multiple_content
+        )
+        assert small == large
+        assert len(states) == len(multiple_content)
+        assert states[str(liked.id)]["like_count"] == 1
+        assert states[str(liked.id)]["is_liked"] is True
+        assert states[str(bookmarked.id)]["is_bookmarked"] is True
+
+        # Warm cache: counters are not re-read
+        warm, _ = self.post_state(
+            api_client, query_counter, auth_headers, multiple_content
+        )
+        assert warm == large - 1
+
+    def test_writes_invalidate_cached_counts(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        query_counter: QueryCounter,
+        test_content: Content,
+    ):
+        self.post_state(api_client, query_counter, auth_headers, [test_content])
+        api_client.put(f"/content/{test_content.id}/like", headers=auth_headers)
+        api_client.post(
+            f"/content/{test_content.id}/comments",
+            headers=auth_headers,
+            json={"body": "Counted"},
+        )
+
+        _, states = self.post_state(
+            api_client, query_counter, auth_headers, [test_content]
+        )
+        assert states[str(test_content.id)]["like_count"] == 1
+        assert states[str(test_content.id)]["comment_count"] == 1
+
+    def test_state_request_is_capped(self, api_client: TestClient, auth_headers: dict):
+        ids = [str(uuid.uuid4()) for _ in range(501)]
+        response = api_client.post(
+            "/content/state", headers=auth_headers, json={"content_ids": ids}
+        )
+        assert response.status_code == 422
@@ -0,0 +1,92 @@
+"""E2E tests for realtime messaging events."""
+
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.models.user import User
+from app.services.realtime import RealtimeHub, realtime_hub
+
+
+async def next_event(queue: asyncio.Queue) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout=5)
+
+
+class TestRealtimeEvents:
+    """Committed messaging changes are pushed to participants' connections."""
+
+    async def test_send_and_read_push_to_participants(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        second_user: User,
+    ):
+        response = api_client.post(
+            "/messages/conversations",
+            headers=auth_headers,
+            json={"participant_ids": [str(second_user.id)]},
+        )
+        conversation_id = response.json()["id"]
+
+        peer = realtime_hub.subscribe(second_user.id)
+        try:
+            api_client.post(
+                f"/messages/conversations/{conversation_id}/messages",
+                headers=auth_headers,
+                json={"body": "Are you there?"},
+            )
+            event = await next_event(peer.queue)
+            assert event["type"] == "message.created"
+            assert event["data"]["conversation_id"] == conversation_id
+            assert event["data"]["message"]["body"] == "Are you there?"
+            assert event["data"]["message"]["sender"]["id"] == str(test_user.id)
+
+            api_client.post(
+                f"/messages/conversations/{conversation_id}/read",
+                headers=auth_headers,
+            )
+            event = await next_event(peer.queue)
+            assert event["type"] == "conversation.read"
+            assert event["data"]["user_id"] == str(test_user.id)
+        finally:
+            realtime_hub.unsubscribe(peer)
+
+        metrics = api_client.get("/qa/metrics").json()["realtime"]
+        assert metrics["connections"] == 0
+        assert metrics["delivered"] >= 2
+
+    async def test_events_reach_other_workers_through_notify(self):
+        hub = RealtimeHub(channel=f"test_{uuid.uuid4().hex}", queue_size=10)
+        hub.start()
+        try:
+            user_id, other_id = uuid.uuid4(), uuid.uuid4()
+            subscription = hub.subscribe(user_id)
+            # Wait for the listener thread to connect
+            for _ in range(50):
+                if hub.get_metrics()["listening"]:
+                    break
+                await asyncio.sleep(0.1)
+
+            hub.publish("ping", [user_id], {"n": 1})
+            event = await next_event(subscription.queue)
+            assert event == {"type": "ping", "data": {"n": 1}}
+
+            hub.publish("ping", [other_id], {"n": 2})
+            hub.publish("big", [user_id], {"body": "x" * 10_000}, {"id": 1})
+            event = await next_event(subscription.queue)
+            assert event == {"type": "big", "data": {"id": 1}, "truncated": True}
+
+            # Too many recipients for one NOTIFY: split, data kept whole
+            crowd = [uuid.uuid4() for _ in range(300)]
+            hub.publish("group", [*crowd, user_id], {"n": 3})
+            event = await next_event(subscription.queue)
+            assert event == {"type": "group", "data": {"n": 3}}
+
+            metrics = hub.get_metrics()
+            assert metrics["connections"] == 1
+            assert metrics["listening"] is True
+            assert metrics["max_delivery_lag_ms"] > 0
+        finally:
+            hub.stop()
@@ -1,10 +1,26 @@
 """E2E tests for feed browsing user journey."""
 
+import uuid
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from app.config import settings
+from app.models.bookmark import Bookmark
 from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.models.like import Like
+from app.models.tag import Tag
 from app.models.user import User
+from app.models.user_interest import UserInterest
+from app.services.counters import reconcile_content_stats
+from app.services.interests import add_interest_scores, prune_interests
+from app.services.like_counts import like_counts
+from app.services.trending import trending_engine
+
+from .conftest import QueryCounter
 
 
 class TestFeedBrowsing:
@@ -66,6 +82,38 @@ class TestFeedBrowsing:
         second_ids = {item["id"] for item in data2["items"]}
         assert first_ids.isdisjoint(second_ids)
 
+    def test_feed_pages_come_from_one_snapshot(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        multiple_content: list[Content],
+    ):
+        """Later pages walk the ranking frozen on page 1 without repeats."""
+        first = api_client.get("/feed?limit=5", headers=auth_headers).json()
+        seen = [item["id"] for item in first["items"]]
+
+        # Content published after page 1 must not shift later pages
+        late = api_client.post(
+            "/content", headers=auth_headers, json={"title": "Late arrival"}
+        ).json()
+
+        cursor = first["next_cursor"]
+        for _ in range(2):
+            page = api_client.get(
+                f"/feed?limit=5&cursor={cursor}", headers=auth_headers
+            ).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+
+        assert len(seen) == 15
+        assert len(set(seen)) == 15
+        assert late["id"] not in seen
+
+    def test_feed_invalid_cursor(self, api_client: TestClient, auth_headers: dict):
+        """A malformed cursor is rejected."""
+        response = api_client.get("/feed?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
+
     def test_feed_requires_auth(self, api_client: TestClient):
         """Test that feed requires authentication."""
         response = api_client.get("/feed")
@@ -90,6 +138,53 @@ class TestFeedBrowsing:
         data = response.json()
         assert data["items"] == []
 
+    def test_following_feed_pages_through_timestamp_ties(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_tag: Tag,
+        multiple_content: list[Content],
+    ):
+        """Keyset cursors neither skip nor repeat posts sharing a created_at."""
+        shared = datetime.now(timezone.utc)
+        for content in multiple_content:
+            content.created_at = shared
+        db.flush()
+        api_client.post(
+            f"/feed/interests/{test_tag.id}/follow",
+            headers=auth_headers,
+            json={"follow": True},
+        )
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            path = "/feed/following?limit=4"
+            if cursor:
+                path += f"&cursor={cursor}"
+            page = api_client.get(path, headers=auth_headers).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(str(c.id) for c in multiple_content)
+
+    def test_following_feed_invalid_cursor(
+        self, api_client: TestClient, auth_headers: dict, test_tag: Tag
+    ):
+        """Legacy content-ID cursors are rejected."""
+        api_client.post(
+            f"/feed/interests/{test_tag.id}/follow",
+            headers=auth_headers,
+            json={"follow": True},
+        )
+        response = api_client.get(
+            f"/feed/following?cursor={uuid.uuid4()}", headers=auth_headers
+        )
+        assert response.status_code == 400
+
     def test_discover_feed(
         self, api_client: TestClient, auth_headers: dict, test_content: Content
     ):
@@ -196,6 +291,47 @@ class TestContentInteractions:
         assert len(data) == 1
         assert data[0]["id"] == str(test_content.id)
 
+    @pytest.mark.parametrize("kind", ["bookmark", "like"])
+    def test_saved_listings_page_through_timestamp_ties(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        multiple_content: list[Content],
+        kind: str,
+    ):
+        """Keyset cursors in X-Next-Cursor neither skip nor repeat saved items."""
+        model = Bookmark if kind == "bookmark" else Like
+        for content in multiple_content:
+            api_client.put(f"/content/{content.id}/{kind}", headers=auth_headers)
+        db.query(model).filter(model.user_id == test_user.id).update(
+            {model.created_at: datetime.now(timezone.utc)}
+        )
+        db.flush()
+
+        path = "/bookmarks" if kind == "bookmark" else "/likes"
+        seen: list[str] = []
+        cursor = None
+        while True:
+            url = f"{path}?limit=4" + (f"&cursor={cursor}" if cursor else "")
+            response = api_client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            assert len(response.json()) <= 4
+            seen.extend(item["id"] for item in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(str(c.id) for c in multiple_content)
+        assert len(seen) == len(set(seen))
+
+    def test_saved_listings_invalid_cursor(
+        self, api_client: TestClient, auth_headers: dict
+    ):
+        response = api_client.get("/likes?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
+
     def test_like_nonexistent_content(self, api_client: TestClient, auth_headers: dict):
         """Test liking nonexistent content returns 404."""
         import uuid
@@ -208,6 +344,355 @@ class TestContentInteractions:
 
         assert response.status_code == 404
 
+    def test_put_and_delete_like_are_idempotent(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+        query_counter: QueryCounter,
+    ):
+        """Repeated PUT/DELETE settle on the same state and report the count."""
+        url = f"/content/{test_content.id}/like"
+        for attempt in range(2):
+            with query_counter.track():
+                response = api_client.put(url, headers=auth_headers)
+            assert response.status_code == 200
+            assert response.json()["is_liked"] is True
+            assert response.json()["like_count"] == 1
+            # Auth lookup and one statement for the like row. The counter is
+            # flushed inline in tests (two more statements) only on a change.
+            assert query_counter.count == (4 if attempt == 0 else 2)
+
+        for _ in range(2):
+            response = api_client.delete(url, headers=auth_headers)
+            assert response.status_code == 200
+            assert response.json()["is_liked"] is False
+            assert response.json()["like_count"] == 0
+
+    def test_put_and_delete_bookmark_are_idempotent(
+        self, api_client: TestClient, auth_headers: dict, test_content: Content
+    ):
+        url = f"/content/{test_content.id}/bookmark"
+        for _ in range(2):
+            assert api_client.put(url, headers=auth_headers).json()["is_bookmarked"]
+        assert len(api_client.get("/bookmarks", headers=auth_headers).json()) == 1
+
+        for _ in range(2):
+            response = api_client.delete(url, headers=auth_headers)
+            assert response.json()["is_bookmarked"] is False
+        assert api_client.get("/bookmarks", headers=auth_headers).json() == []
+
+    def test_put_like_nonexistent_content(
+        self, api_client: TestClient, auth_headers: dict
+    ):
+        """The foreign key, not a pre-check, turns unknown content into a 404."""
+        response = api_client.put(f"/content/{uuid.uuid4()}/like", headers=auth_headers)
+        assert response.status_code == 404
+
+
+class TestEngagementCounters:
+    """Test the denormalized like/comment/view counters."""
+
+    def test_counters_follow_interactions(
+        self, api_client: TestClient, auth_headers: dict, test_content: Content
+    ):
+        """Likes, comments and views update the counters shown on cards."""
+        api_client.post(f"/content/{test_content.id}/like", headers=auth_headers)
+        comment = api_client.post(
+            f"/content/{test_content.id}/comments",
+            headers=auth_headers,
+            json={"body": "Nice one"},
+        ).json()
+        api_client.post(
+            "/feed/view",
+            headers=auth_headers,
+            json={"content_id": str(test_content.id), "completion_percent": 50},
+        )
+
+        data = api_client.get(f"/content/{test_content.id}", headers=auth_headers)
+        assert data.json()["like_count"] == 1
+        assert data.json()["comment_count"] == 1
+
+        # Unlike and delete the comment
+        api_client.post(f"/content/{test_content.id}/like", headers=auth_headers)
+        api_client.delete(f"/comments/{comment['id']}", headers=auth_headers)
+
+        data = api_client.get(f"/content/{test_content.id}", headers=auth_headers)
+        assert data.json()["like_count"] == 0
+        assert data.json()["comment_count"] == 0
+
+    def test_hot_likes_coalesce_into_one_counter_write(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+    ):
+        """Likes on one post accumulate in memory and flush as one row update."""
+        like_counts.flush_interval_seconds = 3600
+        like_counts.start()
+        try:
+            response = api_client.put(
+                f"/content/{test_content.id}/like", headers=auth_headers
+            )
+            assert response.json()["like_count"] == 1
+            # Other users' likes landing in the same flush window
+            for _ in range(99):
+                like_counts.add(test_content.id, 1)
+            like_counts.add(test_content.id, -1)
+
+            assert like_counts.pending([test_content.id]) == {test_content.id: 99}
+            assert db.get(ContentStats, test_content.id) is None
+            data = api_client.get(f"/content/{test_content.id}", headers=auth_headers)
+            assert data.json()["like_count"] == 99
+
+            assert like_counts.flush() == 1
+            assert like_counts.pending([test_content.id]) == {}
+            assert db.get(ContentStats, test_content.id).like_count == 99
+        finally:
+            like_counts.stop()
+            like_counts.flush_interval_seconds = None
+
+    def test_reconcile_repairs_drift(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+    ):
+        """The reconciliation job rewrites counters that drifted."""
+        api_client.post(f"/content/{test_content.id}/like", headers=auth_headers)
+
+        db.query(ContentStats).filter(
+            ContentStats.content_id == test_content.id
+        ).update({"like_count": 42, "view_count": 7})
+
+        assert reconcile_content_stats(db, likes=True) >= 1
+        stats = db.get(ContentStats, test_content.id)
+        db.refresh(stats)
+        assert stats.like_count == 1
+        assert stats.view_count == 0
+        assert reconcile_content_stats(db, likes=True) == 0
+
+    def test_reconcile_leaves_like_counts_to_flushes(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+    ):
+        """Without likes=True a pending like delta is not counted twice."""
+        api_client.post(f"/content/{test_content.id}/like", headers=auth_headers)
+
+        db.query(ContentStats).filter(
+            ContentStats.content_id == test_content.id
+        ).update({"like_count": 0, "view_count": 7})
+
+        assert reconcile_content_stats(db) >= 1
+        stats = db.get(ContentStats, test_content.id)
+        db.refresh(stats)
+        assert stats.like_count == 0
+        assert stats.view_count == 0
+
+
+class TestInterests:
+    """Test interest updates from follows and views."""
+
+    def test_follow_and_views_upsert_one_row(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_user: User,
+        test_tag: Tag,
+        test_content: Content,
+    ):
+        """Follows and views update the same row; scores cap at 1.0."""
+        test_content.tags = [test_tag]
+        db.flush()
+
+        api_client.post(
+            f"/feed/interests/{test_tag.id}/follow",
+            headers=auth_headers,
+            json={"follow": True},
+        )
+        api_client.post(
+            "/feed/views",
+            headers=auth_headers,
+            json=[{"content_id": str(test_content.id), "completion_percent": 100}] * 3,
+        )
+        api_client.post(
+            f"/feed/interests/{test_tag.id}/follow",
+            headers=auth_headers,
+            json={"follow": False},
+        )
+
+        interests = api_client.get("/feed/interests", headers=auth_headers).json()
+        assert len(interests) == 1
+        assert interests[0]["score"] == pytest.approx(0.8)
+        assert interests[0]["is_auto_subscribed"] is True
+        assert interests[0]["is_manually_followed"] is False
+
+        add_interest_scores(db, {(test_user.id, test_tag.id): 0.5})
+        interest = db.get(UserInterest, (test_user.id, test_tag.id))
+        db.refresh(interest)
+        assert interest.score == 1.0
+
+    def test_scores_decay_and_prune(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_user: User,
+        test_content: Content,
+    ):
+        """Stale interests fade on read/write and near-zero ones are pruned."""
+        four_weeks_ago = datetime.now(timezone.utc) - timedelta(days=28)
+        tags = [
+            Tag(name=f"Decay {i} {uuid.uuid4().hex[:6]}", slug=uuid.uuid4().hex)
+            for i in range(3)
+        ]
+        db.add_all(tags)
+        db.flush()
+        stale, faded, followed = tags
+        db.add_all(
+            [
+                UserInterest(
+                    user_id=test_user.id,
+                    tag_id=stale.id,
+                    score=0.8,
+                    updated_at=four_weeks_ago,
+                ),
+                UserInterest(
+                    user_id=test_user.id,
+                    tag_id=faded.id,
+                    score=0.02,
+                    updated_at=four_weeks_ago,
+                ),
+                UserInterest(
+                    user_id=test_user.id,
+                    tag_id=followed.id,
+                    score=0.02,
+                    is_manually_followed=True,
+                    updated_at=four_weeks_ago,
+                ),
+            ]
+        )
+        test_content.tags = [stale]
+        db.flush()
+
+        scores = {
+            i["tag_id"]: i["score"]
+            for i in api_client.get("/feed/interests", headers=auth_headers).json()
+        }
+        assert scores[str(stale.id)] == pytest.approx(0.2, rel=0.01)
+
+        # A full view adds to the decayed score, not the stored one
+        api_client.post(
+            "/feed/view",
+            headers=auth_headers,
+            json={"content_id": str(test_content.id), "completion_percent": 100},
+        )
+        interest = db.get(UserInterest, (test_user.id, stale.id))
+        db.refresh(interest)
+        assert interest.score == pytest.approx(0.3, rel=0.01)
+
+        assert prune_interests(db) >= 1
+        remaining = {
+            i.tag_id
+            for i in db.query(UserInterest).filter(UserInterest.user_id == test_user.id)
+        }
+        assert remaining == {stale.id, followed.id}
+
+
+class TestTrending:
+    """Test the trending feed."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_engine(self, api_client: TestClient):
+        # Start from an empty engine (client startup replays recent events)
+        trending_engine.clear()
+
+    def test_trending_ranks_by_recent_engagement(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        multiple_content: list[Content],
+    ):
+        """Liked and viewed content trends; untouched content does not."""
+        viewed, liked = multiple_content[0], multiple_content[1]
+        api_client.post(f"/content/{liked.id}/like", headers=auth_headers)
+        api_client.post(
+            "/feed/view",
+            headers=auth_headers,
+            json={"content_id": str(viewed.id), "completion_percent": 80},
+        )
+
+        response = api_client.get("/feed/trending", headers=auth_headers)
+        assert response.status_code == 200
+        ids = [item["id"] for item in response.json()["items"]]
+        assert ids == [str(liked.id), str(viewed.id)]
+
+    def test_rebuild_replays_recent_events(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+    ):
+        """Startup rebuild restores scores from stored events."""
+        api_client.post(
+            "/feed/views",
+            headers=auth_headers,
+            json=[{"content_id": str(test_content.id)}] * 5,
+        )
+        trending_engine.clear()
+
+        assert trending_engine.rebuild(db, hours=1) >= 5
+        top = dict(trending_engine.top("view", settings.trending_capacity))
+        assert top[test_content.id] == pytest.approx(5, rel=0.01)
+
+
+
+class TestAdminAnalytics:
+    """Test the comms team analytics top lists."""
+
+    def test_top_liked_counts_only_the_window(
+        self,
+        db: Session,
+        api_client: TestClient,
+        comms_headers: dict,
+        test_content: Content,
+    ):
+        """Top lists rank and count likes from the last `days` days."""
+        now = datetime.now(timezone.utc)
+        for days_ago in (0, 0, 0, 30):
+            user = User(
+                email=f"fan-{uuid.uuid4().hex[:8]}@pulsync.io",
+                display_name="Fan",
+                role="engineering",
+            )
+            db.add(user)
+            db.flush()
+            db.add(
+                Like(
+                    user_id=user.id,
+                    content_id=test_content.id,
+                    created_at=now - timedelta(days=days_ago),
+                )
+            )
+        db.flush()
+
+        week = api_client.get("/admin/analytics?days=7", headers=comms_headers)
+        quarter = api_client.get("/admin/analytics?days=90", headers=comms_headers)
+
+        likes = {
+            period: {c["id"]: c["likes"] for c in data.json()["top_liked"]}
+            for period, data in (("week", week), ("quarter", quarter))
+        }
+        assert likes["week"][str(test_content.id)] == 3
+        assert likes["quarter"][str(test_content.id)] == 4
+
 
 class TestFeedFullJourney:
     """Test complete feed browsing journey."""
@@ -1,10 +1,29 @@
 """E2E tests for messaging user journey."""
 
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
 
+from app.models.conversation import Conversation, ConversationParticipant
+from app.models.message import Message
 from app.models.user import User
 from app.routers.auth import create_access_token
+from app.services.inbox import (
+    backfill_dm_keys,
+    dm_key,
+    open_direct_conversation,
+    reconcile_inbox_counters,
+)
+from app.services.user_search import user_search_cache
+
+from .conftest import QueryCounter, TestSessionLocal
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
 
 
 class TestConversations:
@@ -246,6 +265,80 @@ class TestUserSearch:
         users = response.json()
         assert not any(u["id"] == str(test_user.id) for u in users)
 
+    def test_prefix_matches_rank_first(
+        self, db: Session, api_client: TestClient, auth_headers: dict
+    ):
+        """Names starting with the query come before word and substring matches."""
+        token = f"qz{uuid.uuid4().hex[:6]}"
+        for name in (
+            f"Dana X{token}ton",
+            f"Carol {token.title()}er",
+            f"{token.title()} Brown",
+        ):
+            db.add(User(email=f"{uuid.uuid4().hex}@pulsync.io", display_name=name))
+        db.flush()
+
+        response = api_client.get(
+            f"/messages/users/search?q={token}", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert [u["display_name"] for u in response.json()] == [
+            f"{token.title()} Brown",
+            f"Carol {token.title()}er",
+            f"Dana X{token}ton",
+        ]
+
+    def test_short_query_matches_word_starts(
+        self, db: Session, api_client: TestClient, auth_headers: dict
+    ):
+        """One- and two-letter queries only match the start of a word."""
+        for name in ("Ada Qvist", "Ada Aqvist"):
+            db.add(User(email=f"{uuid.uuid4().hex}@pulsync.io", display_name=name))
+        db.flush()
+
+        response = api_client.get("/messages/users/search?q=qv", headers=auth_headers)
+
+        assert response.status_code == 200
+        names = [u["display_name"] for u in response.json()]
+        assert "Ada Qvist" in names
+        assert "Ada Aqvist" not in names
+
+    def test_cached_results_still_exclude_the_caller(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        second_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """A cached result shared by two callers leaves out each caller."""
+        monkeypatch.setattr(user_search_cache, "max_query_length", 100)
+        user_search_cache.reset_metrics()
+        term = second_user.email.split("@")[0]
+        second_headers = {
+            "Authorization": f"Bearer {create_access_token(second_user.id)}"
+        }
+
+        first = api_client.get(f"/messages/users/search?q={term}", headers=auth_headers)
+        second = api_client.get(
+            f"/messages/users/search?q={term.upper()}", headers=second_headers
+        )
+
+        assert user_search_cache.get_metrics()["hits"] == 1
+        assert [u["id"] for u in first.json()] == [str(second_user.id)]
+        assert second.json() == []
+
+    def test_wildcards_match_literally(
+        self, api_client: TestClient, auth_headers: dict
+    ):
+        """LIKE wildcards in the query are not expanded."""
+        response = api_client.get(
+            "/messages/users/search?q=%25%25%25", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert all("%" in u["display_name"] for u in response.json())
+
 
 class TestMessagingFullJourney:
     """Test complete messaging journey."""
@@ -345,3 +438,491 @@ class TestMessagingFullJourney:
             headers=auth_headers,
         )
         assert get_response.status_code == 404
+
+
+class TestInbox:
+    """The conversation list is built in a fixed number of statements."""
+
+    @staticmethod
+    def make_conversation(
+        db: Session, me: User, minute: int, unread: int, read: int = 1
+    ) -> Conversation:
+        """A DM with `read` messages seen by `me`, then `unread` new ones."""
+        other = User(
+            email=f"inbox-{uuid.uuid4().hex}@pulsync.io",
+            display_name="Inbox Peer",
+        )
+        db.add(other)
+        db.flush()
+        at = BASE_TIME + timedelta(minutes=minute)
+        conversation = Conversation(created_at=at, updated_at=at)
+        db.add(conversation)
+        db.flush()
+        db.add_all(
+            [
+                ConversationParticipant(
+                    conversation_id=conversation.id,
+                    user_id=me.id,
+                    last_read_at=at - timedelta(seconds=30),
+                ),
+                ConversationParticipant(
+                    conversation_id=conversation.id, user_id=other.id
+                ),
+            ]
+        )
+        for i in range(read + unread):
+            seconds = -60 + i if i < read else i
+            db.add(
+                Message(
+                    conversation_id=conversation.id,
+                    sender_id=other.id,
+                    body=f"message {i}",
+                    created_at=at + timedelta(seconds=seconds),
+                )
+            )
+        # The user's own messages never count as unread
+        db.add(
+            Message(
+                conversation_id=conversation.id,
+                sender_id=me.id,
+                body="my reply",
+                created_at=at - timedelta(seconds=10),
+            )
+        )
+        db.flush()
+        # Rows written behind the API's back: derive the inbox counters
+        reconcile_inbox_counters(db)
+        return conversation
+
+    def test_inbox_cost_is_independent_of_size(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        query_counter: QueryCounter,
+    ):
+        self.make_conversation(db, test_user, minute=0, unread=2)
+        with query_counter.track():
+            response = api_client.get("/messages/conversations", headers=auth_headers)
+        few = query_counter.count
+
+        for minute in range(1, 11):
+            self.make_conversation(db, test_user, minute=minute, unread=minute % 3)
+        with query_counter.track():
+            response = api_client.get("/messages/conversations", headers=auth_headers)
+
+        # Auth, the inbox page and its participants
+        assert query_counter.count == few == 3
+        data = response.json()
+        assert len(data) == 11
+        assert [c["unread_count"] for c in data] == [
+            m % 3 for m in range(10, 0, -1)
+        ] + [2]
+        newest = data[0]
+        assert newest["last_message"]["body"] == "message 1"
+        assert len(newest["participants"]) == 2
+
+    def test_inbox_pages_by_cursor(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+    ):
+        created = [
+            self.make_conversation(db, test_user, minute=minute % 3, unread=0)
+            for minute in range(7)
+        ]
+
+        seen: list[str] = []
+        cursor = None
+        while True:
+            url = "/messages/conversations?limit=3"
+            if cursor:
+                url += f"&cursor={cursor}"
+            response = api_client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            seen.extend(c["id"] for c in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(str(c.id) for c in created)
+        assert len(seen) == len(set(seen))
+
+    def test_unread_counters_follow_sends_and_reads(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        second_user: User,
+    ):
+        other_headers = {
+            "Authorization": f"Bearer {create_access_token(second_user.id)}"
+        }
+        conv_id = api_client.post(
+            "/messages/conversations",
+            headers=auth_headers,
+            json={"participant_ids": [str(second_user.id)], "initial_message": "Hi"},
+        ).json()["id"]
+        for body in ("one", "two"):
+            api_client.post(
+                f"/messages/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"body": body},
+            )
+
+        def inbox(headers: dict) -> dict:
+            return api_client.get("/messages/conversations", headers=headers).json()[0]
+
+        assert inbox(auth_headers)["unread_count"] == 0
+        assert inbox(other_headers)["unread_count"] == 3
+        assert inbox(other_headers)["last_message"]["body"] == "two"
+
+        response = api_client.post(
+            f"/messages/conversations/{conv_id}/read", headers=other_headers
+        )
+        assert response.status_code == 204
+        assert inbox(other_headers)["unread_count"] == 0
+
+        api_client.post(
+            f"/messages/conversations/{conv_id}/messages",
+            headers=auth_headers,
+            json={"body": "three"},
+        )
+        assert inbox(other_headers)["unread_count"] == 1
+        api_client.get(f"/messages/conversations/{conv_id}", headers=other_headers)
+        assert inbox(other_headers)["unread_count"] == 0
+
+        # Nothing drifted, so the checker has nothing to repair
+        assert reconcile_inbox_counters(db) == 0
+
+    def test_reconcile_repairs_drift(
+        self, db: Session, api_client: TestClient, auth_headers: dict, test_user: User
+    ):
+        conversation = self.make_conversation(db, test_user, minute=0, unread=2)
+        db.query(ConversationParticipant).filter(
+            ConversationParticipant.conversation_id == conversation.id
+        ).update({"unread_count": 42, "last_message_id": None})
+
+        assert reconcile_inbox_counters(db) == 2
+        data = api_client.get("/messages/conversations", headers=auth_headers).json()
+        assert data[0]["unread_count"] == 2
+        assert data[0]["last_message"]["body"] == "message 2"
+        assert reconcile_inbox_counters(db) == 0
+
+
+class TestMessageWindows:
+    """Message history loads in keyset-paginated windows."""
+
+    @pytest.fixture
+    def history(self, db: Session, test_user: User, second_user: User) -> str:
+        """A conversation of ten messages, m4 to m6 sharing a timestamp."""
+        conversation = Conversation(created_at=BASE_TIME, updated_at=BASE_TIME)
+        db.add(conversation)
+        db.flush()
+        db.add_all(
+            ConversationParticipant(conversation_id=conversation.id, user_id=user.id)
+            for user in (test_user, second_user)
+        )
+        for i in range(10):
+            minute = 4 if 4 <= i <= 6 else i
+            db.add(
+                Message(
+                    conversation_id=conversation.id,
+                    sender_id=test_user.id,
+                    body=f"m{i}",
+                    created_at=BASE_TIME + timedelta(minutes=minute),
+                )
+            )
+        db.flush()
+        return str(conversation.id)
+
+    def test_page_back_through_history(
+        self, api_client: TestClient, auth_headers: dict, history: str
+    ):
+        data = api_client.get(
+            f"/messages/conversations/{history}?limit=3", headers=auth_headers
+        ).json()
+        assert [m["body"] for m in data["messages"]] == ["m7", "m8", "m9"]
+
+        windows = [data["messages"]]
+        cursor = data["next_cursor"]
+        while cursor:
+            response = api_client.get(
+                f"/messages/conversations/{history}/messages?limit=3&before={cursor}",
+                headers=auth_headers,
+            )
+            windows.insert(0, response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+
+        seen = [m["body"] for window in windows for m in window]
+        assert seen[:4] == ["m0", "m1", "m2", "m3"]
+        assert sorted(seen[4:7]) == ["m4", "m5", "m6"]
+        assert seen[7:] == ["m7", "m8", "m9"]
+
+    def test_catch_up_after_latest_window(
+        self, api_client: TestClient, auth_headers: dict, history: str
+    ):
+        data = api_client.get(
+            f"/messages/conversations/{history}", headers=auth_headers
+        ).json()
+        assert len(data["messages"]) == 10 and data["next_cursor"] is None
+
+        path = f"/messages/conversations/{history}/messages"
+        cursor = data["latest_cursor"]
+        response = api_client.get(f"{path}?after={cursor}", headers=auth_headers)
+        assert response.json() == []
+        assert response.headers["X-Next-Cursor"] == cursor
+
+        for body in ("new 1", "new 2", "new 3"):
+            api_client.post(path, headers=auth_headers, json={"body": body})
+        response = api_client.get(
+            f"{path}?after={cursor}&limit=2", headers=auth_headers
+        )
+        assert [m["body"] for m in response.json()] == ["new 1", "new 2"]
+        response = api_client.get(
+            f"{path}?after={response.headers['X-Next-Cursor']}", headers=auth_headers
+        )
+        assert [m["body"] for m in response.json()] == ["new 3"]
+
+    def test_invalid_cursors(
+        self, api_client: TestClient, auth_headers: dict, history: str
+    ):
+        path = f"/messages/conversations/{history}/messages"
+        cursor = api_client.get(
+            f"/messages/conversations/{history}?limit=1", headers=auth_headers
+        ).json()["next_cursor"]
+        response = api_client.get(
+            f"{path}?before={cursor}&after={cursor}", headers=auth_headers
+        )
+        assert response.status_code == 400
+        response = api_client.get(f"{path}?after=nope", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestDirectConversations:
+    """1:1 conversations are found and created through the dm_key index."""
+
+    def test_open_dm_costs_constant_queries(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        second_user: User,
+        query_counter: QueryCounter,
+    ):
+        for minute in range(5):
+            TestInbox.make_conversation(db, test_user, minute, unread=0)
+        body = {"participant_ids": [str(second_user.id)]}
+        created = api_client.post(
+            "/messages/conversations", headers=auth_headers, json=body
+        ).json()
+
+        with query_counter.track():
+            response = api_client.post(
+                "/messages/conversations", headers=auth_headers, json=body
+            )
+        assert response.json()["id"] == created["id"]
+        # Auth user, participants check, the upsert and the inbox row (2)
+        assert query_counter.count == 5
+
+    def test_leaving_releases_the_pair(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        second_user: User,
+    ):
+        body = {"participant_ids": [str(second_user.id)]}
+        first = api_client.post(
+            "/messages/conversations", headers=auth_headers, json=body
+        ).json()["id"]
+        api_client.delete(f"/messages/conversations/{first}", headers=auth_headers)
+
+        second = api_client.post(
+            "/messages/conversations", headers=auth_headers, json=body
+        ).json()
+        assert second["id"] != first
+        assert len(second["participants"]) == 2
+
+    def test_concurrent_opens_share_one_conversation(self):
+        user_ids = {uuid.uuid4(), uuid.uuid4()}
+        first, second = TestSessionLocal(), TestSessionLocal()
+        try:
+            created_id, created = open_direct_conversation(first, user_ids)
+            assert created
+            # The second upsert waits on the uncommitted row, then returns it
+            with ThreadPoolExecutor(1) as pool:
+                opening = pool.submit(open_direct_conversation, second, user_ids)
+                time.sleep(0.2)
+                assert not opening.done()
+                first.commit()
+                assert opening.result(timeout=5) == (created_id, False)
+        finally:
+            second.rollback()
+            first.query(Conversation).filter(Conversation.id == created_id).delete()
+            first.commit()
+            first.close()
+            second.close()
+
+    def test_backfill_keys_oldest_conversation_per_pair(
+        self, db: Session, test_user: User, second_user: User
+    ):
+        conversations = []
+        for minute in (5, 1):
+            at = BASE_TIME + timedelta(minutes=minute)
+            conversation = Conversation(created_at=at, updated_at=at)
+            db.add(conversation)
+            db.flush()
+            db.add_all(
+                ConversationParticipant(
+                    conversation_id=conversation.id, user_id=user.id
+                )
+                for user in (test_user, second_user)
+            )
+            conversations.append(conversation)
+        db.flush()
+
+        assert backfill_dm_keys(db) == 1
+        db.expire_all()
+        newer, older = conversations
+        assert older.dm_key == dm_key({test_user.id, second_user.id})
+        assert newer.dm_key is None
+        assert backfill_dm_keys(db) == 0
+
+
+class TestMessageSearch:
+    """Message search covers only the caller's conversations."""
+
+    @pytest.fixture
+    def conversations(
+        self, db: Session, test_user: User, second_user: User
+    ) -> dict[str, Conversation]:
+        """A DM between the two users and one test_user is not part of."""
+        outsider = User(
+            email=f"outsider-{uuid.uuid4().hex}@pulsync.io", display_name="Outsider"
+        )
+        db.add(outsider)
+        db.flush()
+        found = {}
+        for name, members in (
+            ("mine", (test_user, second_user)),
+            ("theirs", (second_user, outsider)),
+        ):
+            conversation = Conversation()
+            db.add(conversation)
+            db.flush()
+            db.add_all(
+                ConversationParticipant(conversation_id=conversation.id, user_id=u.id)
+                for u in members
+            )
+            found[name] = conversation
+        db.flush()
+        return found
+
+    def add_messages(
+        self, db: Session, conversation: Conversation, sender: User, bodies: list
+    ):
+        for minute, body in enumerate(bodies):
+            db.add(
+                Message(
+                    conversation_id=conversation.id,
+                    sender_id=sender.id,
+                    body=body,
+                    created_at=BASE_TIME + timedelta(minutes=minute),
+                )
+            )
+        db.flush()
+
+    def test_ranked_results_with_snippets(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        second_user: User,
+        conversations: dict,
+    ):
+        self.add_messages(
+            db,
+            conversations["mine"],
+            second_user,
+            [
+                "The quarterly roadmap review moved to Friday",
+                "Lunch?",
+                "Roadmap draft: the roadmap covers deploys and roadmap risks",
+            ],
+        )
+        self.add_messages(
+            db, conversations["theirs"], second_user, ["Secret roadmap notes"]
+        )
+
+        response = api_client.get("/messages/search?q=roadmaps", headers=auth_headers)
+        assert response.status_code == 200
+        results = response.json()
+        assert [r["body"][:13] for r in results] == ["Roadmap draft", "The quarterly"]
+        assert results[0]["rank"] > results[1]["rank"]
+        assert "<mark>roadmap</mark> review" in results[1]["snippet"]
+        assert results[0]["sender"]["id"] == str(second_user.id)
+
+        response = api_client.get(
+            '/messages/search?q="roadmap review" -lunch', headers=auth_headers
+        )
+        assert [r["body"][:13] for r in response.json()] == ["The quarterly"]
+
+    def test_snippets_escape_message_markup(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        second_user: User,
+        conversations: dict,
+    ):
+        self.add_messages(
+            db,
+            conversations["mine"],
+            second_user,
+            ['<img src=x onerror=alert(1)> payroll & "benefits"'],
+        )
+
+        response = api_client.get("/messages/search?q=payroll", headers=auth_headers)
+
+        (result,) = response.json()
+        markup = result["snippet"].replace("<mark>", "").replace("</mark>", "")
+        assert "<" not in markup and ">" not in markup
+        assert "<mark>payroll</mark> &amp; &quot;benefits" in result["snippet"]
+        assert result["body"].startswith("<img")
+
+    def test_pages_through_equal_ranks(
+        self,
+        db: Session,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_user: User,
+        conversations: dict,
+    ):
+        self.add_messages(
+            db,
+            conversations["mine"],
+            test_user,
+            [f"deploy number {i}" for i in range(7)],
+        )
+
+        seen, cursor = [], None
+        while True:
+            url = "/messages/search?q=deploy&limit=3"
+            response = api_client.get(
+                url + (f"&cursor={cursor}" if cursor else ""), headers=auth_headers
+            )
+            seen.extend(r["body"] for r in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert seen == [f"deploy number {i}" for i in reversed(range(7))]
+
+        response = api_client.get(
+            "/messages/search?q=deploy&cursor=nope", headers=auth_headers
+        )
+        assert response.status_code == 400
@@ -0,0 +1,174 @@
+"""E2E tests for write-behind ingestion of view events."""
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.content import Content
+from app.models.content_stats import ContentStats
+from app.models.tag import Tag
+from app.models.user import User
+from app.models.user_interest import UserInterest
+from app.models.view_event import ViewEvent
+from app.routers.feed import MAX_VIEW_BATCH
+from app.services.view_ingest import view_ingest
+
+from .conftest import QueryCounter
+
+
+def post_view(client: TestClient, headers: dict, content_id, completion: float = 50):
+    return client.post(
+        "/feed/view",
+        headers=headers,
+        json={"content_id": str(content_id), "completion_percent": completion},
+    )
+
+
+def stored_views(db: Session, content_id) -> int:
+    return db.query(ViewEvent).filter(ViewEvent.content_id == content_id).count()
+
+
+class TestViewIngest:
+    """Views are acknowledged immediately and written in batches."""
+
+    def test_views_are_written_in_one_batch(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_user: User,
+        test_tag: Tag,
+        test_content: Content,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Nothing is written until the batch fills, then all of it at once."""
+        test_content.tags = [test_tag]
+        db.flush()
+        monkeypatch.setattr(view_ingest, "batch_size", 3)
+        api_client.post("/qa/reset-metrics")
+
+        for _ in range(2):
+            assert (
+                post_view(api_client, auth_headers, test_content.id).status_code == 202
+            )
+        assert stored_views(db, test_content.id) == 0
+        assert api_client.get("/qa/metrics").json()["view_ingest"]["queue_depth"] == 2
+
+        post_view(api_client, auth_headers, test_content.id)
+
+        assert stored_views(db, test_content.id) == 3
+        assert db.get(ContentStats, test_content.id).view_count == 3
+        interest = db.get(UserInterest, (test_user.id, test_tag.id))
+        assert interest.score == pytest.approx(0.15)
+
+        metrics = api_client.get("/qa/metrics").json()["view_ingest"]
+        assert metrics["queue_depth"] == 0
+        assert metrics["flushes"] == 1
+        assert metrics["written"] == 3
+
+    def test_full_buffer_pushes_back(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        test_content: Content,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Once max_pending views are queued, further views get a 503."""
+        monkeypatch.setattr(view_ingest, "batch_size", 10)
+        monkeypatch.setattr(view_ingest, "max_pending", 1)
+        try:
+            assert (
+                post_view(api_client, auth_headers, test_content.id).status_code == 202
+            )
+            response = post_view(api_client, auth_headers, test_content.id)
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+        finally:
+            view_ingest.flush()
+
+    def test_stop_drains_queue(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_content: Content,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Shutdown writes whatever is still buffered."""
+        monkeypatch.setattr(view_ingest, "batch_size", 10)
+        post_view(api_client, auth_headers, test_content.id)
+        assert stored_views(db, test_content.id) == 0
+
+        view_ingest.stop()
+
+        assert stored_views(db, test_content.id) == 1
+
+    def test_views_of_missing_content_are_dropped(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_content: Content,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """A bad content ID doesn't sink the rest of its batch."""
+        monkeypatch.setattr(view_ingest, "batch_size", 2)
+        api_client.post("/qa/reset-metrics")
+        post_view(api_client, auth_headers, uuid.uuid4())
+        post_view(api_client, auth_headers, test_content.id)
+
+        assert stored_views(db, test_content.id) == 1
+        assert api_client.get("/qa/metrics").json()["view_ingest"]["failed"] == 0
+
+
+class TestBulkViews:
+    """POST /feed/views reports a scroll session in one request."""
+
+    def test_session_is_written_as_one_batch(
+        self,
+        api_client: TestClient,
+        auth_headers: dict,
+        db: Session,
+        test_user: User,
+        test_tag: Tag,
+        multiple_content: list[Content],
+        query_counter: QueryCounter,
+    ):
+        """Interest updates are folded per tag, so cost doesn't grow with views."""
+        for content in multiple_content:
+            content.tags = [test_tag]
+        db.flush()
+
+        def send(contents: list[Content]) -> int:
+            payload = [
+                {"content_id": str(c.id), "completion_percent": 100} for c in contents
+            ]
+            with query_counter.track():
+                response = api_client.post(
+                    "/feed/views", headers=auth_headers, json=payload
+                )
+            assert response.status_code == 202
+            assert response.json()["accepted"] == len(contents)
+            return query_counter.count
+
+        small = send(multiple_content[:2])
+        large = send(multiple_content * 2)
+
+        assert small == large
+        assert stored_views(db, multiple_content[0].id) == 3
+        interest = db.get(UserInterest, (test_user.id, test_tag.id))
+        db.refresh(interest)
+        assert interest.score == pytest.approx(1.0)
+        assert interest.is_auto_subscribed
+
+    def test_session_size_is_capped(self, api_client: TestClient, auth_headers: dict):
+        payload = [{"content_id": str(uuid.uuid4())}] * (MAX_VIEW_BATCH + 1)
+        response = api_client.post("/feed/views", headers=auth_headers, json=payload)
+        assert response.status_code == 422
+
+    def test_empty_session(self, api_client: TestClient, auth_headers: dict):
+        response = api_client.post("/feed/views", headers=auth_headers, json=[])
+        assert response.status_code == 202
+        assert response.json()["accepted"] == 0
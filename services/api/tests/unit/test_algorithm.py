@@ -0,0 +1,99 @@
+"""Tests for the feed scoring algorithm."""
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from app.models.content import Content
+from app.models.tag import Tag
+from app.models.user import User
+from app.services.algorithm import (
+    build_feed_columns,
+    calculate_feed_score,
+    calculate_feed_scores,
+    half_life_decay,
+)
+
+
+def make_catalogue(size: int, seed: int = 7):
+    """Build unsaved Content rows with random flags, tags and ages."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    tags = [Tag(id=uuid.uuid4(), name=f"Tag {i}", slug=f"tag-{i}") for i in range(12)]
+    roles = ["engineering", "hr", "marketing", "comms", "executive"]
+
+    contents = []
+    for _ in range(size):
+        created_at = now - timedelta(hours=rng.uniform(-1, 24 * 30))
+        content = Content(
+            id=uuid.uuid4(),
+            is_company_important=rng.random() < 0.1,
+            target_roles=rng.choice([None, [], rng.sample(roles, rng.randint(1, 3))]),
+            # Mix naive and aware timestamps like rows loaded from the database
+            created_at=created_at.replace(tzinfo=None)
+            if rng.random() < 0.5
+            else created_at,
+        )
+        content.tags = rng.sample(tags, rng.randint(0, 4))
+        contents.append(content)
+
+    interests = {t.id: rng.random() for t in rng.sample(tags, 8)}
+    like_counts = {c.id: rng.randint(0, 500) for c in contents if rng.random() < 0.7}
+    comment_counts = {c.id: rng.randint(0, 80) for c in contents if rng.random() < 0.5}
+    return contents, interests, like_counts, comment_counts
+
+
+@pytest.mark.parametrize("size", [0, 1, 250])
+def test_vectorized_scores_match_reference(size: int):
+    """The batch scorer agrees with calculate_feed_score for every item."""
+    contents, interests, like_counts, comment_counts = make_catalogue(size)
+    user = User(role="engineering")
+
+    columns = build_feed_columns(contents, user, like_counts, comment_counts)
+    scores = calculate_feed_scores(columns, columns.interest_vector(interests))
+
+    expected = [
+        calculate_feed_score(
+            c,
+            user,
+            interests,
+            like_counts.get(c.id, 0),
+            comment_counts.get(c.id, 0),
+        )
+        for c in contents
+    ]
+    assert scores.shape == (size,)
+    np.testing.assert_allclose(scores, expected, rtol=1e-6, atol=1e-9)
+
+
+def test_vectorized_scores_preserve_ranking():
+    """Sorting by batch scores yields the same order as the reference."""
+    contents, interests, like_counts, comment_counts = make_catalogue(100, seed=11)
+    user = User(role="marketing")
+
+    columns = build_feed_columns(contents, user, like_counts, comment_counts)
+    scores = calculate_feed_scores(columns, columns.interest_vector(interests))
+    batch_order = [contents[i].id for i in np.argsort(-scores, kind="stable")]
+
+    reference = sorted(
+        contents,
+        key=lambda c: calculate_feed_score(
+            c,
+            user,
+            interests,
+            like_counts.get(c.id, 0),
+            comment_counts.get(c.id, 0),
+        ),
+        reverse=True,
+    )
+    assert batch_order == [c.id for c in reference]
+
+
+def test_half_life_decay():
+    assert half_life_decay(0, 24) == 1.0
+    assert half_life_decay(-5, 24) == 1.0
+    assert half_life_decay(24, 24) == pytest.approx(0.5)
+    assert half_life_decay(48, 24) == pytest.approx(0.25)
@@ -0,0 +1,38 @@
+"""Tests for the per-content counter cache."""
+
+import uuid
+
+from app.services.counter_cache import CounterCache
+
+
+def test_get_many_returns_only_cached():
+    cache = CounterCache(ttl_seconds=5, max_entries=10)
+    cached, missing = uuid.uuid4(), uuid.uuid4()
+    cache.put_many({cached: (3, 1)}, cache.token())
+
+    assert cache.get_many([cached, missing]) == {cached: (3, 1)}
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"]) == (1, 1)
+
+
+def test_invalidate_and_lru_eviction():
+    cache = CounterCache(ttl_seconds=5, max_entries=2)
+    a, b, c = (uuid.uuid4() for _ in range(3))
+    cache.put_many({a: (1, 1), b: (2, 2)}, cache.token())
+    cache.invalidate(b)
+    cache.put_many({c: (3, 3)}, cache.token())
+    cache.put_many({b: (4, 4)}, cache.token())
+
+    assert cache.get_many([a, b, c]) == {b: (4, 4), c: (3, 3)}
+
+
+def test_put_read_before_invalidation_is_dropped():
+    """A count read before a flush committed must not be cached after it."""
+    cache = CounterCache(ttl_seconds=5, max_entries=10)
+    raced, other = uuid.uuid4(), uuid.uuid4()
+    token = cache.token()
+
+    cache.invalidate(raced)
+    cache.put_many({raced: (1, 0), other: (2, 0)}, token)
+
+    assert cache.get_many([raced, other]) == {other: (2, 0)}
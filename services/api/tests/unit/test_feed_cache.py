@@ -0,0 +1,68 @@
+"""Tests for the per-user ranked feed cache."""
+
+import uuid
+
+from app.services.feed_cache import FeedCache
+
+
+def test_invalidate_user_only_drops_that_user():
+    cache = FeedCache(ttl_seconds=60, max_entries=10)
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    cache.set(alice, "engineering", [], cache.generation())
+    cache.set(bob, "engineering", [], cache.generation())
+
+    cache.invalidate_user(alice)
+
+    assert cache.get(alice, "engineering") is None
+    assert cache.get(bob, "engineering") == []
+    assert cache.get_metrics()["invalidations"] == 1
+
+
+def test_stale_generation_is_not_stored():
+    """A ranking computed across an invalidation must not be cached."""
+    cache = FeedCache(ttl_seconds=60, max_entries=10)
+    user_id = uuid.uuid4()
+    generation = cache.generation()
+
+    cache.invalidate_all()
+    cache.set(user_id, "engineering", [uuid.uuid4()], generation)
+
+    assert cache.get(user_id, "engineering") is None
+
+
+def test_discard_content_patches_rankings():
+    cache = FeedCache(ttl_seconds=60, max_entries=10)
+    user_id = uuid.uuid4()
+    keep, gone = uuid.uuid4(), uuid.uuid4()
+    cache.set(user_id, "engineering", [gone, keep], cache.generation())
+
+    cache.discard_content(gone)
+
+    assert cache.get(user_id, "engineering") == [keep]
+
+
+def test_other_users_invalidation_keeps_write():
+    """Invalidating one user must not void rankings computed for others."""
+    cache = FeedCache(ttl_seconds=60, max_entries=10)
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    alice_generation = cache.generation()
+    bob_generation = cache.generation()
+
+    cache.invalidate_user(bob)
+    cache.set(alice, "engineering", [], alice_generation)
+    cache.set(bob, "engineering", [], bob_generation)
+
+    assert cache.get(alice, "engineering") == []
+    assert cache.get(bob, "engineering") is None
+
+
+def test_pruned_user_stamps_void_older_writes():
+    cache = FeedCache(ttl_seconds=60, max_entries=1)
+    alice, bob = uuid.uuid4(), uuid.uuid4()
+    generation = cache.generation()
+
+    cache.invalidate_user(alice)
+    cache.invalidate_user(bob)  # prunes alice's stamp into the epoch
+    cache.set(alice, "engineering", [], generation)
+
+    assert cache.get(alice, "engineering") is None
@@ -0,0 +1,48 @@
+"""Tests for ranked feed snapshots and their cursors."""
+
+import uuid
+
+import pytest
+
+from app.services.feed_snapshots import (
+    FeedSnapshotStore,
+    decode_snapshot_cursor,
+    encode_snapshot_cursor,
+)
+
+
+def test_cursor_round_trip():
+    cursor = encode_snapshot_cursor("abc123", 40)
+    assert "=" not in cursor
+    assert decode_snapshot_cursor(cursor) == ("abc123", 40)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", str(uuid.uuid4()), "YWJjfC0x"])
+def test_cursor_rejects_garbage(cursor: str):
+    with pytest.raises(ValueError):
+        decode_snapshot_cursor(cursor)
+
+
+def test_snapshot_is_capped_and_scoped_to_user():
+    store = FeedSnapshotStore(ttl_seconds=60, max_items=3, max_snapshots=10)
+    user_id = uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(5)]
+
+    snapshot = store.create(user_id, ids)
+
+    assert snapshot.content_ids == ids[:3]
+    assert store.get(snapshot.id, user_id) is snapshot
+    assert store.get(snapshot.id, uuid.uuid4()) is None
+
+
+def test_same_ranking_reuses_snapshot():
+    store = FeedSnapshotStore(ttl_seconds=60, max_items=3, max_snapshots=10)
+    user_id = uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(5)]
+
+    snapshot = store.create(user_id, ids)
+
+    assert store.create(user_id, list(ids)) is snapshot
+    assert store.create(user_id, ids[:3] + [uuid.uuid4()]) is snapshot
+    assert store.create(user_id, ids[1:]) is not snapshot
+    assert store.create(uuid.uuid4(), ids).id != snapshot.id
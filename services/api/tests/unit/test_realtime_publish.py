@@ -0,0 +1,53 @@
+"""Tests for encoding and sending realtime NOTIFY payloads."""
+
+import json
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.services import realtime as realtime_module
+from app.services.realtime import MAX_NOTIFY_PAYLOAD, RealtimeHub, notify_payloads
+
+
+def make_event(recipients: int, data: dict) -> dict:
+    return {
+        "type": "message.created",
+        "recipients": [str(uuid.uuid4()) for _ in range(recipients)],
+        "sent_at": 0.0,
+        "data": data,
+    }
+
+
+def test_small_event_is_one_payload():
+    event = make_event(2, {"n": 1})
+    assert [json.loads(p) for p in notify_payloads(event, None)] == [event]
+
+
+def test_large_data_falls_back():
+    event = make_event(2, {"body": "x" * 10_000})
+    (payload,) = notify_payloads(event, {"id": 1})
+    assert json.loads(payload)["data"] == {"id": 1}
+    assert json.loads(payload)["truncated"] is True
+
+
+def test_many_recipients_are_split_across_payloads():
+    event = make_event(1_000, {"n": 1})
+
+    payloads = notify_payloads(event, None)
+
+    assert len(payloads) > 1
+    assert all(len(p.encode()) <= MAX_NOTIFY_PAYLOAD for p in payloads)
+    parts = [json.loads(p) for p in payloads]
+    assert [r for part in parts for r in part["recipients"]] == event["recipients"]
+    assert all(part["data"] == {"n": 1} for part in parts)
+
+
+def test_failed_notify_is_counted_not_raised(monkeypatch: pytest.MonkeyPatch):
+    unreachable = create_engine("postgresql://nobody@127.0.0.1:1/none")
+    monkeypatch.setattr(realtime_module, "engine", unreachable)
+    hub = RealtimeHub(channel="test_channel", queue_size=10)
+
+    hub.publish("ping", [uuid.uuid4()], {"n": 1})
+
+    assert hub.get_metrics()["publish_failed"] == 1
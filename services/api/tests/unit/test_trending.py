@@ -0,0 +1,99 @@
+"""Tests for the decayed heavy-hitters structures behind trending."""
+
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.trending import CountMinSketch, DecayedTopK, TrendingEngine
+
+HOUR = 3600.0
+
+
+def test_count_min_never_undercounts():
+    sketch = CountMinSketch(width=16, depth=3)
+    counts = {f"key-{i}": i + 1 for i in range(50)}
+    for key, n in counts.items():
+        sketch.add(key, n)
+
+    for key, n in counts.items():
+        assert sketch.estimate(key) >= n
+
+
+def test_top_k_orders_by_count():
+    tracker = DecayedTopK(HOUR, capacity=10, sketch_width=1024, sketch_depth=4)
+    now = time.time()
+    for key, n in {"a": 5, "b": 9, "c": 1}.items():
+        for _ in range(n):
+            tracker.add(key, at=now)
+
+    top = tracker.top(2, now=now)
+    assert [key for key, _ in top] == ["b", "a"]
+    assert top[0][1] == pytest.approx(9, rel=0.01)
+
+
+def test_older_events_decay():
+    tracker = DecayedTopK(HOUR, capacity=10, sketch_width=1024, sketch_depth=4)
+    now = time.time()
+    for _ in range(4):
+        tracker.add("old", at=now - 2 * HOUR)
+    for _ in range(2):
+        tracker.add("new", at=now)
+
+    top = dict(tracker.top(2, now=now))
+    assert top["old"] == pytest.approx(1.0)
+    assert top["new"] == pytest.approx(2.0)
+
+
+def test_rescale_keeps_scores():
+    """Far-apart events trigger a landmark rescale without changing scores."""
+    tracker = DecayedTopK(HOUR, capacity=10, sketch_width=1024, sketch_depth=4)
+    start = time.time()
+    tracker.add("a", at=start)
+    later = start + 100 * HOUR
+    tracker.add("b", at=later)
+
+    top = dict(tracker.top(2, now=later))
+    assert top["b"] == pytest.approx(1.0)
+    assert top["a"] == pytest.approx(0.0, abs=1e-20)
+
+
+def test_memory_is_bounded_and_keeps_heavy_hitters():
+    tracker = DecayedTopK(HOUR, capacity=5, sketch_width=4096, sketch_depth=4)
+    now = time.time()
+    for _ in range(50):
+        tracker.add("hot", at=now)
+    for i in range(500):
+        tracker.add(f"cold-{i}", at=now)
+
+    assert len(tracker) <= 10
+    assert tracker.top(1, now=now)[0][0] == "hot"
+
+
+def test_engine_combines_signals_and_discards():
+    engine = TrendingEngine(
+        half_life_hours=1, capacity=10, sketch_width=1024, sketch_depth=4
+    )
+    viewed, liked = uuid.uuid4(), uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    engine.record(viewed, "view", at=now)
+    engine.record(viewed, "view", at=now)
+    engine.record(liked, "like", at=now)
+
+    assert [cid for cid, _ in engine.top("view", 5)] == [viewed]
+    assert [cid for cid, _ in engine.top("trending", 5)] == [liked, viewed]
+
+    engine.discard(liked)
+    assert [cid for cid, _ in engine.top("trending", 5)] == [viewed]
+
+
+def test_engine_treats_naive_times_as_utc():
+    engine = TrendingEngine(
+        half_life_hours=1, capacity=10, sketch_width=1024, sketch_depth=4
+    )
+    content_id = uuid.uuid4()
+    an_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    engine.record(content_id, "view", at=an_hour_ago.replace(tzinfo=None))
+
+    assert engine.top("view", 1)[0][1] == pytest.approx(0.5, rel=0.01)
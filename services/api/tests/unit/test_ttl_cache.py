@@ -0,0 +1,69 @@
+"""Tests for the shared TTL-LRU cache."""
+
+import pytest
+
+from app.services import ttl_cache as cache_module
+from app.services.ttl_cache import TTLCache
+
+
+def test_hit_after_put_and_metrics():
+    cache: TTLCache[str, list[int]] = TTLCache(ttl_seconds=60, max_entries=10)
+
+    assert cache.get("a") is None
+    cache.put("a", [])
+
+    assert cache.get("a") == []
+    assert cache.get_many(["a", "b"]) == {"a": []}
+    metrics = cache.get_metrics()
+    assert (metrics["hits"], metrics["misses"]) == (2, 2)
+    assert metrics["hit_ratio"] == 0.5
+    assert metrics["entries"] == 1
+
+    cache.reset_metrics()
+    assert cache.get_metrics()["hits"] == 0
+
+
+def test_entries_expire(monkeypatch: pytest.MonkeyPatch):
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_entries=10)
+    cache.put("a", 1)
+
+    now = cache_module.time.monotonic()
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.put_many({"a": 1, "b": 2})
+    cache.get("a")  # touch a so b is least recent
+    cache.put("c", 3)
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_patch_keeps_age(monkeypatch: pytest.MonkeyPatch):
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_entries=10)
+    now = cache_module.time.monotonic()
+    cache.put("a", 1)
+
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 30)
+    cache.patch("a", 2)
+    cache.patch("missing", 3)
+    assert cache.items() == [("a", 2)]
+
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now + 61)
+    assert cache.get("a") is None
+
+
+def test_discard_and_clear():
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_entries=10)
+    cache.put_many({"a": 1, "b": 2})
+
+    cache.discard("a")
+    cache.discard("missing")
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,41 @@
+"""Tests for the short-prefix user search cache."""
+
+import uuid
+
+from app.schemas.user import UserPublic
+from app.services.user_search import UserSearchCache, escape_like
+
+
+def make_users(n: int) -> list[UserPublic]:
+    return [
+        UserPublic(
+            id=uuid.uuid4(),
+            display_name=f"User {i}",
+            avatar_url=None,
+            role="engineering",
+            department="Engineering",
+        )
+        for i in range(n)
+    ]
+
+
+def test_only_short_queries_are_cacheable():
+    cache = UserSearchCache(ttl_seconds=60, max_entries=10, max_query_length=3)
+
+    assert cache.cacheable("a")
+    assert cache.cacheable("ali")
+    assert not cache.cacheable("alic")
+
+
+def test_invalidate_all():
+    cache = UserSearchCache(ttl_seconds=60, max_entries=10, max_query_length=3)
+    cache.set("a", 20, make_users(1))
+
+    cache.invalidate_all()
+
+    assert cache.get("a", 20) is None
+    assert cache.get_metrics()["entries"] == 0
+
+
+def test_escape_like():
+    assert escape_like("50%_off\\") == "50\\%\\_off\\\\"
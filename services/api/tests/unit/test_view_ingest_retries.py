@@ -0,0 +1,94 @@
+"""Tests for how the view ingest buffer handles failed writes."""
+
+import uuid
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.services import view_ingest as ingest_module
+from app.services.view_ingest import PendingView, ViewIngestBuffer
+
+
+class FakeSession:
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+
+def make_buffer(monkeypatch: pytest.MonkeyPatch, write) -> ViewIngestBuffer:
+    monkeypatch.setattr(ingest_module, "write_view_batch", write)
+    return ViewIngestBuffer(
+        max_pending=100,
+        batch_size=10,
+        flush_interval_seconds=None,
+        max_attempts=3,
+        session_scope=lambda: nullcontext(FakeSession()),
+    )
+
+
+def make_views(n: int) -> list[PendingView]:
+    return [
+        PendingView(
+            user_id=uuid.uuid4(),
+            content_id=uuid.uuid4(),
+            view_duration_seconds=0,
+            completion_percent=50,
+        )
+        for _ in range(n)
+    ]
+
+
+def test_constraint_failure_only_drops_offending_views(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    views = make_views(3)
+    deleted_user = views[1].user_id
+
+    def write(db, batch):
+        if any(view.user_id == deleted_user for view in batch):
+            raise IntegrityError("INSERT", {}, Exception("fk violation"))
+        return batch
+
+    buffer = make_buffer(monkeypatch, write)
+    buffer.submit(views)
+
+    assert buffer.flush() == 2
+    metrics = buffer.get_metrics()
+    assert (metrics["written"], metrics["failed"], metrics["retried"]) == (2, 1, 0)
+
+
+def test_transient_failure_is_retried_on_next_flush(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    failures = [OperationalError("INSERT", {}, Exception("deadlock detected"))]
+
+    def write(db, batch):
+        if failures:
+            raise failures.pop()
+        return batch
+
+    buffer = make_buffer(monkeypatch, write)
+    buffer.submit(make_views(2))
+
+    assert buffer.flush() == 0
+    assert buffer.get_metrics()["retried"] == 2
+    assert buffer.flush() == 2
+    assert buffer.get_metrics()["failed"] == 0
+
+
+def test_views_are_dropped_after_max_attempts(monkeypatch: pytest.MonkeyPatch):
+    def write(db, batch):
+        raise OperationalError("INSERT", {}, Exception("connection lost"))
+
+    buffer = make_buffer(monkeypatch, write)
+    buffer.submit(make_views(2))
+
+    for _ in range(3):
+        assert buffer.flush() == 0
+
+    metrics = buffer.get_metrics()
+    assert (metrics["retried"], metrics["failed"]) == (4, 2)
+    assert buffer.flush() == 0